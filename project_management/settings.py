@@ -4,7 +4,8 @@ Django settings for project_management project.
 
 import os
 from pathlib import Path
-from decouple import config
+from corsheaders.defaults import default_headers
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -40,6 +41,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'projects.tenancy.TenantMiddleware',
 ]
 
 ROOT_URLCONF = 'project_management.urls'
@@ -63,14 +65,33 @@ TEMPLATES = [
 WSGI_APPLICATION = 'project_management.wsgi.application'
 
 # Database
+# With DB_POOL, connections are borrowed from a pool per process for the
+# length of a request (projects/backends/postgresql_pool), which works the
+# same under WSGI and ASGI; pool metrics are exported at /metrics/. Without
+# it, DB_CONN_MAX_AGE keeps each thread's connection open between requests.
+DB_POOL = config('DB_POOL', default=False, cast=bool)
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'projects.backends.postgresql_pool' if DB_POOL else 'django.db.backends.postgresql',
         'NAME': config('DB_NAME', default='project_management'),
         'USER': config('DB_USER', default='postgres'),
         'PASSWORD': config('DB_PASSWORD', default='postgres'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # Pooled connections go back to the pool when Django closes them.
+        'CONN_MAX_AGE': 0 if DB_POOL else config('DB_CONN_MAX_AGE', default=0, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        'OPTIONS': {
+            'pool': {
+                # Per process: size it to the worker's threads, and the total
+                # across processes below the server's max_connections.
+                'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+                # Seconds to wait for a free connection before failing.
+                'timeout': config('DB_POOL_TIMEOUT', default=10.0, cast=float),
+                'max_idle': config('DB_POOL_MAX_IDLE', default=600.0, cast=float),
+                'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=3600.0, cast=float),
+            },
+        } if DB_POOL else {},
     }
 }
 
@@ -107,10 +128,73 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 GRAPHENE = {
     'SCHEMA': 'projects.schema.schema',
     'MIDDLEWARE': [
-        'graphene_django.debug.DjangoDebugMiddleware',
+        'projects.instrumentation.InstrumentationMiddleware',
     ]
 }
 
+# Requests name their organization with this header (or a slug argument);
+# slug -> Organization lookups are cached per process for TENANT_CACHE_TTL
+# seconds and cleared whenever an Organization is saved.
+TENANT_HEADER = config('TENANT_HEADER', default='X-Organization')
+TENANT_CACHE_SIZE = config('TENANT_CACHE_SIZE', default=256, cast=int)
+TENANT_CACHE_TTL = config('TENANT_CACHE_TTL', default=300, cast=int)
+
+# Fraction of GraphQL operations whose resolver and SQL timings are recorded
+# and exported at /metrics/ (see projects/instrumentation.py); 0 disables it.
+GRAPHQL_INSTRUMENTATION_SAMPLE_RATE = config('GRAPHQL_INSTRUMENTATION_SAMPLE_RATE', default=0.01, cast=float)
+# Number of slowest resolver calls kept for the metrics endpoint.
+GRAPHQL_INSTRUMENTATION_SLOWEST = config('GRAPHQL_INSTRUMENTATION_SLOWEST', default=20, cast=int)
+# /metrics/ is served to staff users, to requests with an
+# "Authorization: Bearer <METRICS_TOKEN>" header, and to clients whose address
+# is in METRICS_ALLOWED_IPS (comma-separated addresses or networks, matched
+# against REMOTE_ADDR, so the proxy's address when behind one).
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='', cast=Csv())
+
+# Documents deeper or costlier than this are rejected before execution
+# (see projects/cost.py for how cost is estimated).
+GRAPHQL_MAX_DEPTH = config('GRAPHQL_MAX_DEPTH', default=10, cast=int)
+GRAPHQL_MAX_COST = config('GRAPHQL_MAX_COST', default=5000, cast=int)
+
+# Parsed and validated documents kept per process, keyed by SHA-256.
+GRAPHQL_DOCUMENT_CACHE_SIZE = config('GRAPHQL_DOCUMENT_CACHE_SIZE', default=256, cast=int)
+# Manifest written by `manage.py build_persisted_queries`. With
+# GRAPHQL_PERSISTED_QUERIES_ONLY, documents not in it are rejected.
+GRAPHQL_PERSISTED_QUERIES_FILE = BASE_DIR / 'projects' / 'persisted_queries.json'
+GRAPHQL_PERSISTED_QUERIES_ONLY = config('GRAPHQL_PERSISTED_QUERIES_ONLY', default=False, cast=bool)
+
+# Process-local unless configured, e.g. CACHE_BACKEND=
+# django.core.cache.backends.redis.RedisCache and CACHE_LOCATION=redis://redis:6379/0.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+# Query results cached per (operation, variables, organization). Every write
+# to an organization's data bumps its version; see projects/response_cache.py.
+# Off by default, as every worker must see those versions: the default
+# backend keeps them in CACHES[GRAPHQL_RESPONSE_CACHE_ALIAS], which must then
+# be shared (Redis or Memcached). LocalMemoryBackend suits a single process.
+GRAPHQL_RESPONSE_CACHE = {
+    'ENABLED': config('GRAPHQL_RESPONSE_CACHE', default=False, cast=bool),
+    'BACKEND': config('GRAPHQL_RESPONSE_CACHE_BACKEND', default='projects.response_cache.DjangoCacheBackend'),
+    'OPTIONS': {
+        'alias': config('GRAPHQL_RESPONSE_CACHE_ALIAS', default='default'),
+        'maxsize': config('GRAPHQL_RESPONSE_CACHE_SIZE', default=1024, cast=int),
+        'ttl': config('GRAPHQL_RESPONSE_CACHE_TTL', default=60, cast=int),
+    },
+}
+
+# Admin changelists whose planner estimate reaches this many rows show the
+# estimate instead of running COUNT(*) (PostgreSQL only; see projects/admin.py).
+ADMIN_EXACT_COUNT_THRESHOLD = config('ADMIN_EXACT_COUNT_THRESHOLD', default=10000, cast=int)
+# Date drill-down above those changelists. Each level runs a Min/Max of
+# created_at over the filtered rows, an index range scan; turn it off if
+# that is still too slow for a filter combination.
+ADMIN_DATE_HIERARCHY = config('ADMIN_DATE_HIERARCHY', default=True, cast=bool)
+
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
@@ -130,6 +214,7 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, TENANT_HEADER.lower())
 
 # Logging
 LOGGING = {
@@ -4,9 +4,13 @@ URL configuration for project_management project.
 from django.contrib import admin
 from django.urls import path
 from django.views.decorators.csrf import csrf_exempt
-from graphene_django.views import GraphQLView
+from projects.views import AsyncGraphQLView, GraphQLView, metrics, organization_export
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('graphql/', csrf_exempt(GraphQLView.as_view(graphiql=True))),
+    # Served concurrently when running under ASGI (see project_management/asgi.py)
+    path('graphql/async/', AsyncGraphQLView.as_view()),
+    path('metrics/', metrics),
+    path('organizations/<slug:slug>/export/', organization_export),
 ]
@@ -1,5 +1,127 @@
+import json
+
+from django import forms
+from django.conf import settings
 from django.contrib import admin
-from .models import Organization, Project, Task, TaskComment
+from django.contrib.admin.utils import get_fields_from_path
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import (
+    BooleanField, Case, Count, ExpressionWrapper, F, FloatField, OuterRef, Q, Subquery, Value, When,
+)
+from django.db.models.functions import Coalesce, NullIf
+from django.utils import timezone
+from django.utils.functional import cached_property
+from .models import Organization, OrganizationStats, Project, Task, TaskComment
+
+# Changelist columns are computed in the changelist query (annotations and
+# list_select_related) rather than by model properties, so a page runs the
+# same number of queries whatever its size, and the columns are sortable.
+
+TASK_TOTAL = F('todo_task_count') + F('in_progress_task_count') + F('done_task_count')
+
+
+def is_open_and_past_due(today, closed_status):
+    return Case(
+        When(Q(due_date__lt=today) & ~Q(status=closed_status), then=Value(True)),
+        default=Value(False),
+        output_field=BooleanField(),
+    )
+
+
+def estimate_count(queryset):
+    """The query planner's row estimate for ``queryset``, or ``None`` where there is none."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Counts with the planner's estimate once it reaches ``ADMIN_EXACT_COUNT_THRESHOLD`` rows.
+
+    Smaller results, and databases without estimates, are counted exactly,
+    so page numbers past the end of a large result may show an empty page.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < settings.ADMIN_EXACT_COUNT_THRESHOLD:
+            return super().count
+        return estimate
+
+
+class AutocompleteFilter(admin.FieldListFilter):
+    """Related-object filter using the admin's autocomplete widget.
+
+    Unlike ``RelatedFieldListFilter`` it does not list every related object;
+    options are searched through the related model admin's ``search_fields``.
+    """
+    template = 'admin/projects/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f'{field_path}__{field.target_field.name}__exact'
+        self.lookup_val = params.get(self.lookup_kwarg)
+        super().__init__(field, request, params, model, model_admin, field_path)
+        self.form_field = forms.ModelChoiceField(
+            queryset=field.remote_field.model._default_manager.all(),
+            widget=AutocompleteSelect(field, model_admin.admin_site, attrs={'style': 'width: 100%'}),
+            required=False,
+        )
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def choices(self, changelist):
+        yield {
+            'selected': self.lookup_val is None,
+            'query_string': changelist.get_query_string(remove=[self.lookup_kwarg]),
+            'display': 'All',
+        }
+
+    def rendered_widget(self):
+        return self.form_field.widget.render(self.lookup_kwarg, self.lookup_val)
+
+    @staticmethod
+    def get_media(model, model_admin, field_path):
+        field = get_fields_from_path(model, field_path)[-1]
+        return AutocompleteSelect(field, model_admin.admin_site).media + forms.Media(
+            js=['projects/admin/autocomplete_filter.js'],
+        )
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist settings that keep pages fast on tables of any size.
+
+    Counts come from ``EstimatedCountPaginator`` without the extra unfiltered
+    count, and ``AutocompleteFilter`` replaces related filters that would
+    list every object. The ``created_at`` date hierarchy, unless
+    ``ADMIN_DATE_HIERARCHY`` turns it off, lists its periods from one
+    ``Min``/``Max`` aggregate (see ``templatetags/large_table_admin.py``).
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    change_list_template = 'admin/projects/large_table_change_list.html'
+
+    @property
+    def date_hierarchy(self):
+        return 'created_at' if settings.ADMIN_DATE_HIERARCHY else None
+
+    @property
+    def media(self):
+        media = super().media
+        for list_filter in self.list_filter:
+            if isinstance(list_filter, (list, tuple)) and list_filter[1] is AutocompleteFilter:
+                return media + AutocompleteFilter.get_media(self.model, self, list_filter[0])
+        return media
 
 
 @admin.register(Organization)
@@ -10,31 +132,93 @@ class OrganizationAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
     ordering = ['-created_at']
 
+    def get_queryset(self, request):
+        # Read from the organization_stats rollup, one joined row per organization.
+        def total(fields):
+            fields = [F(f'stats__{field}') for field in fields]
+            return Coalesce(sum(fields[1:], fields[0]), 0)
+
+        return super().get_queryset(request).annotate(
+            project_total=total(OrganizationStats.PROJECT_COUNTERS.values()),
+            task_total=total(Project.TASK_COUNTERS.values()),
+        )
+
+    @admin.display(description='Project count', ordering='project_total')
+    def project_count(self, obj):
+        return obj.project_total
+
+    @admin.display(description='Task count', ordering='task_total')
+    def task_count(self, obj):
+        return obj.task_total
+
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(LargeTableAdmin):
     list_display = ['name', 'organization', 'status', 'due_date', 'task_count', 'completion_rate', 'is_overdue', 'created_at']
-    list_filter = ['status', 'organization', 'created_at', 'due_date']
+    list_filter = ['status', ('organization', AutocompleteFilter), 'due_date']
+    list_select_related = ['organization']
     search_fields = ['name', 'description', 'organization__name']
     readonly_fields = ['created_at', 'updated_at', 'task_count', 'completion_rate', 'is_overdue']
     ordering = ['-created_at']
     autocomplete_fields = ['organization']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            task_total=TASK_TOTAL,
+            completion=Coalesce(ExpressionWrapper(
+                F('done_task_count') * 100.0 / NullIf(TASK_TOTAL, 0), output_field=FloatField(),
+            ), 0.0),
+            overdue=is_open_and_past_due(timezone.now().date(), 'COMPLETED'),
+        )
+
+    @admin.display(description='Task count', ordering='task_total')
+    def task_count(self, obj):
+        return obj.task_count
+
+    @admin.display(description='Completion rate', ordering='completion')
+    def completion_rate(self, obj):
+        return obj.completion_rate
+
+    @admin.display(description='Is overdue', boolean=True, ordering='overdue')
+    def is_overdue(self, obj):
+        return obj.is_overdue
+
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(LargeTableAdmin):
     list_display = ['title', 'project', 'status', 'assignee_email', 'due_date', 'is_overdue', 'comment_count', 'created_at']
-    list_filter = ['status', 'project__organization', 'project', 'created_at', 'due_date']
+    list_filter = ['status', ('project__organization', AutocompleteFilter), ('project', AutocompleteFilter), 'due_date']
+    list_select_related = ['project__organization']
     search_fields = ['title', 'description', 'assignee_email', 'project__name']
     readonly_fields = ['created_at', 'updated_at', 'comment_count', 'is_overdue']
     ordering = ['-created_at']
     autocomplete_fields = ['project']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            # A correlated subquery only counts the rows of the page, where a
+            # join and GROUP BY would aggregate the whole table first.
+            comment_total=Coalesce(Subquery(
+                TaskComment.objects.filter(task=OuterRef('pk')).order_by().values('task')
+                .annotate(total=Count('pk')).values('total')
+            ), 0),
+            overdue=is_open_and_past_due(timezone.now(), 'DONE'),
+        )
+
+    @admin.display(description='Comment count', ordering='comment_total')
+    def comment_count(self, obj):
+        return obj.comment_total
+
+    @admin.display(description='Is overdue', boolean=True, ordering='overdue')
+    def is_overdue(self, obj):
+        return obj.is_overdue
+
 
 @admin.register(TaskComment)
-class TaskCommentAdmin(admin.ModelAdmin):
+class TaskCommentAdmin(LargeTableAdmin):
     list_display = ['task', 'author_email', 'content_preview', 'created_at']
-    list_filter = ['created_at', 'task__project__organization', 'task__project']
+    list_filter = [('task__project__organization', AutocompleteFilter), ('task__project', AutocompleteFilter)]
+    list_select_related = ['task__project']
     search_fields = ['content', 'author_email', 'task__title']
     readonly_fields = ['created_at', 'updated_at']
     ordering = ['-created_at']
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class ProjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'projects'
+
+    def ready(self):
+        # Registers the signal handlers that keep the organization and
+        # response caches fresh.
+        from . import response_cache, tenancy  # noqa: F401
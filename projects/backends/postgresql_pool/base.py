@@ -0,0 +1,83 @@
+from django.db.backends.postgresql import base, creation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel, is_psycopg3
+
+from ...pool import ConnectionPool, PoolTimeout, close_pools, get_pool
+
+Database = base.Database
+
+if is_psycopg3:
+    TRANSACTION_IDLE = Database.pq.TransactionStatus.IDLE
+else:
+    from psycopg2.extensions import TRANSACTION_STATUS_IDLE as TRANSACTION_IDLE
+
+POOL_DEFAULTS = {'max_size': 10, 'timeout': 10.0, 'max_idle': 600.0, 'max_lifetime': 3600.0}
+
+
+def check_connection(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    if not connection.autocommit:
+        connection.rollback()
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections to the test database would block DROP DATABASE.
+        close_pools(self.connection.alias)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL backend borrowing connections from a per-process ``ConnectionPool``.
+
+    Closing the connection, which Django does at the end of every request
+    when ``CONN_MAX_AGE`` is 0, hands it back to the pool instead, so
+    threads (WSGI workers, or the ASGI handler's sync threads) only hold one
+    while serving a request. ``OPTIONS['pool']`` takes ``max_size``,
+    ``timeout``, ``max_idle`` and ``max_lifetime``; with
+    ``CONN_HEALTH_CHECKS`` idle connections are checked before reuse.
+    """
+    creation_class = DatabaseCreation
+
+    def get_pool_options(self):
+        options = self.settings_dict['OPTIONS'].get('pool') or {}
+        return {**POOL_DEFAULTS, **(options if isinstance(options, dict) else {})}
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    def get_pool(self, conn_params):
+        key = (self.alias, *(conn_params.get(name) for name in ('dbname', 'host', 'port', 'user')))
+        check = check_connection if self.settings_dict['CONN_HEALTH_CHECKS'] else None
+        return get_pool(key, lambda: ConnectionPool(
+            lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+            check=check, **self.get_pool_options(),
+        ))
+
+    def get_new_connection(self, conn_params):
+        self.pool = self.get_pool(conn_params)
+        try:
+            connection = self.pool.acquire()
+        except PoolTimeout as error:
+            raise Database.OperationalError(str(error)) from error
+        # Set on new connections by the parent class; pooled ones keep theirs.
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        connection = self.connection
+        # A connection closed inside an atomic block stays referenced until the
+        # block exits, so it is not handed to another thread.
+        discard = self.in_atomic_block or connection.closed or (self.errors_occurred and not self.is_usable())
+        if not discard and connection.info.transaction_status != TRANSACTION_IDLE:
+            try:
+                connection.rollback()
+            except Database.Error:
+                discard = True
+        self.pool.release(connection, discard=discard)
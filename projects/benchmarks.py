@@ -0,0 +1,268 @@
+import json
+import math
+import platform
+import subprocess
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+from graphql import OperationType, get_operation_ast, parse
+
+from .documents import load_frontend_documents
+from .importer import OrganizationImporter
+from .instrumentation import Sample
+from .models import Organization, Project, Task
+from .synthetic import DatasetSpec, generate_organization
+
+# Dataset shape per scale: projects, tasks per project, comments per task.
+SCALES = {
+    'small': {'projects': 10, 'tasks': 20, 'comments': 2},
+    'medium': {'projects': 50, 'tasks': 100, 'comments': 3},
+    'large': {'projects': 200, 'tasks': 250, 'comments': 4},
+}
+
+# Variables for each frontend document, by its constant name in src/graphql.
+# Documents without an entry are skipped.
+VARIABLES = {
+    'GET_ORGANIZATION': lambda fixture: {'slug': fixture.slug},
+    'GET_PROJECTS': lambda fixture: {'organizationSlug': fixture.slug},
+    'GET_PROJECT': lambda fixture: {'id': fixture.project_id},
+    'GET_TASK': lambda fixture: {'id': fixture.task_id},
+    'CREATE_PROJECT': lambda fixture: {
+        'organizationSlug': fixture.slug,
+        'input': {'name': 'Benchmark project', 'description': 'Created by the benchmark'},
+    },
+    'UPDATE_PROJECT': lambda fixture: {'input': {'id': fixture.project_id, 'name': 'Renamed by the benchmark'}},
+    'DELETE_PROJECT': lambda fixture: {'id': fixture.project_id},
+    'CREATE_TASK': lambda fixture: {'input': {'projectId': fixture.project_id, 'title': 'Benchmark task'}},
+    'UPDATE_TASK': lambda fixture: {'input': {'id': fixture.task_id, 'status': 'DONE'}},
+    'DELETE_TASK': lambda fixture: {'id': fixture.task_id},
+    'CREATE_COMMENT': lambda fixture: {
+        'input': {'taskId': fixture.task_id, 'content': 'Benchmark comment', 'authorEmail': 'bench@example.com'},
+    },
+}
+
+TASK_STATS = 'taskStats { total completed inProgress todo completionRate }'
+
+# The frontend's mutation documents select fields on the payload types
+# directly and do not validate against this schema; these select the same
+# fields through the payload. Frontend documents with the same name are
+# replaced by them.
+MUTATIONS = {
+    'CREATE_PROJECT': f"""
+        mutation CreateProject($input: CreateProjectInput!, $organizationSlug: String!) {{
+          createProject(input: $input, organizationSlug: $organizationSlug) {{
+            project {{ id name description status dueDate createdAt {TASK_STATS} }}
+          }}
+        }}
+    """,
+    'UPDATE_PROJECT': f"""
+        mutation UpdateProject($input: UpdateProjectInput!) {{
+          updateProject(input: $input) {{
+            project {{ id name description status dueDate {TASK_STATS} }}
+          }}
+        }}
+    """,
+    'DELETE_PROJECT': """
+        mutation DeleteProject($id: ID!) {
+          deleteProject(id: $id) { success }
+        }
+    """,
+    'CREATE_TASK': f"""
+        mutation CreateTask($input: CreateTaskInput!) {{
+          createTask(input: $input) {{
+            task {{ id title description status assigneeEmail dueDate createdAt project {{ id {TASK_STATS} }} }}
+          }}
+        }}
+    """,
+    'UPDATE_TASK': f"""
+        mutation UpdateTask($input: UpdateTaskInput!) {{
+          updateTask(input: $input) {{
+            task {{ id title description status assigneeEmail dueDate project {{ id {TASK_STATS} }} }}
+          }}
+        }}
+    """,
+    'DELETE_TASK': """
+        mutation DeleteTask($id: ID!) {
+          deleteTask(id: $id) { success }
+        }
+    """,
+    'CREATE_COMMENT': """
+        mutation CreateComment($input: CreateCommentInput!) {
+          createComment(input: $input) {
+            comment { id content authorEmail createdAt task { id comments { id content authorEmail createdAt } } }
+          }
+        }
+    """,
+}
+
+# Latency changes below this many milliseconds are treated as noise.
+NOISE_FLOOR_MS = 1.0
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+class Operation:
+    def __init__(self, name, query):
+        self.name = name
+        self.query = query
+        operation = get_operation_ast(parse(query))
+        self.is_mutation = operation.operation == OperationType.MUTATION
+
+
+class Fixture:
+    """The dataset of one scale and the rows operations are pointed at."""
+
+    def __init__(self, scale, organization):
+        self.scale = scale
+        self.slug = organization.slug
+        self.rows = None
+        project = Project.objects.filter(organization=organization).order_by('pk').first()
+        task = Task.objects.filter(project=project).order_by('pk').first() if project else None
+        self.project_id = project and str(project.pk)
+        self.task_id = task and str(task.pk)
+
+
+def load_operations(source=None):
+    """Frontend documents that have benchmark variables, in file order, then remaining ``MUTATIONS``."""
+    documents = {name: MUTATIONS.get(name, text) for _, name, text in load_frontend_documents(source)}
+    for name, text in MUTATIONS.items():
+        documents.setdefault(name, text)
+    return [Operation(name, text) for name, text in documents.items() if name in VARIABLES]
+
+
+def get_fixture(scale, seed=0):
+    """Return the fixture for ``scale``, generating its dataset unless it already exists.
+
+    Datasets are deterministic, so one left by an earlier run is reused.
+    """
+    spec = DatasetSpec(organizations=1, seed=seed, prefix=f'bench-{scale}', **SCALES[scale])
+    organization = Organization.objects.filter(slug=spec.slug(0)).first()
+    if organization is None:
+        organization = OrganizationImporter().run(generate_organization(spec, 0))
+    fixture = Fixture(scale, organization)
+    fixture.rows = spec.rows_per_organization
+    return fixture
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+class Runner:
+    """Times operations through the full view and middleware stack.
+
+    The response cache and instrumentation sampling are disabled so every
+    iteration executes the operation. Mutations run in a transaction that is
+    rolled back, so each iteration sees the same data.
+    """
+
+    def __init__(self, iterations=20, warmup=2):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.client = Client(SERVER_NAME='localhost')
+
+    def execute(self, operation, variables):
+        response = self.client.post(
+            '/graphql/', json.dumps({'query': operation.query, 'variables': variables}),
+            content_type='application/json',
+        )
+        body = response.json()
+        if response.status_code != 200 or body.get('errors'):
+            raise BenchmarkError(f'{operation.name} failed: {body.get("errors") or response.status_code}')
+
+    def measure(self, operation, variables):
+        """Run ``operation`` once; return ``(seconds, SQL queries)``."""
+        sample = Sample(operation.name)
+        with transaction.atomic() if operation.is_mutation else nullcontext():
+            with connection.execute_wrapper(sample):
+                start = time.perf_counter()
+                self.execute(operation, variables)
+                duration = time.perf_counter() - start
+            if operation.is_mutation:
+                transaction.set_rollback(True)
+        return duration, sample.sql_count
+
+    def run(self, operation, fixture):
+        variables = VARIABLES[operation.name](fixture)
+        with override_settings(
+            DEBUG=False, GRAPHQL_RESPONSE_CACHE={'ENABLED': False}, GRAPHQL_INSTRUMENTATION_SAMPLE_RATE=0,
+        ):
+            for _ in range(self.warmup):
+                self.measure(operation, variables)
+            durations, sql_counts = [], []
+            for _ in range(self.iterations):
+                duration, sql_count = self.measure(operation, variables)
+                durations.append(duration)
+                sql_counts.append(sql_count)
+            # Tracing slows execution down, so memory gets a run of its own.
+            tracemalloc.start()
+            try:
+                self.measure(operation, variables)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        return {
+            'scale': fixture.scale,
+            'rows': fixture.rows,
+            'operation': operation.name,
+            'iterations': self.iterations,
+            'p50_ms': round(percentile(durations, 0.5) * 1000, 3),
+            'p95_ms': round(percentile(durations, 0.95) * 1000, 3),
+            'sql_queries': max(sql_counts),
+            'peak_memory_kib': round(peak / 1024, 1),
+        }
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_environment():
+    return {
+        'commit': get_commit(),
+        'created_at': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'machine': platform.machine(),
+    }
+
+
+def compare_results(baseline, current, threshold=0.2):
+    """Return ``(scale, operation, reason)`` for each regression of ``current`` against ``baseline``.
+
+    A regression is more SQL queries, or a p95 latency more than
+    ``threshold`` (a fraction) and ``NOISE_FLOOR_MS`` above the baseline.
+    Operations missing from either side are not compared.
+    """
+    previous = {(result['scale'], result['operation']): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        before = previous.get((result['scale'], result['operation']))
+        if before is None:
+            continue
+        if result['sql_queries'] > before['sql_queries']:
+            regressions.append((result['scale'], result['operation'],
+                                f'SQL queries {before["sql_queries"]} -> {result["sql_queries"]}'))
+        limit = before['p95_ms'] * (1 + threshold)
+        if result['p95_ms'] > limit and result['p95_ms'] - before['p95_ms'] > NOISE_FLOOR_MS:
+            regressions.append((result['scale'], result['operation'],
+                                f'p95 {before["p95_ms"]:.1f}ms -> {result["p95_ms"]:.1f}ms'))
+    return regressions
@@ -0,0 +1,163 @@
+from django.conf import settings
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    get_named_type,
+    get_nullable_type,
+    is_list_type,
+)
+from graphql.utilities import value_from_ast_untyped
+
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+# Cost of resolving a field once, before multiplying by its parents' list
+# sizes. Scalars are free; fields not listed here cost DEFAULT_FIELD_COST.
+FIELD_COSTS = {
+    'Query.organization': 1,
+    'Query.project': 1,
+    'Query.task': 1,
+    'Query.search': 5,
+}
+DEFAULT_FIELD_COST = 1
+
+# Most items returned by list fields that take no page arguments. A list
+# holding more fails with ``list_too_long`` rather than returning part of
+# it, so estimated costs are upper bounds.
+LIST_SIZES = {
+    'Query.organizations': 100,
+    'Query.projects': 100,
+    'Query.overdueProjects': 100,
+    'OrganizationType.projects': 100,
+    'ProjectType.tasks': 200,
+    'TaskType.comments': 50,
+}
+DEFAULT_LIST_SIZE = 20
+
+# Where the items of those lists can be paged through instead.
+PAGED_ALTERNATIVES = {
+    'Query.projects': 'projectConnection',
+    'Query.overdueProjects': 'projectConnection(overdue: true)',
+    'OrganizationType.projects': 'projectConnection(organizationSlug: ...)',
+    'ProjectType.tasks': 'tasks(projectId: ...)',
+}
+
+
+def list_too_long(key):
+    """The error a list field ``key`` resolves to when it holds more than its ``LIST_SIZES`` items."""
+    message = f'{key} has more than {LIST_SIZES[key]} items, the most it returns without page arguments.'
+    if key in PAGED_ALTERNATIVES:
+        message += f' Page through them with {PAGED_ALTERNATIVES[key]}.'
+    return GraphQLError(message)
+
+
+def get_limits():
+    return (
+        getattr(settings, 'GRAPHQL_MAX_DEPTH', None),
+        getattr(settings, 'GRAPHQL_MAX_COST', None),
+    )
+
+
+class CostAnalyzer:
+    """Estimate the depth and cost of an operation before it is executed.
+
+    Every non-scalar field costs ``FIELD_COSTS`` (or ``DEFAULT_FIELD_COST``)
+    and its sub-selection is multiplied by the number of items the field can
+    return: the ``first``/``last`` argument of connections, or ``LIST_SIZES``
+    for plain lists.
+    """
+
+    def __init__(self, schema, document, variables=None, operation_name=None):
+        self.schema = schema
+        self.document = document
+        self.variables = variables or {}
+        self.operation_name = operation_name
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if definition.kind == 'fragment_definition'
+        }
+
+    def get_operation(self):
+        for definition in self.document.definitions:
+            if not isinstance(definition, OperationDefinitionNode):
+                continue
+            if self.operation_name is None or (definition.name and definition.name.value == self.operation_name):
+                return definition
+        return None
+
+    def analyze(self):
+        """Return ``(depth, cost)`` for the selected operation."""
+        operation = self.get_operation()
+        if operation is None:
+            return 0, 0
+        root_type = self.schema.get_root_type(operation.operation)
+        return self.measure(operation.selection_set, root_type, set())
+
+    def iter_fields(self, selection_set, parent_type, visited):
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                yield selection, parent_type
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = parent_type
+                if selection.type_condition:
+                    fragment_type = self.schema.get_type(selection.type_condition.name.value)
+                yield from self.iter_fields(selection.selection_set, fragment_type, visited)
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if fragment is None or name in visited:
+                    continue
+                fragment_type = self.schema.get_type(fragment.type_condition.name.value)
+                yield from self.iter_fields(fragment.selection_set, fragment_type, visited | {name})
+
+    def measure(self, selection_set, parent_type, visited):
+        max_depth = cost = 0
+        for node, node_parent in self.iter_fields(selection_set, parent_type, visited):
+            name = node.name.value
+            if name.startswith('__'):
+                continue
+            field = node_parent.fields.get(name)
+            if field is None:
+                continue
+            depth = 1
+            if node.selection_set:
+                child_depth, child_cost = self.measure(node.selection_set, get_named_type(field.type), visited)
+                key = f'{node_parent.name}.{name}'
+                depth += child_depth
+                cost += FIELD_COSTS.get(key, DEFAULT_FIELD_COST)
+                cost += self.list_size(node, node_parent, field, key) * child_cost
+            max_depth = max(max_depth, depth)
+        return max_depth, cost
+
+    def list_size(self, node, parent_type, field, key):
+        arguments = {
+            argument.name.value: value_from_ast_untyped(argument.value, self.variables)
+            for argument in node.arguments
+        }
+        page_sizes = [arguments.get(name) for name in ('first', 'last') if isinstance(arguments.get(name), int)]
+        if page_sizes:
+            # Negative sizes are rejected when the field runs; costing them
+            # as 0 keeps them from cancelling out their siblings' cost.
+            return max(0, min(max(page_sizes), MAX_PAGE_SIZE))
+        if 'first' in field.args:
+            return DEFAULT_PAGE_SIZE
+        if is_list_type(get_nullable_type(field.type)):
+            if parent_type.name.endswith('Connection') and node.name.value == 'edges':
+                # Already multiplied by the page size on the connection field.
+                return 1
+            return LIST_SIZES.get(key, DEFAULT_LIST_SIZE)
+        return 1
+
+
+def check_query_cost(schema, document, variables=None, operation_name=None):
+    """Measure an operation and raise ``GraphQLError`` if it exceeds the configured limits."""
+    depth, cost = CostAnalyzer(schema, document, variables, operation_name).analyze()
+    max_depth, max_cost = get_limits()
+    if max_depth is not None and depth > max_depth:
+        raise GraphQLError(f'Query depth {depth} exceeds the maximum of {max_depth}.')
+    if max_cost is not None and cost > max_cost:
+        raise GraphQLError(f'Query cost {cost} exceeds the maximum of {max_cost}.')
+    return {'depth': depth, 'requested': cost, 'maximum': max_cost}
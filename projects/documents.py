@@ -0,0 +1,122 @@
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from graphql import GraphQLError, parse, validate
+
+from .cache import LRUCache
+
+
+GQL_TEMPLATE = re.compile(r'export const (\w+) = gql`([^`]*)`')
+
+
+def hash_query(query):
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+
+def get_frontend_documents_dir():
+    return Path(settings.BASE_DIR) / 'src' / 'graphql'
+
+
+def load_frontend_documents(source=None):
+    """Yield ``(file name, constant name, text)`` for the gql`...` documents of the frontend."""
+    source = Path(source or get_frontend_documents_dir())
+    for path in sorted(source.glob('*.ts')):
+        for name, text in GQL_TEMPLATE.findall(path.read_text()):
+            yield path.name, name, text
+
+
+class CachedDocument:
+    """A parsed document together with the result of validating it against the schema."""
+    __slots__ = ('query_hash', 'document', 'errors')
+
+    def __init__(self, query_hash, document, errors):
+        self.query_hash = query_hash
+        self.document = document
+        self.errors = errors
+
+
+class DocumentCache:
+    """LRU of parsed and validated documents keyed by the SHA-256 of their text.
+
+    Validation only depends on the schema, so a cached entry lets a repeated
+    document skip both parsing and validation. Syntax errors are not cached.
+    """
+
+    def __init__(self, maxsize):
+        self._cache = LRUCache(maxsize)
+
+    def get(self, schema, query, query_hash=None):
+        query_hash = query_hash or hash_query(query)
+        entry = self._cache.get(query_hash)
+        if entry is None:
+            document = parse(query)
+            entry = CachedDocument(query_hash, document, tuple(validate(schema, document)))
+            self._cache.set(query_hash, entry)
+        return entry
+
+    def clear(self):
+        self._cache.clear()
+
+    @property
+    def stats(self):
+        return {'size': len(self._cache), 'hits': self._cache.hits, 'misses': self._cache.misses}
+
+
+class PersistedQueryRegistry:
+    """Maps SHA-256 hashes to registered documents.
+
+    Documents come from the manifest built by ``build_persisted_queries`` and,
+    unless ``GRAPHQL_PERSISTED_QUERIES_ONLY`` is set, from clients using the
+    automatic persisted query protocol (hash and query sent together once).
+    """
+
+    def __init__(self, path=None, maxsize=1024):
+        self.path = path
+        self._queries = None
+        self._lock = threading.Lock()
+        # Client-registered documents are bounded; the manifest is not.
+        self._registered = LRUCache(maxsize)
+
+    def _load(self):
+        if self._queries is None:
+            queries = {}
+            if self.path:
+                try:
+                    with open(self.path) as manifest:
+                        queries = json.load(manifest)
+                except FileNotFoundError:
+                    pass
+            self._queries = queries
+        return self._queries
+
+    def get(self, query_hash):
+        with self._lock:
+            query = self._load().get(query_hash)
+        return query if query is not None else self._registered.get(query_hash)
+
+    def register(self, query_hash, query):
+        if hash_query(query) != query_hash:
+            raise GraphQLError('provided sha does not match query')
+        self._registered.set(query_hash, query)
+
+
+_document_cache = None
+_persisted_queries = None
+
+
+def get_document_cache():
+    global _document_cache
+    if _document_cache is None:
+        _document_cache = DocumentCache(getattr(settings, 'GRAPHQL_DOCUMENT_CACHE_SIZE', 256))
+    return _document_cache
+
+
+def get_persisted_queries():
+    global _persisted_queries
+    if _persisted_queries is None:
+        _persisted_queries = PersistedQueryRegistry(getattr(settings, 'GRAPHQL_PERSISTED_QUERIES_FILE', None))
+    return _persisted_queries
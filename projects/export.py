@@ -0,0 +1,193 @@
+import csv
+import datetime
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Organization, Project, Task, TaskComment
+
+FORMATS = ('ndjson', 'csv')
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class ExportError(ValueError):
+    pass
+
+
+# Record type, model, lookup from the model to the organization, and the
+# exported fields. Parents come before children so an import can map ids
+# as it goes; within a type, records are ordered by id.
+SECTIONS = (
+    ('organization', Organization, 'pk', (
+        'id', 'name', 'slug', 'contact_email', 'created_at', 'updated_at',
+    )),
+    ('project', Project, 'organization', (
+        'id', 'name', 'description', 'status', 'due_date', 'created_at', 'updated_at',
+    )),
+    ('task', Task, 'project__organization', (
+        'id', 'project_id', 'title', 'description', 'status', 'assignee_email', 'due_date',
+        'created_at', 'updated_at',
+    )),
+    ('comment', TaskComment, 'task__project__organization', (
+        'id', 'task_id', 'content', 'author_email', 'created_at', 'updated_at',
+    )),
+)
+RECORD_TYPES = [name for name, _, _, _ in SECTIONS]
+
+CSV_COLUMNS = ['type']
+for _, _, _, fields in SECTIONS:
+    CSV_COLUMNS.extend(field for field in fields if field not in CSV_COLUMNS)
+
+
+def format_cursor(record_type, pk):
+    return f'{record_type}:{pk}'
+
+
+def parse_cursor(cursor):
+    """Return ``(section index, last id)`` for a ``type:id`` cursor."""
+    record_type, _, pk = (cursor or '').partition(':')
+    if record_type not in RECORD_TYPES or not pk.isdigit():
+        raise ExportError(f'Invalid cursor: {cursor!r}')
+    return RECORD_TYPES.index(record_type), int(pk)
+
+
+def iter_records(organization, after=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield ``(type, values)`` for every row of ``organization``, resuming after ``after``.
+
+    Each section is one keyset-ordered query read with ``iterator()``, so
+    rows are fetched ``chunk_size`` at a time (through a server-side cursor on
+    PostgreSQL) and memory stays flat whatever the tenant's size.
+    """
+    start, last_pk = parse_cursor(after) if after else (0, 0)
+    for index, (record_type, model, lookup, fields) in enumerate(SECTIONS):
+        if index < start:
+            continue
+        queryset = model.objects.filter(**{lookup: organization.pk})
+        if index == start and last_pk:
+            queryset = queryset.filter(pk__gt=last_pk)
+        rows = queryset.order_by('pk').values(*fields).iterator(chunk_size=chunk_size)
+        for values in rows:
+            yield record_type, values
+
+
+class ExportJSONEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder rounds datetimes to milliseconds; an export keeps
+    # them whole so keyset order survives a round trip.
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class NDJSONWriter:
+    def header(self):
+        return ''
+
+    def row(self, record_type, values):
+        return json.dumps({'type': record_type, **values}, cls=ExportJSONEncoder) + '\n'
+
+
+class CSVWriter:
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.DictWriter(self._buffer, CSV_COLUMNS, lineterminator='\n')
+
+    def _flush(self):
+        value = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return value
+
+    def header(self):
+        self._writer.writeheader()
+        return self._flush()
+
+    def row(self, record_type, values):
+        self._writer.writerow({'type': record_type, **{
+            name: value.isoformat() if hasattr(value, 'isoformat') else value
+            for name, value in values.items()
+        }})
+        return self._flush()
+
+
+def get_writer(format):
+    if format not in FORMATS:
+        raise ExportError(f'Unknown export format: {format!r}')
+    return NDJSONWriter() if format == 'ndjson' else CSVWriter()
+
+
+def export_organization(organization, format='ndjson', after=None, chunk_size=DEFAULT_CHUNK_SIZE, header=True):
+    """Yield the export as text blocks of up to ``chunk_size`` records."""
+    writer = get_writer(format)
+    block = [writer.header()] if header else []
+    for record_type, values in iter_records(organization, after, chunk_size):
+        block.append(writer.row(record_type, values))
+        if len(block) >= chunk_size:
+            yield ''.join(block)
+            block = []
+    if block:
+        yield ''.join(block)
+
+
+def read_records(stream, format):
+    """Yield ``(type, values)`` from an export read as a text stream, one record at a time."""
+    if format not in FORMATS:
+        raise ExportError(f'Unknown export format: {format!r}')
+    if format == 'ndjson':
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                values = json.loads(line)
+            except ValueError:
+                raise ExportError(f'Line {number} is not valid JSON')
+            yield values.pop('type', None), values
+        return
+
+    fields = {record_type: (model, names) for record_type, model, _, names in SECTIONS}
+    for row in csv.DictReader(stream):
+        record_type = row['type']
+        model, names = fields.get(record_type, (None, ()))
+        values = {}
+        for name in names:
+            value = row.get(name, '')
+            # CSV has no NULL: empty cells of nullable columns are None.
+            if value == '' and (name == 'id' or name.endswith('_id') or model._meta.get_field(name).null):
+                value = None
+            values[name] = value
+        yield record_type, values
+
+
+def resume_cursor(path, format):
+    """Return the cursor after the last complete record of a partial export file.
+
+    A trailing incomplete record is truncated so the file can be appended to.
+    Returns ``None`` when the file holds no records yet.
+    """
+    last_record = None
+    with open(path, 'rb+') as file:
+        pending, offset, end = b'', 0, 0
+        for line in file:
+            offset += len(line)
+            if not line.endswith(b'\n'):
+                break
+            pending += line
+            # A CSV record may span lines; it is complete once its quotes balance.
+            if format == 'csv' and pending.count(b'"') % 2:
+                continue
+            last_record, end, pending = pending, offset, b''
+        file.truncate(end)
+    if last_record is None:
+        return None
+    if format == 'ndjson':
+        record = json.loads(last_record)
+        return format_cursor(record['type'], record['id'])
+    record = next(csv.reader(io.StringIO(last_record.decode())))
+    if record[0] == 'type':
+        return None
+    return format_cursor(record[0], record[1])
@@ -0,0 +1,216 @@
+import io
+import time
+from collections import Counter
+
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+from .models import Organization, OrganizationStats, Project, Task, TaskComment, organization_counts
+from .response_cache import invalidate_organization
+
+DEFAULT_BATCH_SIZE = 5000
+
+MODELS = {
+    'organization': Organization,
+    'project': Project,
+    'task': Task,
+    'comment': TaskComment,
+}
+# Record type -> (foreign key field, record type it points at).
+PARENTS = {
+    'task': ('project_id', 'project'),
+    'comment': ('task_id', 'task'),
+}
+
+
+class OrganizationImportError(ValueError):
+    pass
+
+
+def copy_value(value):
+    # COPY's CSV format reads an unquoted empty field as NULL and a quoted
+    # one as the empty string.
+    if value is None:
+        return ''
+    return '"{}"'.format(str(value).replace('"', '""'))
+
+
+class OrganizationImporter:
+    """Load an export (see ``projects.export``) into a new organization.
+
+    Records are buffered per type and written ``batch_size`` at a time, each
+    batch in its own transaction, so memory stays flat apart from the maps of
+    exported id -> new id used to point tasks at projects and comments at
+    tasks. Batches are written with multi-row ``INSERT ... RETURNING``, or
+    ``COPY`` on PostgreSQL, skipping model instances; timestamps are kept as
+    exported, and task counters and organization stats are updated per batch.
+
+    A failed import leaves the batches written so far; delete the
+    organization and run it again.
+    """
+
+    def __init__(self, slug=None, batch_size=DEFAULT_BATCH_SIZE, using='default', use_copy=None, progress=None):
+        self.slug = slug
+        self.batch_size = batch_size
+        self.connection = connections[using]
+        if not self.connection.features.can_return_rows_from_bulk_insert:
+            raise OrganizationImportError(f'Importing is not supported on {self.connection.vendor}')
+        self.use_copy = self.connection.vendor == 'postgresql' if use_copy is None else use_copy
+        self.progress = progress
+        self.organization = None
+        self.ids = {record_type: {} for record_type in MODELS}
+        self.counts = Counter()
+        self.started = None
+        self._type = None
+        self._pending = []
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started if self.started else 0.0
+
+    @property
+    def rate(self):
+        elapsed = self.elapsed
+        return self.total / elapsed if elapsed else 0.0
+
+    def run(self, records):
+        """Import ``(type, values)`` records in export order and return the new organization."""
+        self.started = time.perf_counter()
+        for record_type, values in records:
+            if record_type not in MODELS:
+                raise OrganizationImportError(f'Unknown record type: {record_type!r}')
+            if record_type != self._type:
+                self.flush()
+                self._type = record_type
+            self._pending.append(values)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+        self.flush()
+        if self.organization is None:
+            raise OrganizationImportError('The export holds no organization record')
+        invalidate_organization(self.organization.slug)
+        return self.organization
+
+    def flush(self):
+        if not self._pending:
+            return
+        record_type, rows, self._pending = self._type, self._pending, []
+        if record_type == 'organization':
+            for values in rows:
+                self._create_organization(values)
+        else:
+            model = MODELS[record_type]
+            rows = [self._resolve(record_type, values) for values in rows]
+            with transaction.atomic(using=self.connection.alias):
+                pks = self._write(model, rows)
+                if model is Project:
+                    counts = Counter()
+                    for values in rows:
+                        counts.update(organization_counts(self.organization.pk, values.get('status', 'ACTIVE'), values))
+                    OrganizationStats.objects.using(self.connection.alias).apply_deltas(counts)
+                elif model is Task:
+                    Project.objects.using(self.connection.alias).apply_task_count_deltas(
+                        Counter((values['project_id'], values['status']) for values in rows)
+                    )
+            self.ids[record_type].update(zip((int(values['id']) for values in rows), pks))
+        self.counts[record_type] += len(rows)
+        if self.progress:
+            self.progress(self)
+
+    def _create_organization(self, values):
+        if self.organization is not None:
+            raise OrganizationImportError('The export holds more than one organization record')
+        values = dict(values)
+        if self.slug:
+            values['slug'] = self.slug
+        try:
+            with transaction.atomic(using=self.connection.alias):
+                pk, = self._write(Organization, [values])
+                OrganizationStats.objects.using(self.connection.alias).create(organization_id=pk)
+        except IntegrityError:
+            raise OrganizationImportError(f'Organization "{values.get("slug")}" already exists')
+        self.organization = Organization.objects.using(self.connection.alias).get(pk=pk)
+
+    def _resolve(self, record_type, values):
+        """Point a record at its new parent."""
+        values = dict(values)
+        if record_type == 'project':
+            if self.organization is None:
+                raise OrganizationImportError('Projects must follow the organization record')
+            values['organization_id'] = self.organization.pk
+        else:
+            field, parent = PARENTS[record_type]
+            try:
+                values[field] = self.ids[parent][int(values[field])]
+            except (KeyError, TypeError, ValueError):
+                raise OrganizationImportError(f'{record_type} points at unknown {parent} {values.get(field)!r}')
+        return values
+
+    def _write(self, model, rows):
+        """Insert ``rows`` (exported values keyed by attname) and return their new ids in order."""
+        fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+        now = timezone.now()
+        prepared = []
+        for values in rows:
+            row = []
+            for field in fields:
+                if field.attname in values:
+                    value = values[field.attname]
+                elif getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                    value = now
+                else:
+                    value = field.get_default()
+                row.append(field.get_db_prep_save(value, self.connection))
+            prepared.append(row)
+        if self.use_copy:
+            return self._copy(model, fields, prepared)
+        return self._insert(model, fields, prepared)
+
+    def _insert(self, model, fields, prepared):
+        meta = model._meta
+        quote_name = self.connection.ops.quote_name
+        columns = ', '.join(quote_name(field.column) for field in fields)
+        placeholder = '({})'.format(', '.join(['%s'] * len(fields)))
+        batch_size = max(self.connection.ops.bulk_batch_size(fields, prepared), 1)
+        pks = []
+        with self.connection.cursor() as cursor:
+            for start in range(0, len(prepared), batch_size):
+                chunk = prepared[start:start + batch_size]
+                cursor.execute(
+                    f'INSERT INTO {quote_name(meta.db_table)} ({columns}) '
+                    f'VALUES {", ".join([placeholder] * len(chunk))} RETURNING {quote_name(meta.pk.column)}',
+                    [value for row in chunk for value in row],
+                )
+                # New ids increase along the VALUES list, whatever order
+                # RETURNING reports them in.
+                pks.extend(sorted(pk for pk, in cursor.fetchall()))
+        return pks
+
+    def _copy(self, model, fields, prepared):
+        """Write rows with ``COPY ... FROM STDIN``.
+
+        ``COPY`` returns no ids, so they are drawn from the table's sequence
+        first and written along with the rows.
+        """
+        meta = model._meta
+        quote_name = self.connection.ops.quote_name
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+                [meta.db_table, meta.pk.column, len(prepared)],
+            )
+            pks = sorted(pk for pk, in cursor.fetchall())
+            buffer = io.StringIO()
+            for pk, row in zip(pks, prepared):
+                buffer.write(','.join(copy_value(value) for value in [pk, *row]))
+                buffer.write('\n')
+            buffer.seek(0)
+            columns = ', '.join(quote_name(field.column) for field in [meta.pk, *fields])
+            cursor.cursor.copy_expert(
+                f'COPY {quote_name(meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)', buffer
+            )
+        return pks
@@ -0,0 +1,252 @@
+import bisect
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager, contextmanager
+from inspect import isawaitable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Operation names come from clients; past this many distinct names new ones
+# are recorded as "other" to keep the number of series bounded.
+MAX_OPERATIONS = 200
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        return zip([*self.buckets, '+Inf'], itertools.accumulate(self.counts))
+
+
+class Sample:
+    """Timings collected while executing one sampled operation.
+
+    Also used as a database ``execute_wrapper`` to count and time SQL.
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.started = time.perf_counter()
+        self.duration = None
+        self.resolvers = []
+        self.sql_count = 0
+        self.sql_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_count += 1
+            self.sql_time += time.perf_counter() - start
+
+    def add_resolver(self, info, duration):
+        path = '.'.join(key for key in info.path.as_list() if isinstance(key, str))
+        self.resolvers.append((f'{info.parent_type.name}.{info.field_name}', path, duration))
+
+    async def time_awaitable(self, awaitable, info, start):
+        try:
+            return await awaitable
+        finally:
+            self.add_resolver(info, time.perf_counter() - start)
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.started
+
+
+class Metrics:
+    """Process-local aggregate of sampled operations, rendered for Prometheus.
+
+    Each worker process keeps its own metrics, so scrape every process (or
+    aggregate across them) when running several.
+    """
+
+    def __init__(self, slowest=20):
+        self.slowest_size = slowest
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.resolvers = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+            self.operations = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+            self.sql_counts = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+            self.sql_times = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+            # Min-heap of (duration, sequence, field, path, operation).
+            self.slowest = []
+            self._sequence = itertools.count()
+
+    def record(self, sample):
+        with self._lock:
+            operation = sample.operation
+            if operation not in self.operations and len(self.operations) >= MAX_OPERATIONS:
+                operation = 'other'
+            self.operations[operation].observe(sample.duration)
+            self.sql_counts[operation].observe(sample.sql_count)
+            self.sql_times[operation].observe(sample.sql_time)
+            for field, path, duration in sample.resolvers:
+                self.resolvers[field].observe(duration)
+                entry = (duration, next(self._sequence), field, path, operation)
+                if len(self.slowest) < self.slowest_size:
+                    heapq.heappush(self.slowest, entry)
+                elif duration > self.slowest[0][0]:
+                    heapq.heapreplace(self.slowest, entry)
+
+    def slowest_resolvers(self):
+        with self._lock:
+            return [
+                {'field': field, 'path': path, 'operation': operation, 'duration': duration}
+                for duration, _, field, path, operation in sorted(self.slowest, reverse=True)
+            ]
+
+    def render(self):
+        """Return the metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            lines.append('# HELP graphql_instrumentation_sample_rate Fraction of operations sampled.')
+            lines.append('# TYPE graphql_instrumentation_sample_rate gauge')
+            lines.append(f'graphql_instrumentation_sample_rate {get_sample_rate()}')
+            self._render_histograms(
+                lines, 'graphql_resolver_duration_seconds', 'Resolver latency of sampled operations.',
+                'field', self.resolvers,
+            )
+            self._render_histograms(
+                lines, 'graphql_operation_duration_seconds', 'Execution time of sampled operations.',
+                'operation', self.operations,
+            )
+            self._render_histograms(
+                lines, 'graphql_operation_sql_queries', 'SQL queries per sampled operation.',
+                'operation', self.sql_counts,
+            )
+            self._render_histograms(
+                lines, 'graphql_operation_sql_duration_seconds', 'SQL time per sampled operation.',
+                'operation', self.sql_times,
+            )
+            lines.append('# HELP graphql_slowest_resolver_duration_seconds Slowest sampled resolver calls.')
+            lines.append('# TYPE graphql_slowest_resolver_duration_seconds gauge')
+            for duration, _, field, path, operation in sorted(self.slowest, reverse=True):
+                labels = format_labels(field=field, path=path, operation=operation)
+                lines.append(f'graphql_slowest_resolver_duration_seconds{{{labels}}} {duration}')
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _render_histograms(lines, name, help_text, label, histograms):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for value, histogram in sorted(histograms.items()):
+            for bound, count in histogram.cumulative():
+                labels = format_labels(**{label: value, 'le': bound})
+                lines.append(f'{name}_bucket{{{labels}}} {count}')
+            labels = format_labels(**{label: value})
+            lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+
+def format_labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+
+class InstrumentationMiddleware:
+    """Graphene middleware timing the resolvers of sampled operations.
+
+    ``GraphQLView`` leaves it out of the middleware chain for operations that
+    are not sampled, so unsampled requests pay nothing per resolver.
+    """
+
+    def resolve(self, next, root, info, **args):
+        sample = getattr(info.context, 'graphql_sample', None)
+        if sample is None:
+            return next(root, info, **args)
+        start = time.perf_counter()
+        result = next(root, info, **args)
+        if isawaitable(result):
+            return sample.time_awaitable(result, info, start)
+        sample.add_resolver(info, time.perf_counter() - start)
+        return result
+
+
+def get_sample_rate():
+    return getattr(settings, 'GRAPHQL_INSTRUMENTATION_SAMPLE_RATE', 0)
+
+
+def start_sample(request, operation_name):
+    """Decide whether to sample this operation; sets ``request.graphql_sample``."""
+    rate = get_sample_rate()
+    sampled = rate >= 1 or (rate > 0 and random.random() < rate)
+    request.graphql_sample = Sample(operation_name or 'anonymous') if sampled else None
+    return request.graphql_sample
+
+
+def _finish(sample):
+    sample.finish()
+    get_metrics().record(sample)
+
+
+@contextmanager
+def sampling(request):
+    """Count and time SQL for the sampled operation run inside the block."""
+    sample = getattr(request, 'graphql_sample', None)
+    if sample is None:
+        yield
+        return
+    with connection.execute_wrapper(sample):
+        yield
+    _finish(sample)
+
+
+def _add_wrapper(sample):
+    connection.execute_wrappers.append(sample)
+
+
+def _remove_wrapper(sample):
+    connection.execute_wrappers.remove(sample)
+
+
+@asynccontextmanager
+async def sampling_async(request):
+    """``sampling`` for async execution.
+
+    The async ORM runs queries in the request's thread-sensitive executor,
+    whose connection differs from the event loop thread's, so the wrapper
+    is installed from there.
+    """
+    sample = getattr(request, 'graphql_sample', None)
+    if sample is None:
+        yield
+        return
+    await sync_to_async(_add_wrapper)(sample)
+    try:
+        yield
+    finally:
+        await sync_to_async(_remove_wrapper)(sample)
+    _finish(sample)
+
+
+_metrics = None
+
+
+def get_metrics():
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics(getattr(settings, 'GRAPHQL_INSTRUMENTATION_SLOWEST', 20))
+    return _metrics
@@ -0,0 +1,267 @@
+import asyncio
+from collections import defaultdict
+
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from graphql import OperationType
+
+from .cost import LIST_SIZES, list_too_long
+from .models import Organization, OrganizationStats, Project, Task, TaskComment
+from .selection import get_operation_columns
+
+
+class DataLoader:
+    """Per-request loader that batches keys into a single query.
+
+    Synchronous resolution cannot defer work, so keys are batched by
+    scheduling: whenever a list of instances is resolved, the loaders for
+    their relations are told which keys are coming (see ``Loaders.register``).
+    The first ``load`` call then fetches every pending key with one
+    ``IN (...)`` query and serves the remaining siblings from the cache.
+
+    Under async execution ``load`` returns a future instead, and every key
+    requested before the event loop next runs is fetched in the same batch.
+    """
+    default = None
+
+    def __init__(self, loaders):
+        self.loaders = loaders
+        self._cache = {}
+        self._pending = set()
+        self._futures = {}
+
+    def get_batch_queryset(self, keys):
+        raise NotImplementedError
+
+    def group_results(self, keys, rows):
+        """Return a dict mapping each key to its value."""
+        raise NotImplementedError
+
+    def batch_load(self, keys):
+        rows = list(self.get_batch_queryset(keys))
+        self.loaders.register(rows)
+        return self.group_results(keys, rows)
+
+    async def batch_load_async(self, keys):
+        rows = [row async for row in self.get_batch_queryset(keys)]
+        self.loaders.register(rows)
+        return self.group_results(keys, rows)
+
+    def schedule(self, keys):
+        self._pending.update(key for key in keys if key not in self._cache)
+
+    def prime(self, key, value):
+        self._cache.setdefault(key, value)
+
+    def _take_pending(self, keys):
+        keys = self._pending | set(keys)
+        self._pending = set()
+        return keys
+
+    def _store(self, keys, results):
+        for k in keys:
+            self._cache[k] = results.get(k, self.default)
+
+    def load(self, key):
+        if self.loaders.is_async:
+            return self._load_async(key)
+        if key not in self._cache:
+            keys = self._take_pending([key])
+            self._store(keys, self.batch_load(keys))
+        return self._cache[key]
+
+    def _load_async(self, key):
+        if key in self._cache:
+            return self._cache[key]
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._futures:
+                loop.call_soon(lambda: loop.create_task(self._dispatch()))
+            future = self._futures[key] = loop.create_future()
+        return future
+
+    async def _dispatch(self):
+        futures, self._futures = self._futures, {}
+        keys = self._take_pending(futures)
+        try:
+            results = await self.batch_load_async(keys)
+        except Exception as error:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(error)
+            return
+        self._store(keys, results)
+        for key, future in futures.items():
+            if not future.done():
+                future.set_result(self._cache[key])
+
+
+class GroupedLoader(DataLoader):
+    """Loads the reverse side of a foreign key, grouped by the parent id.
+
+    A parent with more rows than the ``LIST_SIZES`` entry of ``list_field``
+    gets ``list_too_long`` instead, so at most one row over that size is read
+    per parent.
+    """
+    model = None
+    fk_field = None
+    list_field = None
+
+    def get_queryset(self):
+        return self.loaders.prune(self.model.objects.all())
+
+    def get_batch_queryset(self, keys):
+        queryset = self.get_queryset().filter(**{f'{self.fk_field}__in': keys})
+        if self.list_field is None:
+            return queryset
+        return queryset.annotate(group_position=Window(
+            RowNumber(), partition_by=F(self.fk_field), order_by=[*self.model._meta.ordering, 'pk'],
+        )).filter(group_position__lte=LIST_SIZES[self.list_field] + 1)
+
+    def group_results(self, keys, rows):
+        grouped = defaultdict(list)
+        for row in rows:
+            grouped[getattr(row, self.fk_field)].append(row)
+        if self.list_field is not None:
+            limit = LIST_SIZES[self.list_field]
+            for key, group in grouped.items():
+                if len(group) > limit:
+                    grouped[key] = list_too_long(self.list_field)
+        return {key: grouped[key] for key in keys}
+
+
+class InstanceLoader(DataLoader):
+    """Loads instances of ``model`` by primary key."""
+    model = None
+
+    def get_batch_queryset(self, keys):
+        return self.loaders.prune(self.model.objects.filter(pk__in=keys))
+
+    def group_results(self, keys, rows):
+        return {row.pk: row for row in rows}
+
+
+class OrganizationLoader(InstanceLoader):
+    model = Organization
+
+
+class ProjectLoader(InstanceLoader):
+    model = Project
+
+
+class TaskLoader(InstanceLoader):
+    model = Task
+
+
+class OrganizationStatsLoader(InstanceLoader):
+    """Stats rows keyed by organization id; ``None`` for organizations without one."""
+    model = OrganizationStats
+
+
+class OverdueCountsLoader(DataLoader):
+    """``(overdue projects, overdue tasks)`` per organization id, counted through the partial due_date indexes."""
+    default = (0, 0)
+
+    def get_batch_querysets(self, keys):
+        projects = Project.objects.filter(organization_id__in=keys).overdue()
+        tasks = Task.objects.filter(project__organization_id__in=keys).overdue()
+        return (
+            projects.order_by().values_list('organization_id').annotate(n=Count('pk')),
+            tasks.order_by().values_list('project__organization_id').annotate(n=Count('pk')),
+        )
+
+    def group_counts(self, keys, project_rows, task_rows):
+        projects, tasks = dict(project_rows), dict(task_rows)
+        return {key: (projects.get(key, 0), tasks.get(key, 0)) for key in keys}
+
+    def batch_load(self, keys):
+        projects, tasks = self.get_batch_querysets(keys)
+        return self.group_counts(keys, list(projects), list(tasks))
+
+    async def batch_load_async(self, keys):
+        projects, tasks = self.get_batch_querysets(keys)
+        return self.group_counts(keys, [row async for row in projects], [row async for row in tasks])
+
+
+class OrganizationProjectsLoader(GroupedLoader):
+    model = Project
+    fk_field = 'organization_id'
+    list_field = 'OrganizationType.projects'
+
+
+class ProjectTasksLoader(GroupedLoader):
+    model = Task
+    fk_field = 'project_id'
+    list_field = 'ProjectType.tasks'
+
+
+class TaskCommentsLoader(GroupedLoader):
+    model = TaskComment
+    fk_field = 'task_id'
+    list_field = 'TaskType.comments'
+
+
+class Loaders:
+    """The set of loaders shared by all resolvers of one request."""
+
+    def __init__(self, is_async=False):
+        self.is_async = is_async
+        self.columns = {}
+        self._operation = None
+        self.organization = OrganizationLoader(self)
+        self.organization_stats = OrganizationStatsLoader(self)
+        self.overdue_counts = OverdueCountsLoader(self)
+        self.project = ProjectLoader(self)
+        self.task = TaskLoader(self)
+        self.organization_projects = OrganizationProjectsLoader(self)
+        self.project_tasks = ProjectTasksLoader(self)
+        self.task_comments = TaskCommentsLoader(self)
+
+    def plan(self, info):
+        """Work out the columns the query being executed reads from each model.
+
+        Mutations load whole rows, as the instances they change are saved.
+        """
+        if info.operation is not self._operation:
+            self._operation = info.operation
+            is_query = info.operation.operation == OperationType.QUERY
+            self.columns = get_operation_columns(info) if is_query else {}
+
+    def prune(self, queryset):
+        """Limit ``queryset`` to the columns the operation reads from its model."""
+        fields = self.columns.get(queryset.model)
+        return queryset if fields is None else queryset.only(*fields)
+
+    def register(self, instances):
+        """Prime the loaders with resolved instances and schedule their relations."""
+        for instance in instances:
+            if isinstance(instance, Organization):
+                self.organization.prime(instance.pk, instance)
+                self.organization_projects.schedule([instance.pk])
+                self.organization_stats.schedule([instance.pk])
+                self.overdue_counts.schedule([instance.pk])
+            elif isinstance(instance, Project):
+                self.project.prime(instance.pk, instance)
+                self.organization.schedule([instance.organization_id])
+                self.project_tasks.schedule([instance.pk])
+            elif isinstance(instance, Task):
+                self.task.prime(instance.pk, instance)
+                self.project.schedule([instance.project_id])
+                self.task_comments.schedule([instance.pk])
+            elif isinstance(instance, TaskComment):
+                self.task.schedule([instance.task_id])
+        return instances
+
+
+def get_loaders(info):
+    """Return the loaders bound to the current request, creating them on first use."""
+    context = info.context
+    if context is None:
+        return Loaders()
+    loaders = getattr(context, 'loaders', None)
+    if loaders is None:
+        loaders = Loaders()
+        context.loaders = loaders
+    loaders.plan(info)
+    return loaders
@@ -0,0 +1,81 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from projects.benchmarks import (
+    SCALES,
+    BenchmarkError,
+    Runner,
+    compare_results,
+    get_environment,
+    get_fixture,
+    load_operations,
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the frontend GraphQL operations against generated datasets of several sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales', default='small,medium',
+            help=f'Comma-separated dataset sizes ({", ".join(SCALES)})'
+        )
+        parser.add_argument('--operations', help='Comma-separated operations to run (default: all)')
+        parser.add_argument('--iterations', type=int, default=20, help='Timed runs per operation')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed runs per operation')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--compare', help='Baseline results file to compare against')
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Allowed p95 latency increase over the baseline, as a fraction'
+        )
+
+    def handle(self, *args, **options):
+        scales = [scale.strip() for scale in options['scales'].split(',') if scale.strip()]
+        unknown = [scale for scale in scales if scale not in SCALES]
+        if unknown:
+            raise CommandError(f'Unknown scale: {", ".join(unknown)}')
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be positive')
+
+        operations = load_operations()
+        if options['operations']:
+            names = set(options['operations'].split(','))
+            operations = [operation for operation in operations if operation.name in names]
+        if not operations:
+            raise CommandError('No operations to run')
+
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as file:
+                baseline = json.load(file)
+
+        runner = Runner(options['iterations'], options['warmup'])
+        results = {'environment': get_environment(), 'results': []}
+        for scale in scales:
+            fixture = get_fixture(scale)
+            self.stdout.write(f'{scale} ({fixture.rows:,} rows)')
+            for operation in operations:
+                try:
+                    result = runner.run(operation, fixture)
+                except BenchmarkError as error:
+                    raise CommandError(str(error))
+                results['results'].append(result)
+                self.stdout.write(
+                    f'  {operation.name:<18} p50 {result["p50_ms"]:8.2f}ms  p95 {result["p95_ms"]:8.2f}ms  '
+                    f'{result["sql_queries"]:3d} queries  {result["peak_memory_kib"]:9.1f} KiB'
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(results, file, indent=2)
+                file.write('\n')
+            self.stdout.write(f'Wrote results to {options["output"]}')
+
+        if baseline is not None:
+            regressions = compare_results(baseline, results, options['threshold'])
+            for scale, operation, reason in regressions:
+                self.stdout.write(self.style.ERROR(f'{scale} {operation}: {reason}'))
+            if regressions:
+                raise CommandError(f'{len(regressions)} regression(s) against {options["compare"]}')
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {options["compare"]}'))
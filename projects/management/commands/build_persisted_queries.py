@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from graphql import GraphQLError, parse, print_ast, validate
+from projects.documents import get_frontend_documents_dir, hash_query, load_frontend_documents
+from projects.schema import schema
+
+
+class Command(BaseCommand):
+    help = 'Collect the frontend GraphQL documents into the persisted query manifest'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            default=str(get_frontend_documents_dir()),
+            help='Directory containing the gql`...` documents'
+        )
+        parser.add_argument(
+            '--output',
+            default=str(settings.GRAPHQL_PERSISTED_QUERIES_FILE),
+            help='Manifest file to write'
+        )
+
+    def handle(self, *args, **options):
+        source = Path(options['source'])
+        if not source.is_dir():
+            raise CommandError(f'{source} is not a directory')
+
+        manifest = {}
+        for filename, name, text in load_frontend_documents(source):
+            try:
+                document = parse(text)
+            except GraphQLError as error:
+                self.stderr.write(f'Skipping {name} ({filename}): {error.message}')
+                continue
+            errors = validate(schema.graphql_schema, document)
+            if errors:
+                self.stderr.write(f'Skipping {name} ({filename}): {errors[0].message}')
+                continue
+            query = print_ast(document)
+            manifest[hash_query(query)] = query
+            self.stdout.write(f'{hash_query(query)}  {name}')
+
+        with open(options['output'], 'w') as output:
+            json.dump(manifest, output, indent=2, sort_keys=True)
+            output.write('\n')
+        self.stdout.write(self.style.SUCCESS(f'Wrote {len(manifest)} persisted queries to {options["output"]}'))
@@ -0,0 +1,100 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from projects.loaders import Loaders
+from projects.models import Organization, Project, Task, TaskComment
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the queries issued by projects/schema.py and check they use the expected indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the full plan of every query')
+
+    def get_access_paths(self):
+        """(label, queryset, acceptable indexes) for each hot query in the GraphQL layer."""
+        loaders = Loaders()
+        organization_id = Organization.objects.values_list('pk', flat=True).first() or 0
+        project_ids = list(Project.objects.values_list('pk', flat=True)[:20]) or [0]
+        task_ids = list(Task.objects.values_list('pk', flat=True)[:20]) or [0]
+        return [
+            (
+                'Query.projects(organizationSlug)',
+                Project.objects.filter(organization_id=organization_id).order_by('-created_at'),
+                ('projects_org_created_idx',),
+            ),
+            (
+                'Project.tasks',
+                loaders.project_tasks.get_batch_queryset(project_ids),
+                # An IN (...) batch is sorted after the lookup, so either
+                # project-leading index serves it.
+                ('tasks_project_created_idx', 'tasks_project_status_idx'),
+            ),
+            (
+                'Query.tasks(projectId)',
+                Task.objects.filter(project_id=project_ids[0]).order_by('-created_at', '-pk')[:21],
+                ('tasks_project_created_idx',),
+            ),
+            (
+                'ProjectQuerySet.with_task_stats (counter rebuild)',
+                Project.objects.filter(pk__in=project_ids).with_task_stats().order_by(),
+                ('tasks_project_status_idx',),
+            ),
+            (
+                'Task.comments',
+                loaders.task_comments.get_batch_queryset(task_ids),
+                ('task_comments_task_created_idx',),
+            ),
+            (
+                'Query.comments(taskId)',
+                TaskComment.objects.filter(task_id=task_ids[0]).order_by('-created_at', '-pk')[:21],
+                ('task_comments_task_created_idx',),
+            ),
+            (
+                'open tasks past due_date',
+                Task.objects.overdue(),
+                ('tasks_open_due_date_idx',),
+            ),
+            (
+                'Query.overdueTasks(organizationSlug)',
+                Task.objects.filter(project__organization_id=organization_id).overdue().order_by('-created_at', '-pk')[:21],
+                # Depending on how many projects the organization has, the
+                # planner starts from its projects or from the overdue tasks.
+                ('tasks_project_open_due_idx', 'tasks_open_due_date_idx'),
+            ),
+            (
+                'Query.overdueProjects(organizationSlug)',
+                Project.objects.filter(organization_id=organization_id).overdue().order_by('due_date', 'pk'),
+                ('projects_org_open_due_idx',),
+            ),
+        ]
+
+    def explain(self, queryset):
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Small tables are cheaper to scan sequentially; we want to know
+                # whether the index is usable, not whether it wins on this data.
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            # QuerySet.explain() does not support the subquery Django 4.2
+            # builds to filter on a window function (see GroupedLoader.limit).
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+                return '\n'.join(' '.join(str(value) for value in row) for row in cursor.fetchall())
+
+    def handle(self, *args, **options):
+        missing = []
+        for label, queryset, indexes in self.get_access_paths():
+            plan = self.explain(queryset)
+            used = next((index for index in indexes if index in plan), None)
+            if used:
+                self.stdout.write(self.style.SUCCESS(f'OK    {label}: uses {used}'))
+            else:
+                missing.append(label)
+                self.stdout.write(self.style.ERROR(f'MISS  {label}: expected {" or ".join(indexes)}'))
+            if options['verbose_plans'] or not used:
+                self.stdout.write(plan)
+
+        if missing:
+            raise CommandError(f'{len(missing)} access path(s) do not use their index: {", ".join(missing)}')
+        self.stdout.write(self.style.SUCCESS('All access paths use their indexes.'))
@@ -0,0 +1,52 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from projects.export import DEFAULT_CHUNK_SIZE, FORMATS, ExportError, export_organization, resume_cursor
+from projects.models import Organization
+
+
+class Command(BaseCommand):
+    help = "Stream an organization's projects, tasks and comments as NDJSON or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument('slug', help='Organization to export')
+        parser.add_argument('--format', choices=FORMATS, default='ndjson')
+        parser.add_argument('--output', help='File to write (default: stdout)')
+        parser.add_argument('--after', help='Resume after this type:id cursor')
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Continue a partial --output file from its last complete record'
+        )
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows fetched per round trip')
+
+    def handle(self, *args, **options):
+        try:
+            organization = Organization.objects.get(slug=options['slug'])
+        except Organization.DoesNotExist:
+            raise CommandError(f'Organization "{options["slug"]}" does not exist')
+
+        output, after = options['output'], options['after']
+        appending = False
+        if options['resume']:
+            if not output:
+                raise CommandError('--resume requires --output')
+            if os.path.exists(output):
+                after = resume_cursor(output, options['format']) or after
+                appending = os.path.getsize(output) > 0
+        elif after and output and os.path.exists(output):
+            appending = True
+
+        stream = open(output, 'a' if appending else 'w', newline='') if output else None
+        try:
+            for block in export_organization(
+                organization, options['format'], after, options['chunk_size'], header=not appending
+            ):
+                if stream:
+                    stream.write(block)
+                else:
+                    self.stdout.write(block, ending='')
+        except ExportError as error:
+            raise CommandError(str(error))
+        finally:
+            if stream:
+                stream.close()
@@ -0,0 +1,85 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from projects.importer import DEFAULT_BATCH_SIZE, OrganizationImporter, OrganizationImportError
+from projects.models import Organization, Task
+from projects.synthetic import DatasetSpec, generate_organization, parse_mix
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic synthetic dataset of organizations, projects, tasks and comments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organizations', type=int, default=1)
+        parser.add_argument('--projects', type=int, default=10, help='Projects per organization')
+        parser.add_argument('--tasks', type=int, default=100, help='Tasks per project')
+        parser.add_argument('--comments', type=int, default=2, help='Comments per task')
+        parser.add_argument(
+            '--status-mix', default='TODO=50,IN_PROGRESS=30,DONE=20',
+            help='Relative weights of task statuses'
+        )
+        parser.add_argument(
+            '--due-date-skew', type=float, default=0.2,
+            help='Fraction of due dates in the past (0.5 spreads them evenly around today)'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--prefix', default='synthetic', help='Organization slugs are <prefix>-1, <prefix>-2, ...')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows written per transaction')
+        parser.add_argument('--database', default='default', help='Database alias to load into')
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Write multi-row INSERT ... RETURNING statements even on PostgreSQL instead of COPY'
+        )
+
+    def handle(self, *args, **options):
+        if options['organizations'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--organizations and --batch-size must be positive')
+        if min(options['projects'], options['tasks'], options['comments']) < 0:
+            raise CommandError('--projects, --tasks and --comments must not be negative')
+        if not 0 <= options['due_date_skew'] <= 1:
+            raise CommandError('--due-date-skew must be between 0 and 1')
+        try:
+            status_mix = parse_mix(options['status_mix'], dict(Task.STATUS_CHOICES))
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        spec = DatasetSpec(
+            organizations=options['organizations'],
+            projects=options['projects'],
+            tasks=options['tasks'],
+            comments=options['comments'],
+            status_mix=status_mix,
+            due_date_skew=options['due_date_skew'],
+            seed=options['seed'],
+            prefix=options['prefix'],
+        )
+        slugs = [spec.slug(index) for index in range(spec.organizations)]
+        existing = Organization.objects.using(options['database']).filter(slug__in=slugs)
+        if existing.exists():
+            raise CommandError(
+                f'Organizations with prefix "{spec.prefix}" already exist; delete them or pass another --prefix'
+            )
+
+        self.stdout.write(f'Generating {spec.total_rows:,} rows in {spec.organizations} organizations...')
+        started, total = time.perf_counter(), 0
+        for index in range(spec.organizations):
+            importer = OrganizationImporter(
+                batch_size=options['batch_size'],
+                using=options['database'],
+                use_copy=False if options['no_copy'] else None,
+                progress=self.report if options['verbosity'] > 1 else None,
+            )
+            try:
+                organization = importer.run(generate_organization(spec, index))
+            except OrganizationImportError as error:
+                raise CommandError(str(error))
+            total += importer.total
+            self.stdout.write(f'  {organization.slug}: {importer.total:,} rows ({importer.rate:,.0f} rows/s)')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {total:,} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} rows/s)'
+        ))
+
+    def report(self, importer):
+        self.stdout.write(f'    {importer.total:,} rows, {importer.rate:,.0f} rows/s')
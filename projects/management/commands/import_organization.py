@@ -0,0 +1,52 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from projects.export import FORMATS, ExportError, read_records
+from projects.importer import DEFAULT_BATCH_SIZE, OrganizationImporter, OrganizationImportError
+
+
+class Command(BaseCommand):
+    help = 'Load an NDJSON or CSV organization export into a new organization'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='Export file to read ("-" for stdin)')
+        parser.add_argument('--format', choices=FORMATS, help='Export format (default: from the file extension)')
+        parser.add_argument('--slug', help='Slug for the new organization (default: the exported one)')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows written per transaction')
+        parser.add_argument('--database', default='default', help='Database alias to load into')
+        parser.add_argument(
+            '--no-copy', action='store_true',
+            help='Write multi-row INSERT ... RETURNING statements even on PostgreSQL instead of COPY'
+        )
+
+    def handle(self, *args, **options):
+        path = options['input']
+        format = options['format'] or ('csv' if path.endswith('.csv') else 'ndjson')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        importer = OrganizationImporter(
+            slug=options['slug'],
+            batch_size=options['batch_size'],
+            using=options['database'],
+            use_copy=False if options['no_copy'] else None,
+            progress=self.report if options['verbosity'] > 1 else None,
+        )
+        stream = sys.stdin if path == '-' else open(path, newline='')
+        try:
+            organization = importer.run(read_records(stream, format))
+        except (ExportError, OrganizationImportError) as error:
+            raise CommandError(str(error))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for record_type, count in importer.counts.items():
+            self.stdout.write(f'  {record_type}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {importer.total} rows into "{organization.slug}" '
+            f'in {importer.elapsed:.1f}s ({importer.rate:,.0f} rows/s)'
+        ))
+
+    def report(self, importer):
+        self.stdout.write(f'{importer.total} rows, {importer.rate:,.0f} rows/s')
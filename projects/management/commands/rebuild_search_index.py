@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from projects.search import BACKENDS
+
+
+class Command(BaseCommand):
+    help = 'Recreate the full-text search index objects and repopulate the index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias to rebuild')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        backend_class = BACKENDS.get(connection.vendor)
+        if backend_class is None:
+            raise CommandError(f'Search is not supported on {connection.vendor}')
+        backend = backend_class(connection)
+        # SQLite drops triggers when a migration rebuilds a table, so install
+        # again before repopulating.
+        with transaction.atomic(using=connection.alias):
+            backend.install()
+            backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the {connection.vendor} search index'))
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = 'Recount tasks per project and repair the denormalized task counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Report drift without writing; exit non-zero if any is found')
+        parser.add_argument('--batch-size', type=int, default=500, help='Projects recounted per transaction')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        counters = {
+            'todo_task_count': 'task_todo',
+            'in_progress_task_count': 'task_in_progress',
+            'done_task_count': 'task_completed',
+        }
+        checked = drifted = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                # Lock the batch first: concurrent task writes then either
+                # commit before the recount or apply their F() delta after
+                # the repaired value is written.
+                projects = Project.objects.filter(pk__gt=last_pk).order_by('pk')
+                if not options['check']:
+                    projects = projects.select_for_update()
+                pks = list(projects.values_list('pk', flat=True)[:batch_size])
+                if not pks:
+                    break
+                batch = list(
+                    Project.objects.filter(pk__in=pks)
+                    .with_task_stats()
+                    .order_by('pk')
+                    .only('pk', *counters)
+                )
+                stale = []
+                for project in batch:
+                    if any(getattr(project, field) != getattr(project, actual) for field, actual in counters.items()):
+                        for field, actual in counters.items():
+                            setattr(project, field, getattr(project, actual))
+                        stale.append(project)
+                if stale and not options['check']:
+                    Project.objects.bulk_update(stale, list(counters))
+            checked += len(batch)
+            drifted += len(stale)
+            last_pk = batch[-1].pk
+            if options['verbosity'] > 1:
+                for project in stale:
+                    self.stdout.write(f'Project {project.pk}: counters out of date')
+
+        if options['check'] and drifted:
+            raise CommandError(f'{drifted} of {checked} projects have stale task counters')
+        action = 'Found' if options['check'] else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} projects. {action} {drifted} with stale counters.'))
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from projects.models import Organization, OrganizationStats
+
+
+class Command(BaseCommand):
+    help = 'Recount projects and tasks per organization and repair the organization_stats rollup'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Report drift without writing; exit non-zero if any is found')
+        parser.add_argument('--batch-size', type=int, default=100, help='Organizations recounted per transaction')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        checked = drifted = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                pks = list(
+                    Organization.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+                )
+                if not pks:
+                    break
+                # Lock the stored rows first: concurrent writes then either
+                # commit before the recount or apply their F() delta after
+                # the repaired value is written.
+                stored = OrganizationStats.objects.filter(organization_id__in=pks)
+                if not options['check']:
+                    stored = stored.select_for_update()
+                stored = {stats.organization_id: stats for stats in stored}
+                now = timezone.now()
+                stale, missing = [], []
+                for pk, counts in OrganizationStats.objects.recount(pks).items():
+                    stats = stored.get(pk)
+                    if stats is None:
+                        stats = OrganizationStats(organization_id=pk, **counts)
+                        missing.append(stats)
+                    elif any(getattr(stats, field) != value for field, value in counts.items()):
+                        for field, value in counts.items():
+                            setattr(stats, field, value)
+                        stale.append(stats)
+                    stats.reconciled_at = now
+                if not options['check']:
+                    OrganizationStats.objects.bulk_create(missing)
+                    OrganizationStats.objects.bulk_update(
+                        list(stored.values()), [*OrganizationStats.COUNTERS, 'reconciled_at'],
+                    )
+            checked += len(pks)
+            drifted += len(stale) + len(missing)
+            last_pk = pks[-1]
+            if options['verbosity'] > 1:
+                for stats in missing:
+                    self.stdout.write(f'Organization {stats.organization_id}: stats row missing')
+                for stats in stale:
+                    self.stdout.write(f'Organization {stats.organization_id}: stats out of date')
+
+        if options['check'] and drifted:
+            raise CommandError(f'{drifted} of {checked} organizations have stale stats')
+        action = 'Found' if options['check'] else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} organizations. {action} {drifted} with stale stats.'))
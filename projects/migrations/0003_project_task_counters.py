@@ -0,0 +1,51 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:20
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_task_counters(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('projects', 'Task')
+    counters = {
+        'TODO': 'todo_task_count',
+        'IN_PROGRESS': 'in_progress_task_count',
+        'DONE': 'done_task_count',
+    }
+    counts = {}
+    rows = Task.objects.order_by().values('project_id', 'status').annotate(n=Count('pk'))
+    for row in rows:
+        field = counters.get(row['status'])
+        if field:
+            counts.setdefault(row['project_id'], {})[field] = row['n']
+    projects = list(Project.objects.filter(pk__in=counts))
+    for project in projects:
+        for field, value in counts[project.pk].items():
+            setattr(project, field, value)
+    Project.objects.bulk_update(projects, list(counters.values()), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='done_task_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='in_progress_task_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='todo_task_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_task_counters, migrations.RunPython.noop),
+    ]
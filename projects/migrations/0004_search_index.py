@@ -0,0 +1,118 @@
+from django.db import migrations
+
+
+class RunSQLOnVendor(migrations.RunSQL):
+    """``RunSQL`` that only runs on databases of one ``vendor``."""
+
+    def __init__(self, vendor, *args, **kwargs):
+        self.vendor = vendor
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        return name, [self.vendor, *args], kwargs
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == self.vendor:
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+# Frozen copies of the statements in projects/search.py as of this migration;
+# later changes to the index need a migration of their own.
+POSTGRESQL_INSTALL = [
+    """
+    ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX IF NOT EXISTS tasks_search_idx ON tasks USING GIN (search_vector)',
+    """
+    ALTER TABLE task_comments ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED
+    """,
+    'CREATE INDEX IF NOT EXISTS task_comments_search_idx ON task_comments USING GIN (search_vector)',
+]
+
+POSTGRESQL_UNINSTALL = [
+    'ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector',
+    'ALTER TABLE task_comments DROP COLUMN IF EXISTS search_vector',
+]
+
+SQLITE_INSTALL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description, content='tasks', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS task_comments_fts USING fts5(
+        content, content='task_comments', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_comments_fts_insert AFTER INSERT ON task_comments BEGIN
+        INSERT INTO task_comments_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_comments_fts_delete AFTER DELETE ON task_comments BEGIN
+        INSERT INTO task_comments_fts(task_comments_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_comments_fts_update AFTER UPDATE OF content ON task_comments BEGIN
+        INSERT INTO task_comments_fts(task_comments_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO task_comments_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+    # Index the rows written before this migration.
+    "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+    "INSERT INTO task_comments_fts(task_comments_fts) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    'DROP TRIGGER IF EXISTS tasks_fts_insert',
+    'DROP TRIGGER IF EXISTS tasks_fts_delete',
+    'DROP TRIGGER IF EXISTS tasks_fts_update',
+    'DROP TABLE IF EXISTS tasks_fts',
+    'DROP TRIGGER IF EXISTS task_comments_fts_insert',
+    'DROP TRIGGER IF EXISTS task_comments_fts_delete',
+    'DROP TRIGGER IF EXISTS task_comments_fts_update',
+    'DROP TABLE IF EXISTS task_comments_fts',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_task_counters'),
+    ]
+
+    operations = [
+        RunSQLOnVendor('postgresql', POSTGRESQL_INSTALL, POSTGRESQL_UNINSTALL),
+        RunSQLOnVendor('sqlite', SQLITE_INSTALL, SQLITE_UNINSTALL),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_admin_created_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('due_date__isnull', False), models.Q(('status', 'COMPLETED'), _negated=True)), fields=['organization', 'due_date'], name='projects_org_open_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('due_date__isnull', False), models.Q(('status', 'DONE'), _negated=True)), fields=['project', 'due_date'], name='tasks_project_open_due_idx'),
+        ),
+    ]
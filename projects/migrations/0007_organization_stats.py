@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-17 01:57
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+def backfill_organization_stats(apps, schema_editor):
+    Organization = apps.get_model('projects', 'Organization')
+    OrganizationStats = apps.get_model('projects', 'OrganizationStats')
+    Project = apps.get_model('projects', 'Project')
+    project_counters = {
+        'ACTIVE': 'active_project_count',
+        'COMPLETED': 'completed_project_count',
+        'ON_HOLD': 'on_hold_project_count',
+        'ARCHIVED': 'archived_project_count',
+    }
+    task_counters = ['todo_task_count', 'in_progress_task_count', 'done_task_count']
+    stats = {pk: OrganizationStats(organization_id=pk) for pk in Organization.objects.values_list('pk', flat=True)}
+    rows = Project.objects.order_by().values('organization_id', 'status').annotate(
+        projects=Count('pk'), **{f'total_{field}': Sum(field) for field in task_counters},
+    )
+    for row in rows:
+        row_stats = stats[row['organization_id']]
+        field = project_counters.get(row['status'])
+        if field:
+            setattr(row_stats, field, getattr(row_stats, field) + row['projects'])
+        for field in task_counters:
+            setattr(row_stats, field, getattr(row_stats, field) + (row[f'total_{field}'] or 0))
+    OrganizationStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_overdue_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrganizationStats',
+            fields=[
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='projects.organization')),
+                ('active_project_count', models.IntegerField(default=0)),
+                ('completed_project_count', models.IntegerField(default=0)),
+                ('on_hold_project_count', models.IntegerField(default=0)),
+                ('archived_project_count', models.IntegerField(default=0)),
+                ('todo_task_count', models.IntegerField(default=0)),
+                ('in_progress_task_count', models.IntegerField(default=0)),
+                ('done_task_count', models.IntegerField(default=0)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'organization stats',
+                'db_table': 'organization_stats',
+            },
+        ),
+        migrations.RunPython(backfill_organization_stats, migrations.RunPython.noop),
+    ]
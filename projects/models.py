@@ -1,5 +1,10 @@
-from django.db import models
+from collections import Counter
+
+from django.db import connections, models, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
 from django.core.validators import EmailValidator
+from django.dispatch import Signal
 from django.utils import timezone
 
 
@@ -18,13 +23,288 @@ class Organization(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                OrganizationStats.objects.create(organization_id=self.pk)
+
+    def get_stats(self):
+        """The stored ``OrganizationStats`` row, or ``None`` until one is reconciled."""
+        try:
+            return self.stats
+        except OrganizationStats.DoesNotExist:
+            return None
+
     @property
     def project_count(self):
-        return self.projects.count()
+        stats = self.get_stats()
+        return stats.project_count if stats else self.projects.count()
 
     @property
     def task_count(self):
-        return Task.objects.filter(project__organization=self).count()
+        stats = self.get_stats()
+        if stats:
+            return stats.task_count
+        counters = [F(field) for field in Project.TASK_COUNTERS.values()]
+        total = self.projects.aggregate(total=Sum(sum(counters[1:], counters[0])))['total']
+        return total or 0
+
+
+# Rows that can become overdue: open, with a due date. These are the
+# conditions of the partial due_date indexes, which overdue() repeats so the
+# planner can match them; closed work never enters those indexes.
+OPEN_PROJECT_DUE_DATES = Q(due_date__isnull=False) & ~Q(status='COMPLETED')
+OPEN_TASK_DUE_DATES = Q(due_date__isnull=False) & ~Q(status='DONE')
+
+# Sent inside every write to projects, tasks and comments, bulk ones included,
+# with the ``organization_ids`` and ``project_ids`` (iterables or querysets)
+# of the organizations whose data it changes. projects.response_cache
+# invalidates their cached responses.
+organization_data_changed = Signal()
+
+
+class RowUpdateQuerySet(models.QuerySet):
+    """Adds ``update_row``, a partial update of one row in a single statement."""
+
+    def update_row(self, pk, values, fields=None, previous=()):
+        """Write ``values`` (attname -> value) to row ``pk`` and return it as an instance.
+
+        Only the supplied columns and ``auto_now`` fields are written, with one
+        ``UPDATE ... RETURNING``. The instance holds ``fields`` (attnames; every
+        concrete field when ``None``) as stored after the update, with the rest
+        deferred. Columns named in ``previous`` are also read as they were
+        before the update, into ``instance._previous``; PostgreSQL does that in
+        the same statement, other databases lock and read them first. Returns
+        ``None`` when no row matches.
+        """
+        meta = self.model._meta
+        connection = connections[self.db]
+        quote_name = connection.ops.quote_name
+        table = quote_name(meta.db_table)
+        pk = meta.pk.get_db_prep_value(meta.pk.get_prep_value(pk), connection)
+        pk_column = f'{table}.{quote_name(meta.pk.column)}'
+
+        now = timezone.now()
+        values = {meta.get_field(name): value for name, value in values.items()}
+        for field in meta.concrete_fields:
+            if getattr(field, 'auto_now', False):
+                values[field] = now
+        assignments = ', '.join(f'{quote_name(field.column)} = %s' for field in values)
+        params = [field.get_db_prep_save(value, connection) for field, value in values.items()]
+        returning = [
+            field for field in meta.concrete_fields
+            if field.primary_key or fields is None or field.attname in fields
+        ]
+        previous = [meta.get_field(name) for name in previous]
+        columns = [f'{table}.{quote_name(field.column)}' for field in returning]
+
+        with transaction.atomic(using=self.db, savepoint=False):
+            with connection.cursor() as cursor:
+                if previous and connection.vendor == 'postgresql':
+                    old = ', '.join(quote_name(field.column) for field in previous)
+                    cursor.execute(
+                        f'UPDATE {table} SET {assignments} '
+                        f'FROM (SELECT {quote_name(meta.pk.column)}, {old} FROM {table} '
+                        f'WHERE {quote_name(meta.pk.column)} = %s FOR UPDATE) AS "previous" '
+                        f'WHERE {pk_column} = "previous".{quote_name(meta.pk.column)} '
+                        f'RETURNING {", ".join(columns)}, '
+                        + ', '.join(f'"previous".{quote_name(field.column)}' for field in previous),
+                        [*params, pk],
+                    )
+                    row = cursor.fetchone()
+                    before = row and row[len(returning):]
+                else:
+                    before = None
+                    if previous:
+                        rows = self.model._base_manager.using(self.db).select_for_update().filter(
+                            pk=pk,
+                        ).order_by().values_list(*[field.attname for field in previous])
+                        before = next(iter(rows), None)
+                        if before is None:
+                            return None
+                    update = f'UPDATE {table} SET {assignments} WHERE {pk_column} = %s'
+                    # Backends that can return columns from INSERT can from UPDATE too.
+                    if connection.features.can_return_columns_from_insert:
+                        cursor.execute(f'{update} RETURNING {", ".join(columns)}', [*params, pk])
+                        row = cursor.fetchone()
+                    else:
+                        cursor.execute(update, [*params, pk])
+                        cursor.execute(f'SELECT {", ".join(columns)} FROM {table} WHERE {pk_column} = %s', [pk])
+                        row = cursor.fetchone()
+        if row is None:
+            return None
+
+        converted = []
+        for field, value in zip(returning, row):
+            column = field.get_col(meta.db_table)
+            for converter in connection.ops.get_db_converters(column) + field.get_db_converters(connection):
+                value = converter(value, column, connection)
+            converted.append(value)
+        instance = self.model.from_db(self.db, [field.attname for field in returning], converted)
+        if previous:
+            instance._previous = dict(zip((field.attname for field in previous), before))
+        return instance
+
+    update_row.alters_data = True
+
+
+class ProjectQuerySet(RowUpdateQuerySet):
+    """Keeps ``OrganizationStats`` in step with bulk writes."""
+    COUNTED_FIELDS = {'organization', 'organization_id', 'status'}
+
+    # Annotation name -> task status counted (None counts every task).
+    TASK_STATS = {
+        'task_total': None,
+        'task_completed': 'DONE',
+        'task_in_progress': 'IN_PROGRESS',
+        'task_todo': 'TODO',
+    }
+
+    def overdue(self, overdue=True, today=None):
+        """Projects past their due date and not completed; with ``overdue=False``, the rest."""
+        condition = OPEN_PROJECT_DUE_DATES & Q(due_date__lt=today or timezone.now().date())
+        return self.filter(condition) if overdue else self.exclude(condition)
+
+    def with_task_stats(self):
+        """Annotate each project with its task counts in one grouped aggregate.
+
+        Reads go through the stored counters on ``Project``; this recount is
+        what ``rebuild_task_counters`` compares them against.
+        """
+        return self.annotate(**{
+            name: Count('tasks', filter=Q(tasks__status=status)) if status else Count('tasks')
+            for name, status in self.TASK_STATS.items()
+        })
+
+    def apply_task_count_deltas(self, deltas):
+        """Apply ``{(project_id, status): delta}`` to the stored counters in one UPDATE."""
+        changes = {}
+        for (project_id, status), delta in deltas.items():
+            field = Project.TASK_COUNTERS.get(status)
+            if field and delta:
+                changes.setdefault(field, []).append(When(pk=project_id, then=Value(delta)))
+        if not changes:
+            return 0
+        project_ids = {project_id for project_id, _ in deltas}
+        with transaction.atomic(using=self.db, savepoint=False):
+            updated = self.filter(pk__in=project_ids).update(**{
+                field: F(field) + Case(*whens, default=Value(0), output_field=models.IntegerField())
+                for field, whens in changes.items()
+            })
+            # The same deltas, summed per organization by a subquery over
+            # the projects, so callers need not know their organizations.
+            projects = Project._base_manager.using(self.db).filter(pk__in=project_ids)
+            OrganizationStats.objects.using(self.db).filter(
+                organization_id__in=projects.values('organization_id'),
+            ).update(**{
+                field: F(field) + Coalesce(Subquery(
+                    projects.filter(organization_id=OuterRef('organization_id')).order_by()
+                    .values('organization_id')
+                    .annotate(delta=Sum(Case(*whens, default=Value(0), output_field=models.IntegerField())))
+                    .values('delta')
+                ), 0)
+                for field, whens in changes.items()
+            })
+        return updated
+
+    def count_by_organization(self):
+        """``OrganizationStats`` counts of these projects and their tasks, as ``{(organization_id, field): n}``."""
+        fields = Project.TASK_COUNTERS.values()
+        rows = self.order_by().values('organization_id', 'status').annotate(
+            projects=Count('pk'), **{f'total_{field}': Sum(field) for field in fields},
+        )
+        counts = Counter()
+        for row in rows:
+            task_counts = {field: row[f'total_{field}'] for field in fields}
+            counts.update(organization_counts(row['organization_id'], row['status'], task_counts, row['projects']))
+        return +counts
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            counts = Counter()
+            for obj in objs:
+                counts.update(obj._organization_counts())
+            OrganizationStats.objects.using(self.db).apply_deltas(counts)
+            organization_data_changed.send(Project, organization_ids={obj.organization_id for obj in objs})
+        for obj in objs:
+            obj._counted_as = (obj.organization_id, obj.status)
+        return objs
+
+    def update(self, **kwargs):
+        if not self.COUNTED_FIELDS.intersection(kwargs):
+            with transaction.atomic(using=self.db, savepoint=False):
+                # Sent first, while the rows still match the filter.
+                organization_data_changed.send(Project, organization_ids=self.values('organization_id'))
+                return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            rows = Project.objects.using(self.db).filter(pk__in=list(self.order_by().values_list('pk', flat=True)))
+            before = rows.count_by_organization()
+            updated = super().update(**kwargs)
+            deltas = rows.count_by_organization()
+            deltas.subtract(before)
+            OrganizationStats.objects.using(self.db).apply_deltas(deltas)
+            organization_data_changed.send(Project, organization_ids={key[0] for key in deltas})
+        return updated
+
+    update.alters_data = True
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            deltas = Counter({key: -n for key, n in self.count_by_organization().items()})
+            result = super().delete()
+            OrganizationStats.objects.using(self.db).apply_deltas(deltas)
+            organization_data_changed.send(Project, organization_ids={key[0] for key in deltas})
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def update_row(self, pk, values, fields=None, previous=()):
+        if not self.COUNTED_FIELDS.intersection(values):
+            fields = None if fields is None else {*fields, 'organization_id'}
+            with transaction.atomic(using=self.db, savepoint=False):
+                project = super().update_row(pk, values, fields, previous)
+                if project is not None:
+                    organization_data_changed.send(Project, organization_ids={project.organization_id})
+            return project
+        counted = {'organization_id', 'status', *Project.TASK_COUNTERS.values()}
+        fields = None if fields is None else {*fields, *counted}
+        with transaction.atomic(using=self.db, savepoint=False):
+            project = super().update_row(pk, values, fields, {*previous, 'organization_id', 'status'})
+            if project is not None:
+                deltas = Counter(project._organization_counts())
+                deltas.subtract(project._organization_counts(
+                    project._previous['organization_id'], project._previous['status'],
+                ))
+                OrganizationStats.objects.using(self.db).apply_deltas(deltas)
+                organization_data_changed.send(Project, organization_ids={
+                    project.organization_id, project._previous['organization_id'],
+                })
+        return project
+
+    update_row.alters_data = True
+
+
+def organization_counts(organization_id, status, task_counts, projects=1):
+    """``OrganizationStats`` counts of ``projects`` projects of one status, with ``task_counts`` by counter field."""
+    counts = Counter({(organization_id, field): task_counts.get(field) or 0 for field in Project.TASK_COUNTERS.values()})
+    field = OrganizationStats.PROJECT_COUNTERS.get(status)
+    if field:
+        counts[(organization_id, field)] += projects
+    return counts
+
+
+def build_task_stats(total, completed, in_progress, todo):
+    return {
+        'total': total,
+        'completed': completed,
+        'in_progress': in_progress,
+        'todo': todo,
+        'completion_rate': (completed / total) * 100 if total else 0.0,
+    }
 
 
 class Project(models.Model):
@@ -39,7 +319,8 @@ class Project(models.Model):
     organization = models.ForeignKey(
         Organization, 
         on_delete=models.CASCADE, 
-        related_name='projects'
+        related_name='projects',
+        db_index=False  # Covered by projects_org_created_idx.
     )
     name = models.CharField(max_length=200)
     description = models.TextField(blank=True)
@@ -52,27 +333,57 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Denormalized task counts, kept in step by Task and TaskQuerySet writes.
+    todo_task_count = models.IntegerField(default=0, editable=False)
+    in_progress_task_count = models.IntegerField(default=0, editable=False)
+    done_task_count = models.IntegerField(default=0, editable=False)
+
+    # Task status -> counter field.
+    TASK_COUNTERS = {
+        'TODO': 'todo_task_count',
+        'IN_PROGRESS': 'in_progress_task_count',
+        'DONE': 'done_task_count',
+    }
+
+    objects = ProjectQuerySet.as_manager()
+
     class Meta:
         db_table = 'projects'
         ordering = ['-created_at']
         unique_together = ['organization', 'name']
+        indexes = [
+            models.Index(fields=['organization', '-created_at'], name='projects_org_created_idx'),
+            models.Index(
+                fields=['organization', 'due_date'],
+                name='projects_org_open_due_idx',
+                condition=OPEN_PROJECT_DUE_DATES,
+            ),
+        ]
 
     def __str__(self):
         return f"{self.organization.name} - {self.name}"
 
+    @property
+    def task_stats(self):
+        """Task counts by status, read from the stored counters."""
+        return build_task_stats(
+            self.todo_task_count + self.in_progress_task_count + self.done_task_count,
+            self.done_task_count,
+            self.in_progress_task_count,
+            self.todo_task_count,
+        )
+
     @property
     def task_count(self):
-        return self.tasks.count()
+        return self.task_stats['total']
 
     @property
     def completed_task_count(self):
-        return self.tasks.filter(status='DONE').count()
+        return self.task_stats['completed']
 
     @property
     def completion_rate(self):
-        if self.task_count == 0:
-            return 0.0
-        return (self.completed_task_count / self.task_count) * 100
+        return self.task_stats['completion_rate']
 
     @property
     def is_overdue(self):
@@ -80,6 +391,139 @@ class Project(models.Model):
             return False
         return self.due_date < timezone.now().date() and self.status != 'COMPLETED'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._counted_as = (instance.__dict__.get('organization_id'), instance.__dict__.get('status'))
+        return instance
+
+    def _organization_counts(self, organization_id=None, status=None):
+        """What this project adds to ``OrganizationStats``, counted under ``organization_id`` and ``status``."""
+        return organization_counts(
+            organization_id or self.organization_id, status or self.status,
+            {field: getattr(self, field) for field in Project.TASK_COUNTERS.values()},
+        )
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Task counters only change through F() updates; a stale instance
+            # must not write them back.
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in self.TASK_COUNTERS.values()
+            ]
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not ProjectQuerySet.COUNTED_FIELDS.intersection(update_fields):
+            super().save(*args, **kwargs)
+            organization_data_changed.send(Project, organization_ids={self.organization_id})
+            return
+        with transaction.atomic():
+            organization_ids = {self.organization_id}
+            if self._state.adding:
+                deltas = Counter(self._organization_counts())
+            else:
+                # Counted as the stored row, which another copy of the project
+                # may have changed since this one was loaded.
+                stored = next(iter(Project.objects.select_for_update().filter(pk=self.pk).values(
+                    'organization_id', 'status', *self.TASK_COUNTERS.values(),
+                )))
+                for field in self.TASK_COUNTERS.values():
+                    setattr(self, field, stored[field])
+                deltas = Counter(self._organization_counts())
+                deltas.subtract(self._organization_counts(stored['organization_id'], stored['status']))
+                organization_ids.add(stored['organization_id'])
+            super().save(*args, **kwargs)
+            if deltas:
+                OrganizationStats.objects.apply_deltas(deltas)
+            organization_data_changed.send(Project, organization_ids=organization_ids)
+        self._counted_as = (self.organization_id, self.status)
+
+    def delete(self, *args, **kwargs):
+        # Tasks are removed by the cascade, so the organization loses them here
+        # rather than through TaskQuerySet.delete().
+        with transaction.atomic():
+            deltas = Project.objects.filter(pk=self.pk).count_by_organization()
+            result = super().delete(*args, **kwargs)
+            OrganizationStats.objects.apply_deltas(Counter({key: -n for key, n in deltas.items()}))
+            organization_data_changed.send(Project, organization_ids={self.organization_id})
+        return result
+
+
+class TaskQuerySet(RowUpdateQuerySet):
+    """Keeps ``Project`` task counters in step with bulk writes."""
+    COUNTED_FIELDS = {'project', 'project_id', 'status'}
+
+    def overdue(self, overdue=True, now=None):
+        """Tasks past their due date and not done; with ``overdue=False``, the rest."""
+        condition = OPEN_TASK_DUE_DATES & Q(due_date__lt=now or timezone.now())
+        return self.filter(condition) if overdue else self.exclude(condition)
+
+    def count_by_project_status(self):
+        rows = self.order_by().values('project_id', 'status').annotate(n=Count('pk'))
+        return Counter({(row['project_id'], row['status']): row['n'] for row in rows})
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            Project.objects.using(self.db).apply_task_count_deltas(Counter((obj.project_id, obj.status) for obj in objs))
+            organization_data_changed.send(Task, project_ids={obj.project_id for obj in objs})
+        for obj in objs:
+            obj._counted_as = (obj.project_id, obj.status)
+        return objs
+
+    def update(self, **kwargs):
+        if not self.COUNTED_FIELDS.intersection(kwargs):
+            with transaction.atomic(using=self.db, savepoint=False):
+                # Sent first, while the rows still match the filter.
+                organization_data_changed.send(Task, project_ids=self.values('project_id'))
+                return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            rows = self.model._base_manager.using(self.db).filter(
+                pk__in=list(self.order_by().values_list('pk', flat=True)),
+            )
+            before = TaskQuerySet.count_by_project_status(rows)
+            updated = rows.update(**kwargs)
+            deltas = TaskQuerySet.count_by_project_status(rows)
+            deltas.subtract(before)
+            Project.objects.using(self.db).apply_task_count_deltas(deltas)
+            organization_data_changed.send(Task, project_ids={key[0] for key in deltas})
+        return updated
+
+    update.alters_data = True
+
+    def update_row(self, pk, values, fields=None, previous=()):
+        if not self.COUNTED_FIELDS.intersection(values):
+            fields = None if fields is None else {*fields, 'project_id'}
+            with transaction.atomic(using=self.db, savepoint=False):
+                task = super().update_row(pk, values, fields, previous)
+                if task is not None:
+                    organization_data_changed.send(Task, project_ids={task.project_id})
+            return task
+        fields = None if fields is None else {*fields, 'project_id', 'status'}
+        with transaction.atomic(using=self.db, savepoint=False):
+            task = super().update_row(pk, values, fields, {*previous, 'project_id', 'status'})
+            if task is not None:
+                counted_as = (task._previous['project_id'], task._previous['status'])
+                if counted_as != task._counted_as:
+                    Project.objects.using(self.db).apply_task_count_deltas(
+                        Counter({task._counted_as: 1, counted_as: -1})
+                    )
+                organization_data_changed.send(Task, project_ids={task.project_id, counted_as[0]})
+        return task
+
+    update_row.alters_data = True
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            deltas = Counter({key: -n for key, n in self.count_by_project_status().items()})
+            result = super().delete()
+            Project.objects.using(self.db).apply_task_count_deltas(deltas)
+            organization_data_changed.send(Task, project_ids={key[0] for key in deltas})
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
 
 class Task(models.Model):
     """Task model with project dependency."""
@@ -92,7 +536,8 @@ class Task(models.Model):
     project = models.ForeignKey(
         Project, 
         on_delete=models.CASCADE, 
-        related_name='tasks'
+        related_name='tasks',
+        db_index=False  # Covered by the composite indexes below.
     )
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
@@ -109,13 +554,74 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         db_table = 'tasks'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['project', 'status'], name='tasks_project_status_idx'),
+            models.Index(fields=['project', '-created_at'], name='tasks_project_created_idx'),
+            # Default ordering and the admin's date hierarchy across projects.
+            models.Index(fields=['-created_at'], name='tasks_created_idx'),
+            models.Index(
+                fields=['due_date'],
+                name='tasks_open_due_date_idx',
+                condition=OPEN_TASK_DUE_DATES,
+            ),
+            # overdueTasks for one organization, reached through its projects.
+            models.Index(
+                fields=['project', 'due_date'],
+                name='tasks_project_open_due_idx',
+                condition=OPEN_TASK_DUE_DATES,
+            ),
+        ]
 
     def __str__(self):
         return f"{self.project.name} - {self.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._counted_as = (instance.__dict__.get('project_id'), instance.__dict__.get('status'))
+        return instance
+
+    def _stored_counter_key(self):
+        """The (project_id, status) pair the stored row is counted under, locked until the transaction ends.
+
+        Read from the row rather than from when this instance was loaded, as
+        another copy of the task may have been saved since.
+        """
+        rows = Task._base_manager.select_for_update().filter(pk=self.pk).values_list('project_id', 'status')
+        return next(iter(rows), None)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not TaskQuerySet.COUNTED_FIELDS.intersection(update_fields):
+            super().save(*args, **kwargs)
+            organization_data_changed.send(Task, project_ids={self.project_id})
+            return
+        with transaction.atomic():
+            previous = None if self._state.adding else self._stored_counter_key()
+            super().save(*args, **kwargs)
+            current = (self.project_id, self.status)
+            if previous != current:
+                deltas = Counter({current: 1})
+                if previous:
+                    deltas[previous] -= 1
+                Project.objects.apply_task_count_deltas(deltas)
+            organization_data_changed.send(Task, project_ids={current[0], (previous or current)[0]})
+        self._counted_as = current
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = self._stored_counter_key()
+            result = super().delete(*args, **kwargs)
+            if previous:
+                Project.objects.apply_task_count_deltas({previous: -1})
+                organization_data_changed.send(Task, project_ids={previous[0]})
+        return result
+
     @property
     def organization(self):
         return self.project.organization
@@ -136,7 +642,8 @@ class TaskComment(models.Model):
     task = models.ForeignKey(
         Task, 
         on_delete=models.CASCADE, 
-        related_name='comments'
+        related_name='comments',
+        db_index=False  # Covered by task_comments_task_created_idx.
     )
     content = models.TextField()
     author_email = models.EmailField(validators=[EmailValidator()])
@@ -146,10 +653,120 @@ class TaskComment(models.Model):
     class Meta:
         db_table = 'task_comments'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['task', '-created_at'], name='task_comments_task_created_idx'),
+            models.Index(fields=['-created_at'], name='task_comments_created_idx'),
+        ]
 
     def __str__(self):
         return f"Comment on {self.task.title} by {self.author_email}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        organization_data_changed.send(TaskComment, project_ids=self._project_ids())
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        organization_data_changed.send(TaskComment, project_ids=self._project_ids())
+        return result
+
+    def _project_ids(self):
+        return Task.objects.filter(pk=self.task_id).values('project_id')
+
     @property
     def organization(self):
         return self.task.organization
+
+
+class OrganizationStatsQuerySet(models.QuerySet):
+    def recount(self, organization_ids):
+        """Count projects and tasks of ``organization_ids`` from scratch, as ``{organization_id: {field: n}}``.
+
+        Tasks are counted directly rather than through the project counters,
+        which ``reconcile_organization_stats`` would otherwise inherit drift from.
+        """
+        counts = {pk: dict.fromkeys(OrganizationStats.COUNTERS, 0) for pk in organization_ids}
+        projects = Project.objects.using(self.db).filter(organization_id__in=organization_ids)
+        for row in projects.order_by().values('organization_id', 'status').annotate(n=Count('pk')):
+            field = OrganizationStats.PROJECT_COUNTERS.get(row['status'])
+            if field:
+                counts[row['organization_id']][field] += row['n']
+        tasks = Task.objects.using(self.db).filter(project__organization_id__in=organization_ids)
+        rows = tasks.order_by().values('project__organization_id', 'status').annotate(n=Count('pk'))
+        for row in rows:
+            field = Project.TASK_COUNTERS.get(row['status'])
+            if field:
+                counts[row['project__organization_id']][field] += row['n']
+        return counts
+
+    def apply_deltas(self, deltas):
+        """Apply ``{(organization_id, field): delta}`` to the stored counts in one UPDATE."""
+        changes, organization_ids = {}, set()
+        for (organization_id, field), delta in deltas.items():
+            if delta:
+                changes.setdefault(field, []).append(When(organization_id=organization_id, then=Value(delta)))
+                organization_ids.add(organization_id)
+        if not changes:
+            return 0
+        return self.filter(organization_id__in=organization_ids).update(**{
+            field: F(field) + Case(*whens, default=Value(0), output_field=models.IntegerField())
+            for field, whens in changes.items()
+        })
+
+
+class OrganizationStats(models.Model):
+    """Per-organization rollup of project and task counts.
+
+    Kept in step by the writes that maintain ``Project``'s task counters and
+    repaired by ``manage.py reconcile_organization_stats``. Overdue counts
+    change with the clock rather than with writes, so they are not stored.
+    """
+    organization = models.OneToOneField(
+        Organization,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    active_project_count = models.IntegerField(default=0)
+    completed_project_count = models.IntegerField(default=0)
+    on_hold_project_count = models.IntegerField(default=0)
+    archived_project_count = models.IntegerField(default=0)
+    todo_task_count = models.IntegerField(default=0)
+    in_progress_task_count = models.IntegerField(default=0)
+    done_task_count = models.IntegerField(default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    # Project status -> counter field. Task counters use Project.TASK_COUNTERS.
+    PROJECT_COUNTERS = {
+        'ACTIVE': 'active_project_count',
+        'COMPLETED': 'completed_project_count',
+        'ON_HOLD': 'on_hold_project_count',
+        'ARCHIVED': 'archived_project_count',
+    }
+    COUNTERS = [*PROJECT_COUNTERS.values(), *Project.TASK_COUNTERS.values()]
+
+    objects = OrganizationStatsQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'organization_stats'
+        verbose_name_plural = 'organization stats'
+
+    def __str__(self):
+        return f"Stats for {self.organization_id}"
+
+    @property
+    def project_count(self):
+        return sum(getattr(self, field) for field in self.PROJECT_COUNTERS.values())
+
+    @property
+    def task_stats(self):
+        return build_task_stats(
+            self.todo_task_count + self.in_progress_task_count + self.done_task_count,
+            self.done_task_count,
+            self.in_progress_task_count,
+            self.todo_task_count,
+        )
+
+    @property
+    def task_count(self):
+        return self.task_stats['total']
@@ -0,0 +1,104 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from graphene.relay import PageInfo
+from graphql import GraphQLError
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(instance):
+    """Opaque cursor for the ``(created_at, id)`` keyset position of ``instance``."""
+    payload = json.dumps([instance.created_at.isoformat(), instance.pk])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = parse_datetime(created_at)
+        pk = int(pk)
+    except (ValueError, TypeError):
+        created_at = None
+    if created_at is None:
+        raise GraphQLError(f'Invalid cursor: {cursor!r}')
+    return created_at, pk
+
+
+def _page_size(value, name):
+    if value is None:
+        return None
+    if value < 0:
+        raise GraphQLError(f'Argument "{name}" must be a non-negative integer.')
+    return min(value, MAX_PAGE_SIZE)
+
+
+class KeysetPage:
+    """The query for one page of a keyset connection, and how to build the result."""
+
+    def __init__(self, queryset, first=None, after=None, last=None, before=None):
+        first = _page_size(first, 'first')
+        last = _page_size(last, 'last')
+        if first is None and last is None:
+            first = DEFAULT_PAGE_SIZE
+        self.first, self.after, self.last, self.before = first, after, last, before
+
+        self.total_queryset = queryset
+        if after:
+            created_at, pk = decode_cursor(after)
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+        if before:
+            created_at, pk = decode_cursor(before)
+            queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+
+        if first is not None:
+            self.queryset = queryset.order_by('-created_at', '-pk')[:first + 1]
+        else:
+            self.queryset = queryset.order_by('created_at', 'pk')[:last + 1]
+
+    def build(self, connection_type, rows):
+        first, last = self.first, self.last
+        if first is not None:
+            has_next_page = len(rows) > first
+            rows = rows[:first]
+            has_previous_page = bool(self.after)
+            if last is not None:
+                has_previous_page = has_previous_page or len(rows) > last
+                rows = rows[len(rows) - last:] if last else []
+        else:
+            has_previous_page = len(rows) > last
+            rows = rows[:last][::-1]
+            has_next_page = bool(self.before)
+
+        edges = [connection_type.Edge(node=row, cursor=encode_cursor(row)) for row in rows]
+        connection = connection_type(
+            edges=edges,
+            page_info=PageInfo(
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+                has_previous_page=has_previous_page,
+                has_next_page=has_next_page,
+            ),
+        )
+        connection.total_queryset = self.total_queryset
+        return connection
+
+
+def keyset_paginate(connection_type, queryset, **kwargs):
+    """Build a Relay connection over ``queryset`` ordered by ``-created_at, -id``.
+
+    Pages are selected with ``WHERE (created_at, id) < cursor`` style filters
+    instead of ``OFFSET``, so every page costs the same regardless of depth.
+    ``totalCount`` is only evaluated when the client selects it.
+    """
+    page = KeysetPage(queryset, **kwargs)
+    return page.build(connection_type, list(page.queryset))
+
+
+async def keyset_paginate_async(connection_type, queryset, **kwargs):
+    """``keyset_paginate`` using the async ORM."""
+    page = KeysetPage(queryset, **kwargs)
+    return page.build(connection_type, [row async for row in page.queryset])
@@ -0,0 +1,218 @@
+import os
+import threading
+import time
+from collections import deque
+
+from .instrumentation import LATENCY_BUCKETS, Histogram, format_labels
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Thread-safe pool of at most ``max_size`` open DB-API connections.
+
+    ``acquire`` hands out an idle connection, opens one with ``connect``
+    while below ``max_size``, and otherwise waits up to ``timeout`` seconds
+    for one to be released before raising ``PoolTimeout``. Idle connections
+    are closed after ``max_idle`` seconds, and every connection after
+    ``max_lifetime`` seconds; ``check`` (raising on a broken connection)
+    runs on idle connections before they are handed out.
+    """
+
+    def __init__(self, connect, max_size=10, timeout=10.0, max_idle=600.0, max_lifetime=3600.0, check=None):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check = check
+        self._condition = threading.Condition()
+        # (connection, opened_at, released_at), most recently released last.
+        self._idle = deque()
+        self._opened_at = {}
+        self._closed = False
+        self.size = 0
+        self.waiting = 0
+        self.acquired = 0
+        self.timeouts = 0
+        self.opened = 0
+        self.discarded = 0
+        self.waits = Histogram(LATENCY_BUCKETS)
+
+    @property
+    def in_use(self):
+        return self.size - len(self._idle)
+
+    def acquire(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        while True:
+            connection = self._take(deadline)
+            if connection is None:
+                connection = self._open()
+            elif self.check is not None:
+                try:
+                    self.check(connection)
+                except Exception:
+                    self._discard(connection)
+                    continue
+            with self._condition:
+                self.acquired += 1
+                self.waits.observe(time.monotonic() - start)
+            return connection
+
+    def _take(self, deadline):
+        """Return an idle connection, or ``None`` after reserving a slot for a new one."""
+        with self._condition:
+            while True:
+                self._close_expired()
+                if self._idle:
+                    return self._idle.pop()[0]
+                if self.size < self.max_size:
+                    self.size += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        f'No database connection was released within {self.timeout}s '
+                        f'({self.max_size} in use).'
+                    )
+                self.waiting += 1
+                try:
+                    self._condition.wait(remaining)
+                finally:
+                    self.waiting -= 1
+
+    def _open(self):
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self._condition:
+                self.size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self.opened += 1
+            self._opened_at[id(connection)] = time.monotonic()
+        return connection
+
+    def release(self, connection, discard=False):
+        """Return ``connection`` to the pool, closing it if ``discard`` or past its lifetime."""
+        with self._condition:
+            opened_at = self._opened_at.get(id(connection), 0)
+            now = time.monotonic()
+            if not (discard or self._closed or now - opened_at >= self.max_lifetime):
+                self._idle.append((connection, opened_at, now))
+                self._condition.notify()
+                return
+        self._discard(connection)
+
+    def _discard(self, connection):
+        with self._condition:
+            self._forget(connection)
+            self._condition.notify()
+        _close_quietly(connection)
+
+    def _forget(self, connection):
+        self._opened_at.pop(id(connection), None)
+        self.size -= 1
+        self.discarded += 1
+
+    def _close_expired(self):
+        now = time.monotonic()
+        kept = deque()
+        for connection, opened_at, released_at in self._idle:
+            if now - released_at >= self.max_idle or now - opened_at >= self.max_lifetime:
+                self._forget(connection)
+                _close_quietly(connection)
+            else:
+                kept.append((connection, opened_at, released_at))
+        self._idle = kept
+
+    def close(self):
+        """Close idle connections; connections in use are closed when released."""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, deque()
+            for connection, _, _ in idle:
+                self._forget(connection)
+        for connection, _, _ in idle:
+            _close_quietly(connection)
+
+
+def _close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pid = os.getpid()
+
+
+def get_pool(key, factory):
+    """Return this process's pool for ``key``, creating it with ``factory()`` on first use.
+
+    Pools inherited from a parent process (e.g. a server forking workers
+    after the application was loaded) are dropped without closing their
+    connections, which still belong to the parent.
+    """
+    global _pid
+    with _pools_lock:
+        if os.getpid() != _pid:
+            _pools.clear()
+            _pid = os.getpid()
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = factory()
+        return pool
+
+
+def close_pools(alias=None):
+    """Close and forget the pools of the database ``alias``, or every pool."""
+    with _pools_lock:
+        keys = [key for key in _pools if alias is None or key[0] == alias]
+        pools = [_pools.pop(key) for key in keys]
+    for pool in pools:
+        pool.close()
+
+
+def render_metrics():
+    """Return pool metrics in the Prometheus text format, labelled by database alias."""
+    with _pools_lock:
+        pools = {key[0]: pool for key, pool in _pools.items()}
+    gauges = [
+        ('db_pool_max_size', 'Maximum connections the pool opens.', lambda pool: pool.max_size),
+        ('db_pool_connections_in_use', 'Connections handed out.', lambda pool: pool.in_use),
+        ('db_pool_connections_idle', 'Open connections waiting to be handed out.', lambda pool: len(pool._idle)),
+        ('db_pool_waiting', 'Threads waiting for a connection.', lambda pool: pool.waiting),
+    ]
+    counters = [
+        ('db_pool_acquired_total', 'Connections handed out since the process started.', lambda pool: pool.acquired),
+        ('db_pool_timeouts_total', 'Requests for a connection that timed out.', lambda pool: pool.timeouts),
+        ('db_pool_opened_total', 'Connections opened.', lambda pool: pool.opened),
+        ('db_pool_closed_total', 'Connections closed as broken, expired or idle.', lambda pool: pool.discarded),
+    ]
+    lines = []
+    for kind, metrics in (('gauge', gauges), ('counter', counters)):
+        for name, help_text, value in metrics:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for alias, pool in sorted(pools.items()):
+                with pool._condition:
+                    lines.append(f'{name}{{{format_labels(alias=alias)}}} {value(pool)}')
+    name = 'db_pool_wait_seconds'
+    lines.append(f'# HELP {name} Time taken to hand out a connection, including opening new ones.')
+    lines.append(f'# TYPE {name} histogram')
+    for alias, pool in sorted(pools.items()):
+        with pool._condition:
+            for bound, count in pool.waits.cumulative():
+                lines.append(f'{name}_bucket{{{format_labels(alias=alias, le=bound)}}} {count}')
+            lines.append(f'{name}_sum{{{format_labels(alias=alias)}}} {pool.waits.sum}')
+            lines.append(f'{name}_count{{{format_labels(alias=alias)}}} {pool.waits.count}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from graphql import OperationType, get_operation_ast
+
+from .cache import LRUCache
+from .models import Organization, Project, organization_data_changed
+from .tenancy import TENANT_FIELDS, root_field_tenants
+
+GLOBAL_SCOPE = '*'
+
+
+class BaseBackend:
+    """Storage for cached responses plus a version counter per scope."""
+
+    def __init__(self, ttl=60, **options):
+        self.ttl = ttl
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def get_version(self, scope):
+        raise NotImplementedError
+
+    def bump_version(self, scope):
+        raise NotImplementedError
+
+
+class LocalMemoryBackend(BaseBackend):
+    """Per-process LRU with TTL eviction.
+
+    Version bumps are only seen by the process that made them; other workers
+    serve their entries until the TTL expires. Use ``DjangoCacheBackend`` with
+    a shared cache when running several processes.
+    """
+
+    def __init__(self, ttl=60, maxsize=1024, **options):
+        super().__init__(ttl)
+        self._entries = LRUCache(maxsize, ttl)
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, value):
+        self._entries.set(key, value)
+
+    def get_version(self, scope):
+        return self._versions.get(scope, 0)
+
+    def bump_version(self, scope):
+        with self._lock:
+            self._versions[scope] = self._versions.get(scope, 0) + 1
+
+
+class DjangoCacheBackend(BaseBackend):
+    """Stores entries and versions in one of the Django ``CACHES``."""
+
+    def __init__(self, ttl=60, alias='default', **options):
+        super().__init__(ttl)
+        self.cache = caches[alias]
+
+    def get(self, key):
+        return self.cache.get(f'graphql:response:{key}')
+
+    def set(self, key, value):
+        self.cache.set(f'graphql:response:{key}', value, self.ttl)
+
+    def get_version(self, scope):
+        return self.cache.get_or_set(f'graphql:version:{scope}', 0, None)
+
+    def bump_version(self, scope):
+        key = f'graphql:version:{scope}'
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, 1, None)
+
+
+class ResponseCache:
+    """Caches query results by (operation, variables, organization scope, scope version)."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def get_scope(self, document, variables, operation_name, tenant=None):
+        """Return the organization slug the document reads, or ``GLOBAL_SCOPE``.
+
+        A document is tenant-scoped when every root field is one of
+        ``TENANT_FIELDS`` and they all name the same organization, either by
+        argument or through the ``tenant`` header; anything else is global.
+        """
+        slugs = set()
+        for name, slug in root_field_tenants(document, variables, operation_name):
+            if name == '__typename':
+                continue
+            if name not in TENANT_FIELDS or not (slug or tenant):
+                return GLOBAL_SCOPE
+            slugs.add(slug or tenant)
+        return slugs.pop() if len(slugs) == 1 else GLOBAL_SCOPE
+
+    def get_key(self, query_hash, document, variables, operation_name, tenant=None):
+        scope = self.get_scope(document, variables or {}, operation_name, tenant)
+        parts = [
+            query_hash,
+            operation_name or '',
+            json.dumps(variables or {}, sort_keys=True, default=str),
+            scope,
+            str(self.backend.get_version(scope)),
+        ]
+        return hashlib.sha256('\x00'.join(parts).encode()).hexdigest()
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    def set(self, key, data):
+        self.backend.set(key, data)
+
+    def invalidate(self, *slugs):
+        """Make every cached response for ``slugs`` (and every unscoped one) stale."""
+        for slug in slugs:
+            self.backend.bump_version(slug)
+        self.backend.bump_version(GLOBAL_SCOPE)
+
+
+def is_cacheable(document, operation_name):
+    operation = get_operation_ast(document, operation_name)
+    return operation is not None and operation.operation == OperationType.QUERY
+
+
+_response_cache = None
+
+
+def get_response_cache():
+    """Return the configured cache, or ``None`` when response caching is disabled."""
+    global _response_cache
+    config = getattr(settings, 'GRAPHQL_RESPONSE_CACHE', None) or {}
+    if not config.get('ENABLED', False):
+        return None
+    if _response_cache is None:
+        backend_class = import_string(config.get('BACKEND', 'projects.response_cache.LocalMemoryBackend'))
+        _response_cache = ResponseCache(backend_class(**config.get('OPTIONS', {})))
+    return _response_cache
+
+
+def invalidate_organization(slug):
+    """Invalidate the cached responses of organization ``slug`` once the current transaction commits."""
+    cache = get_response_cache()
+    if cache is not None:
+        transaction.on_commit(lambda: cache.invalidate(slug))
+
+
+@receiver(organization_data_changed)
+def invalidate_changed_organizations(sender, organization_ids=(), project_ids=(), **kwargs):
+    """Invalidate the organizations a model write changed, once its transaction commits.
+
+    Their slugs are read when the signal is sent, while rows a delete removes
+    still exist.
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return
+    slugs = list(Organization.objects.filter(
+        Q(pk__in=organization_ids)
+        | Q(pk__in=Project.objects.filter(pk__in=project_ids).values('organization_id'))
+    ).order_by().values_list('slug', flat=True))
+    transaction.on_commit(lambda: cache.invalidate(*slugs))
+
+
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+def invalidate_saved_organization(sender, instance, **kwargs):
+    invalidate_organization(instance.slug)
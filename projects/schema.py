@@ -1,14 +1,34 @@
+from inspect import isawaitable
+
 import graphene
+from asgiref.sync import sync_to_async
 from graphene_django import DjangoObjectType
+from django.db import transaction
 from django.db.models import Q
+from django.utils import timezone
+from graphql import GraphQLError
+from .cost import LIST_SIZES, list_too_long
+from .loaders import get_loaders
 from .models import Organization, Project, Task, TaskComment
+from .pagination import keyset_paginate, keyset_paginate_async
+from .search import COMMENT, TASK, encode_offset_cursor, search_page
+from .selection import get_model_fields, get_selected_fields
+from .tenancy import get_tenant
 
 
 class OrganizationType(DjangoObjectType):
+    organization_stats = graphene.Field('projects.schema.OrganizationStatsType')
+
     class Meta:
         model = Organization
         fields = '__all__'
 
+    def resolve_projects(self, info):
+        return get_loaders(info).organization_projects.load(self.pk)
+
+    def resolve_organization_stats(self, info):
+        return get_loaders(info).organization_stats.load(self.pk)
+
 
 class ProjectType(DjangoObjectType):
     task_stats = graphene.Field('projects.schema.TaskStatsType')
@@ -17,8 +37,14 @@ class ProjectType(DjangoObjectType):
         model = Project
         fields = '__all__'
 
+    def resolve_organization(self, info):
+        return get_loaders(info).organization.load(self.organization_id)
+
+    def resolve_tasks(self, info):
+        return get_loaders(info).project_tasks.load(self.pk)
+
     def resolve_task_stats(self, info):
-        return self
+        return self.task_stats
 
 
 class TaskType(DjangoObjectType):
@@ -26,38 +52,246 @@ class TaskType(DjangoObjectType):
         model = Task
         fields = '__all__'
 
+    def resolve_project(self, info):
+        return get_loaders(info).project.load(self.project_id)
+
+    def resolve_comments(self, info):
+        return get_loaders(info).task_comments.load(self.pk)
+
 
 class TaskCommentType(DjangoObjectType):
     class Meta:
         model = TaskComment
         fields = '__all__'
 
+    def resolve_task(self, info):
+        return get_loaders(info).task.load(self.task_id)
+
+
+class CountableConnection(graphene.relay.Connection):
+    """Relay connection with an opt-in ``totalCount``, built by ``keyset_paginate``."""
+    total_count = graphene.Int()
+
+    class Meta:
+        abstract = True
+
+    def resolve_total_count(self, info):
+        if get_loaders(info).is_async:
+            return self.total_queryset.acount()
+        return self.total_queryset.count()
+
+
+class ProjectConnection(CountableConnection):
+    class Meta:
+        node = ProjectType
+
+
+class TaskConnection(CountableConnection):
+    class Meta:
+        node = TaskType
+
+
+class TaskCommentConnection(CountableConnection):
+    class Meta:
+        node = TaskCommentType
+
 
 class TaskStatsType(graphene.ObjectType):
+    """Resolved from ``Project.task_stats``, which reads stored counters."""
     total = graphene.Int()
     completed = graphene.Int()
     in_progress = graphene.Int()
     todo = graphene.Int()
     completion_rate = graphene.Float()
 
-    def resolve_total(self, info):
-        return self.tasks.count()
 
-    def resolve_completed(self, info):
-        return self.tasks.filter(status='DONE').count()
+class OrganizationStatsType(graphene.ObjectType):
+    """Resolved from the ``OrganizationStats`` rollup row; overdue counts are counted when read."""
+    project_count = graphene.Int()
+    active_project_count = graphene.Int()
+    completed_project_count = graphene.Int()
+    on_hold_project_count = graphene.Int()
+    archived_project_count = graphene.Int()
+    task_stats = graphene.Field(TaskStatsType)
+    overdue_project_count = graphene.Int()
+    overdue_task_count = graphene.Int()
+    reconciled_at = graphene.DateTime()
+
+    def resolve_overdue_project_count(self, info):
+        return resolve_overdue_count(info, self.organization_id, 0)
+
+    def resolve_overdue_task_count(self, info):
+        return resolve_overdue_count(info, self.organization_id, 1)
+
+
+def resolve_overdue_count(info, organization_id, index):
+    counts = get_loaders(info).overdue_counts.load(organization_id)
+    if isinstance(counts, tuple):
+        return counts[index]
+    return _overdue_count_async(counts, index)
+
+
+async def _overdue_count_async(counts, index):
+    return (await counts)[index]
+
+
+# Root resolvers go through the helpers below, which limit the queryset to the
+# columns the operation reads, evaluate it and register the results with the
+# request's loaders. Under ``AsyncGraphQLView``
+# they return awaitables using the async ORM instead, so the same schema serves
+# both views and sibling root fields are awaited concurrently.
+
+def fetch(info, queryset, list_field=None):
+    """Evaluate ``queryset``; with ``list_field``, fail rather than return more than its ``LIST_SIZES`` rows."""
+    loaders = get_loaders(info)
+    queryset = loaders.prune(queryset)
+    if list_field is not None:
+        queryset = queryset[:LIST_SIZES[list_field] + 1]
+    if loaders.is_async:
+        return _fetch_async(loaders, queryset, list_field)
+    return loaders.register(check_list_size(list(queryset), list_field))
+
+
+async def _fetch_async(loaders, queryset, list_field):
+    return loaders.register(check_list_size([instance async for instance in queryset], list_field))
+
+
+def check_list_size(instances, list_field):
+    if list_field is not None and len(instances) > LIST_SIZES[list_field]:
+        raise list_too_long(list_field)
+    return instances
+
+
+def fetch_one(info, queryset):
+    loaders = get_loaders(info)
+    queryset = loaders.prune(queryset)
+    if loaders.is_async:
+        return _fetch_one_async(loaders, queryset)
+    return loaders.register([queryset.get()])[0]
+
+
+async def _fetch_one_async(loaders, queryset):
+    return loaders.register([await queryset.aget()])[0]
+
+
+class SearchHitType(graphene.ObjectType):
+    """A task or comment matching a search, with its relevance score."""
+    kind = graphene.String(description='TASK or COMMENT')
+    score = graphene.Float()
+    task = graphene.Field(TaskType, description='The matching task, or the task of the matching comment')
+    comment = graphene.Field(TaskCommentType)
+
+
+class SearchHitConnection(graphene.relay.Connection):
+    class Meta:
+        node = SearchHitType
+
+
+def paginate(info, connection_type, queryset, **kwargs):
+    loaders = get_loaders(info)
+    queryset = loaders.prune(queryset)
+    if loaders.is_async:
+        return _paginate_async(loaders, connection_type, queryset, **kwargs)
+    connection = keyset_paginate(connection_type, queryset, **kwargs)
+    loaders.register([edge.node for edge in connection.edges])
+    return connection
+
 
-    def resolve_in_progress(self, info):
-        return self.tasks.filter(status='IN_PROGRESS').count()
+async def _paginate_async(loaders, connection_type, queryset, **kwargs):
+    connection = await keyset_paginate_async(connection_type, queryset, **kwargs)
+    loaders.register([edge.node for edge in connection.edges])
+    return connection
 
-    def resolve_todo(self, info):
-        return self.tasks.filter(status='TODO').count()
 
-    def resolve_completion_rate(self, info):
-        total = self.tasks.count()
-        if total == 0:
-            return 0.0
-        completed = self.tasks.filter(status='DONE').count()
-        return (completed / total) * 100
+def then(value, callback):
+    """``callback(value)``, awaiting ``value`` and the result first when they are awaitable.
+
+    Tenant lookups are awaitable under ``AsyncGraphQLView`` (see ``get_tenant``).
+    """
+    if isawaitable(value):
+        return _then_async(value, callback)
+    return callback(value)
+
+
+async def _then_async(value, callback):
+    result = callback(await value)
+    return await result if isawaitable(result) else result
+
+
+def tenant_projects(info, organization_slug=None):
+    """Projects of the named organization, or of the request's tenant when omitted.
+
+    Without either, every project is returned. Awaitable when the tenant
+    lookup is.
+    """
+    queryset = Project.objects.all()
+    if not (organization_slug or getattr(info.context, 'tenant_slug', None)):
+        return queryset
+
+    def scope(organization):
+        if organization is None:
+            return queryset.none()
+        get_loaders(info).organization.prime(organization.pk, organization)
+        return queryset.filter(organization_id=organization.pk)
+
+    return then(get_tenant(info, organization_slug), scope)
+
+
+def tenant_tasks(info, organization_slug):
+    """Tasks of the named organization; awaitable when the tenant lookup is."""
+    def scope(organization):
+        if organization is None:
+            return Task.objects.none()
+        return Task.objects.filter(project__organization_id=organization.pk)
+
+    return then(get_tenant(info, organization_slug), scope)
+
+
+def filter_overdue(queryset, overdue=None):
+    """Apply an optional ``overdue`` argument; ``None`` leaves the queryset as is."""
+    if overdue is None:
+        return queryset
+    return queryset.overdue(overdue)
+
+
+def get_tenant_or_error(info, slug):
+    def check(organization):
+        if organization is None:
+            raise Organization.DoesNotExist('Organization matching query does not exist.')
+        return organization
+
+    return then(get_tenant(info, slug), check)
+
+
+def search_connection(info, organization, query, first=None, after=None):
+    """Rank hits with the search backend, then load their tasks and comments in two queries."""
+    if organization is None:
+        return SearchHitConnection(edges=[], page_info=graphene.relay.PageInfo(
+            has_next_page=False, has_previous_page=False))
+    hits, offset, has_next_page = search_page(organization.pk, query, first, after)
+    loaders = get_loaders(info)
+    comments = loaders.prune(TaskComment.objects.all()).in_bulk([hit.object_id for hit in hits if hit.kind == COMMENT])
+    task_ids = {hit.object_id for hit in hits if hit.kind == TASK}
+    task_ids.update(comment.task_id for comment in comments.values())
+    tasks = loaders.prune(Task.objects.all()).in_bulk(task_ids)
+    loaders.register([*tasks.values(), *comments.values()])
+    for hit in hits:
+        if hit.kind == COMMENT:
+            hit.comment = comments.get(hit.object_id)
+            hit.task = tasks.get(hit.comment.task_id) if hit.comment else None
+        else:
+            hit.task = tasks.get(hit.object_id)
+
+    edges = [
+        SearchHitConnection.Edge(node=hit, cursor=encode_offset_cursor(offset + index))
+        for index, hit in enumerate(hits)
+    ]
+    return SearchHitConnection(edges=edges, page_info=graphene.relay.PageInfo(
+        start_cursor=edges[0].cursor if edges else None,
+        end_cursor=edges[-1].cursor if edges else None,
+        has_previous_page=offset > 0,
+        has_next_page=has_next_page,
+    ))
 
 
 class CreateProjectInput(graphene.InputObjectType):
@@ -102,45 +336,104 @@ class CreateCommentInput(graphene.InputObjectType):
 class Query(graphene.ObjectType):
     # Organization queries
     organization = graphene.Field(OrganizationType, slug=graphene.String(required=True))
-    organizations = graphene.List(OrganizationType)
+    organizations = graphene.List(
+        OrganizationType, description=f'Fails when there are more than {LIST_SIZES["Query.organizations"]} organizations',
+    )
     
     # Project queries
-    projects = graphene.List(ProjectType, organization_slug=graphene.String())
+    projects = graphene.List(
+        ProjectType, organization_slug=graphene.String(), overdue=graphene.Boolean(),
+        description=f'Fails when there are more than {LIST_SIZES["Query.projects"]}; page through them with projectConnection',
+    )
+    project_connection = graphene.relay.ConnectionField(
+        ProjectConnection, organization_slug=graphene.String(), overdue=graphene.Boolean(),
+    )
     project = graphene.Field(ProjectType, id=graphene.ID(required=True))
+    overdue_projects = graphene.List(
+        ProjectType, organization_slug=graphene.String(required=True), description=f'Longest overdue first; fails when there are more than {LIST_SIZES["Query.overdueProjects"]}',
+    )
     
     # Task queries
-    tasks = graphene.List(TaskType, project_id=graphene.ID())
+    tasks = graphene.relay.ConnectionField(TaskConnection, project_id=graphene.ID(), overdue=graphene.Boolean())
     task = graphene.Field(TaskType, id=graphene.ID(required=True))
+    overdue_tasks = graphene.relay.ConnectionField(TaskConnection, organization_slug=graphene.String(required=True))
     
     # Comment queries
-    comments = graphene.List(TaskCommentType, task_id=graphene.ID())
+    comments = graphene.relay.ConnectionField(TaskCommentConnection, task_id=graphene.ID())
+
+    # Full-text search over task titles/descriptions and comments
+    search = graphene.Field(
+        SearchHitConnection,
+        organization_slug=graphene.String(required=True),
+        query=graphene.String(required=True),
+        first=graphene.Int(),
+        after=graphene.String(),
+    )
 
     def resolve_organization(self, info, slug):
-        return Organization.objects.get(slug=slug)
+        return then(get_tenant_or_error(info, slug), lambda organization: get_loaders(info).register([organization])[0])
 
     def resolve_organizations(self, info):
-        return Organization.objects.all()
+        return fetch(info, Organization.objects.all(), 'Query.organizations')
+
+    def resolve_projects(self, info, organization_slug=None, overdue=None):
+        return then(tenant_projects(info, organization_slug), lambda queryset: fetch(
+            info, filter_overdue(queryset, overdue), 'Query.projects',
+        ))
 
-    def resolve_projects(self, info, organization_slug=None):
-        if organization_slug:
-            return Project.objects.filter(organization__slug=organization_slug)
-        return Project.objects.all()
+    def resolve_project_connection(self, info, organization_slug=None, overdue=None, **kwargs):
+        return then(tenant_projects(info, organization_slug), lambda queryset: paginate(
+            info, ProjectConnection, filter_overdue(queryset, overdue), **kwargs,
+        ))
 
     def resolve_project(self, info, id):
-        return Project.objects.get(pk=id)
+        return fetch_one(info, Project.objects.filter(pk=id))
 
-    def resolve_tasks(self, info, project_id=None):
+    def resolve_overdue_projects(self, info, organization_slug):
+        return then(tenant_projects(info, organization_slug), lambda queryset: fetch(
+            info, queryset.overdue().order_by('due_date', 'pk'), 'Query.overdueProjects',
+        ))
+
+    def resolve_tasks(self, info, project_id=None, overdue=None, **kwargs):
+        queryset = Task.objects.all()
         if project_id:
-            return Task.objects.filter(project_id=project_id)
-        return Task.objects.all()
+            queryset = queryset.filter(project_id=project_id)
+        return paginate(info, TaskConnection, filter_overdue(queryset, overdue), **kwargs)
 
     def resolve_task(self, info, id):
-        return Task.objects.get(pk=id)
+        return fetch_one(info, Task.objects.filter(pk=id))
+
+    def resolve_overdue_tasks(self, info, organization_slug, **kwargs):
+        return then(tenant_tasks(info, organization_slug), lambda queryset: paginate(
+            info, TaskConnection, queryset.overdue(), **kwargs,
+        ))
 
-    def resolve_comments(self, info, task_id=None):
+    def resolve_comments(self, info, task_id=None, **kwargs):
+        queryset = TaskComment.objects.all()
         if task_id:
-            return TaskComment.objects.filter(task_id=task_id)
-        return TaskComment.objects.all()
+            queryset = queryset.filter(task_id=task_id)
+        return paginate(info, TaskCommentConnection, queryset, **kwargs)
+
+    def resolve_search(self, info, organization_slug, query, first=None, after=None):
+        if get_loaders(info).is_async:
+            return then(get_tenant(info, organization_slug), lambda organization: sync_to_async(search_connection)(
+                info, organization, query, first, after,
+            ))
+        return search_connection(info, get_tenant(info, organization_slug), query, first, after)
+
+
+def update_row(info, model, payload_field, input, fields):
+    """Apply the non-null ``fields`` of ``input`` to row ``input.id`` with one UPDATE.
+
+    Only the columns the payload's ``payload_field`` selection needs are read
+    back, so an unselected payload loads nothing more.
+    """
+    values = {field: getattr(input, field) for field in fields if getattr(input, field) is not None}
+    loaded = get_model_fields(model, get_selected_fields(info, payload_field))
+    instance = model.objects.update_row(input.id, values, loaded)
+    if instance is None:
+        raise model.DoesNotExist(f'{model._meta.object_name} matching query does not exist.')
+    return instance
 
 
 class CreateProject(graphene.Mutation):
@@ -151,7 +444,7 @@ class CreateProject(graphene.Mutation):
     project = graphene.Field(ProjectType)
 
     def mutate(self, info, input, organization_slug):
-        organization = Organization.objects.get(slug=organization_slug)
+        organization = get_tenant_or_error(info, organization_slug)
         project = Project.objects.create(
             organization=organization,
             name=input.name,
@@ -168,19 +461,10 @@ class UpdateProject(graphene.Mutation):
 
     project = graphene.Field(ProjectType)
 
+    FIELDS = ['name', 'description', 'status', 'due_date']
+
     def mutate(self, info, input):
-        project = Project.objects.get(pk=input.id)
-        
-        if input.name is not None:
-            project.name = input.name
-        if input.description is not None:
-            project.description = input.description
-        if input.status is not None:
-            project.status = input.status
-        if input.due_date is not None:
-            project.due_date = input.due_date
-            
-        project.save()
+        project = update_row(info, Project, 'project', input, UpdateProject.FIELDS)
         return UpdateProject(project=project)
 
 
@@ -221,21 +505,10 @@ class UpdateTask(graphene.Mutation):
 
     task = graphene.Field(TaskType)
 
+    FIELDS = ['title', 'description', 'status', 'assignee_email', 'due_date']
+
     def mutate(self, info, input):
-        task = Task.objects.get(pk=input.id)
-        
-        if input.title is not None:
-            task.title = input.title
-        if input.description is not None:
-            task.description = input.description
-        if input.status is not None:
-            task.status = input.status
-        if input.assignee_email is not None:
-            task.assignee_email = input.assignee_email
-        if input.due_date is not None:
-            task.due_date = input.due_date
-            
-        task.save()
+        task = update_row(info, Task, 'task', input, UpdateTask.FIELDS)
         return UpdateTask(task=task)
 
 
@@ -251,6 +524,139 @@ class DeleteTask(graphene.Mutation):
         return DeleteTask(success=True)
 
 
+class BulkTaskResult(graphene.ObjectType):
+    """Outcome of one item of a bulk task mutation, in input order."""
+    index = graphene.Int()
+    id = graphene.ID()
+    success = graphene.Boolean()
+    error = graphene.String()
+    task = graphene.Field(TaskType)
+
+
+BULK_MAX_ITEMS = 1000
+TASK_STATUSES = {value for value, _ in Task.STATUS_CHOICES}
+
+
+def check_bulk_size(items):
+    if len(items) > BULK_MAX_ITEMS:
+        raise GraphQLError(f'Bulk mutations accept at most {BULK_MAX_ITEMS} items.')
+
+
+class BulkCreateTasks(graphene.Mutation):
+    """Create many tasks in one transaction with a constant number of queries.
+
+    Every task must belong to a project of ``organization_slug``; items that
+    fail validation are reported and the rest are created.
+    """
+    class Arguments:
+        organization_slug = graphene.String(required=True)
+        inputs = graphene.List(graphene.NonNull(CreateTaskInput), required=True)
+
+    results = graphene.List(BulkTaskResult)
+
+    def mutate(self, info, organization_slug, inputs):
+        check_bulk_size(inputs)
+        with transaction.atomic():
+            # Locked so the projects cannot be deleted or moved to another
+            # organization before the tasks are created.
+            project_ids = tenant_projects(info, organization_slug).select_for_update().filter(
+                pk__in={item.project_id for item in inputs},
+            ).order_by('pk').values_list('pk', flat=True)
+            project_ids = {str(pk): pk for pk in project_ids}
+
+            results, tasks = [], []
+            for index, item in enumerate(inputs):
+                status = item.status or 'TODO'
+                if str(item.project_id) not in project_ids:
+                    results.append(BulkTaskResult(index=index, success=False, error='Project not found in organization'))
+                elif status not in TASK_STATUSES:
+                    results.append(BulkTaskResult(index=index, success=False, error=f'Invalid status: {status}'))
+                else:
+                    task = Task(
+                        project_id=project_ids[str(item.project_id)],
+                        title=item.title,
+                        description=item.description or '',
+                        status=status,
+                        assignee_email=item.assignee_email or '',
+                        due_date=item.due_date
+                    )
+                    tasks.append(task)
+                    results.append(BulkTaskResult(index=index, success=True, task=task))
+            Task.objects.bulk_create(tasks)
+        get_loaders(info).register(tasks)
+        for result in results:
+            if result.task is not None:
+                result.id = result.task.pk
+        return BulkCreateTasks(results=results)
+
+
+class BulkUpdateTasks(graphene.Mutation):
+    """Update many tasks with one ``bulk_update`` limited to the supplied fields."""
+    class Arguments:
+        organization_slug = graphene.String(required=True)
+        inputs = graphene.List(graphene.NonNull(UpdateTaskInput), required=True)
+
+    results = graphene.List(BulkTaskResult)
+
+    FIELDS = UpdateTask.FIELDS
+
+    def mutate(self, info, organization_slug, inputs):
+        check_bulk_size(inputs)
+        with transaction.atomic():
+            tasks = tenant_tasks(info, organization_slug).select_for_update().filter(
+                pk__in={item.id for item in inputs},
+            ).in_bulk()
+            results, changed = BulkUpdateTasks.apply_inputs(inputs, {str(pk): task for pk, task in tasks.items()})
+        get_loaders(info).register(changed)
+        return BulkUpdateTasks(results=results)
+
+    @classmethod
+    def apply_inputs(cls, inputs, tasks):
+        now = timezone.now()
+        results, changed, fields = [], {}, {'updated_at'}
+        for index, item in enumerate(inputs):
+            task = tasks.get(str(item.id))
+            if task is None:
+                results.append(BulkTaskResult(index=index, id=item.id, success=False, error='Task not found in organization'))
+                continue
+            if item.status is not None and item.status not in TASK_STATUSES:
+                results.append(BulkTaskResult(index=index, id=item.id, success=False, error=f'Invalid status: {item.status}'))
+                continue
+            for field in cls.FIELDS:
+                value = getattr(item, field)
+                if value is not None:
+                    setattr(task, field, value)
+                    fields.add(field)
+            task.updated_at = now
+            changed[task.pk] = task
+            results.append(BulkTaskResult(index=index, id=task.pk, success=True, task=task))
+        Task.objects.bulk_update(list(changed.values()), sorted(fields))
+        return results, list(changed.values())
+
+
+class BulkDeleteTasks(graphene.Mutation):
+    """Delete many tasks (and their comments) with one set of DELETE statements."""
+    class Arguments:
+        organization_slug = graphene.String(required=True)
+        ids = graphene.List(graphene.NonNull(graphene.ID), required=True)
+
+    results = graphene.List(BulkTaskResult)
+
+    def mutate(self, info, organization_slug, ids):
+        check_bulk_size(ids)
+        tasks = tenant_tasks(info, organization_slug).filter(pk__in=set(ids))
+        with transaction.atomic():
+            found = {str(pk) for pk in tasks.values_list('pk', flat=True)}
+            if found:
+                Task.objects.filter(pk__in=found).delete()
+        results = [
+            BulkTaskResult(index=index, id=id, success=str(id) in found,
+                           error=None if str(id) in found else 'Task not found in organization')
+            for index, id in enumerate(ids)
+        ]
+        return BulkDeleteTasks(results=results)
+
+
 class CreateComment(graphene.Mutation):
     class Arguments:
         input = CreateCommentInput(required=True)
@@ -275,6 +681,9 @@ class Mutation(graphene.ObjectType):
     create_task = CreateTask.Field()
     update_task = UpdateTask.Field()
     delete_task = DeleteTask.Field()
+    bulk_create_tasks = BulkCreateTasks.Field()
+    bulk_update_tasks = BulkUpdateTasks.Field()
+    bulk_delete_tasks = BulkDeleteTasks.Field()
     
     create_comment = CreateComment.Field()
 
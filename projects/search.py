@@ -0,0 +1,234 @@
+import base64
+import json
+import re
+
+from django.db import connection as default_connection
+from graphql import GraphQLError
+
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+TASK = 'TASK'
+COMMENT = 'COMMENT'
+
+
+class SearchHit:
+    __slots__ = ('kind', 'object_id', 'score', 'task', 'comment')
+
+    def __init__(self, kind, object_id, score):
+        self.kind = kind
+        self.object_id = object_id
+        self.score = score
+        self.task = None
+        self.comment = None
+
+
+class SearchBackend:
+    """Full-text index over task titles/descriptions and comment contents.
+
+    The index lives in the database and is kept up to date by the database
+    itself (generated columns or triggers), so every write path, including
+    bulk ones, is covered. ``search`` returns hits of one organization ranked
+    by relevance, best first. Migration 0004 installs a frozen copy of
+    ``install_sql``; changing it needs a new migration.
+    """
+    install_sql = ()
+    uninstall_sql = ()
+    rebuild_sql = ()
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def install(self):
+        self._run(self.install_sql)
+
+    def uninstall(self):
+        self._run(self.uninstall_sql)
+
+    def rebuild(self):
+        self._run(self.rebuild_sql)
+
+    def _run(self, statements):
+        with self.connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+    def search(self, organization_id, query, limit, offset=0):
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return []
+        sql, params = self.get_sql(organization_id, terms)
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'{sql} ORDER BY score DESC, created_at DESC, kind, id LIMIT %s OFFSET %s',
+                           [*params, limit, offset])
+            return [SearchHit(kind, object_id, score) for kind, object_id, score, _ in cursor.fetchall()]
+
+    def get_sql(self, organization_id, terms):
+        """Return ``(sql, params)`` selecting ``kind, id, score, created_at`` rows."""
+        raise NotImplementedError
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Stored ``tsvector`` generated columns with GIN indexes."""
+    install_sql = (
+        """
+        ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED
+        """,
+        'CREATE INDEX IF NOT EXISTS tasks_search_idx ON tasks USING GIN (search_vector)',
+        """
+        ALTER TABLE task_comments ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED
+        """,
+        'CREATE INDEX IF NOT EXISTS task_comments_search_idx ON task_comments USING GIN (search_vector)',
+    )
+    uninstall_sql = (
+        'ALTER TABLE tasks DROP COLUMN IF EXISTS search_vector',
+        'ALTER TABLE task_comments DROP COLUMN IF EXISTS search_vector',
+    )
+    # Generated columns are always current; nothing to rebuild.
+    rebuild_sql = ()
+
+    def get_sql(self, organization_id, terms):
+        tsquery = ' '.join(terms)
+        sql = """
+            SELECT %s AS kind, t.id AS id, ts_rank(t.search_vector, q) AS score, t.created_at AS created_at
+            FROM tasks t
+            JOIN projects p ON p.id = t.project_id,
+                 plainto_tsquery('english', %s) q
+            WHERE p.organization_id = %s AND t.search_vector @@ q
+            UNION ALL
+            SELECT %s AS kind, c.id AS id, ts_rank(c.search_vector, q) AS score, c.created_at AS created_at
+            FROM task_comments c
+            JOIN tasks t ON t.id = c.task_id
+            JOIN projects p ON p.id = t.project_id,
+                 plainto_tsquery('english', %s) q
+            WHERE p.organization_id = %s AND c.search_vector @@ q
+        """
+        return sql, [TASK, tsquery, organization_id, COMMENT, tsquery, organization_id]
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """External-content FTS5 tables kept in step by triggers."""
+    install_sql = (
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+            title, description, content='tasks', content_rowid='id', tokenize='porter unicode61'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+        END
+        """,
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS task_comments_fts USING fts5(
+            content, content='task_comments', content_rowid='id', tokenize='porter unicode61'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS task_comments_fts_insert AFTER INSERT ON task_comments BEGIN
+            INSERT INTO task_comments_fts(rowid, content) VALUES (new.id, new.content);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS task_comments_fts_delete AFTER DELETE ON task_comments BEGIN
+            INSERT INTO task_comments_fts(task_comments_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS task_comments_fts_update AFTER UPDATE OF content ON task_comments BEGIN
+            INSERT INTO task_comments_fts(task_comments_fts, rowid, content) VALUES ('delete', old.id, old.content);
+            INSERT INTO task_comments_fts(rowid, content) VALUES (new.id, new.content);
+        END
+        """,
+    )
+    uninstall_sql = (
+        'DROP TRIGGER IF EXISTS tasks_fts_insert',
+        'DROP TRIGGER IF EXISTS tasks_fts_delete',
+        'DROP TRIGGER IF EXISTS tasks_fts_update',
+        'DROP TABLE IF EXISTS tasks_fts',
+        'DROP TRIGGER IF EXISTS task_comments_fts_insert',
+        'DROP TRIGGER IF EXISTS task_comments_fts_delete',
+        'DROP TRIGGER IF EXISTS task_comments_fts_update',
+        'DROP TABLE IF EXISTS task_comments_fts',
+    )
+    rebuild_sql = (
+        "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+        "INSERT INTO task_comments_fts(task_comments_fts) VALUES ('rebuild')",
+    )
+
+    def get_sql(self, organization_id, terms):
+        # Quoting every term keeps FTS5 query syntax out of user input.
+        match = ' '.join('"{}"'.format(term) for term in terms)
+        sql = """
+            SELECT %s AS kind, t.id AS id, -bm25(tasks_fts, 4.0, 1.0) AS score, t.created_at AS created_at
+            FROM tasks_fts
+            JOIN tasks t ON t.id = tasks_fts.rowid
+            JOIN projects p ON p.id = t.project_id
+            WHERE tasks_fts MATCH %s AND p.organization_id = %s
+            UNION ALL
+            SELECT %s AS kind, c.id AS id, -bm25(task_comments_fts) AS score, c.created_at AS created_at
+            FROM task_comments_fts
+            JOIN task_comments c ON c.id = task_comments_fts.rowid
+            JOIN tasks t ON t.id = c.task_id
+            JOIN projects p ON p.id = t.project_id
+            WHERE task_comments_fts MATCH %s AND p.organization_id = %s
+        """
+        return sql, [TASK, match, organization_id, COMMENT, match, organization_id]
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_search_backend(connection=None):
+    connection = connection or default_connection
+    backend_class = BACKENDS.get(connection.vendor)
+    if backend_class is None:
+        raise GraphQLError(f'Search is not supported on {connection.vendor}.')
+    return backend_class(connection)
+
+
+def encode_offset_cursor(offset):
+    return base64.urlsafe_b64encode(json.dumps(['offset', offset]).encode()).decode()
+
+
+def decode_offset_cursor(cursor):
+    try:
+        kind, offset = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if kind == 'offset' and isinstance(offset, int) and offset >= 0:
+            return offset
+    except (ValueError, TypeError):
+        pass
+    raise GraphQLError(f'Invalid cursor: {cursor!r}')
+
+
+def search_page(organization_id, query, first=None, after=None):
+    """Return ``(hits, offset, has_next_page)`` for one page of ranked hits.
+
+    Relevance order has no stable keyset, so pages are addressed by offset.
+    """
+    if first is not None and first < 0:
+        raise GraphQLError('Argument "first" must be a non-negative integer.')
+    first = DEFAULT_PAGE_SIZE if first is None else min(first, MAX_PAGE_SIZE)
+    offset = decode_offset_cursor(after) + 1 if after else 0
+    hits = get_search_backend().search(organization_id, query, first + 1, offset)
+    return hits[:first], offset, len(hits) > first
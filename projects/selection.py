@@ -0,0 +1,127 @@
+from collections import defaultdict
+
+from django.core.exceptions import FieldDoesNotExist
+from graphene.utils.str_converters import to_snake_case
+from graphql import FieldNode, FragmentSpreadNode, InlineFragmentNode, get_named_type
+
+from .models import Organization, Project
+
+# Object type fields that are not model fields -> the model fields they read.
+COMPUTED_FIELDS = {
+    Organization: {'organization_stats': []},
+    Project: {'task_stats': list(Project.TASK_COUNTERS.values())},
+}
+
+
+def iter_field_nodes(fragments, selection_set, visited=frozenset()):
+    """Field nodes of ``selection_set``, with inline fragments and spreads of ``fragments`` (by name) expanded."""
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            yield selection
+        elif isinstance(selection, InlineFragmentNode):
+            yield from iter_field_nodes(fragments, selection.selection_set, visited)
+        elif isinstance(selection, FragmentSpreadNode):
+            name = selection.name.value
+            fragment = fragments.get(name)
+            if fragment is not None and name not in visited:
+                yield from iter_field_nodes(fragments, fragment.selection_set, visited | {name})
+
+
+def get_selected_fields(info, *path):
+    """Snake-case names of the fields selected under the field being resolved.
+
+    ``path`` names fields to descend through first, e.g. ``'task'`` for the
+    task of a mutation payload. Returns an empty set when the path is not
+    selected.
+    """
+    nodes = list(info.field_nodes)
+    for name in path:
+        nodes = [
+            node for parent in nodes if parent.selection_set
+            for node in iter_field_nodes(info.fragments, parent.selection_set)
+            if to_snake_case(node.name.value) == name
+        ]
+    return {
+        to_snake_case(node.name.value)
+        for parent in nodes if parent.selection_set
+        for node in iter_field_nodes(info.fragments, parent.selection_set)
+        if not node.name.value.startswith('__')
+    }
+
+
+def get_model_fields(model, names):
+    """Attnames of ``model`` needed to resolve the fields ``names``, or ``None`` when one needs the whole row.
+
+    Forward relations need their foreign key and reverse relations the
+    primary key; other fields need ``COMPUTED_FIELDS``.
+    """
+    meta = model._meta
+    attnames = {meta.pk.attname}
+    computed = COMPUTED_FIELDS.get(model, {})
+    for name in names:
+        if name in computed:
+            attnames.update(computed[name])
+            continue
+        try:
+            field = meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        if field.concrete:
+            attnames.add(field.attname)
+        elif not field.is_relation:
+            return None
+    return attnames
+
+
+def get_type_selections(info):
+    """Snake-case names of the fields selected on each object type anywhere in the operation, by type name."""
+    selections = defaultdict(set)
+
+    def visit(selection_set, parent_type, visited):
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                name = selection.name.value
+                field = getattr(parent_type, 'fields', {}).get(name)
+                if field is None:
+                    continue
+                selections[parent_type.name].add(to_snake_case(name))
+                if selection.selection_set:
+                    visit(selection.selection_set, get_named_type(field.type), visited)
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = parent_type
+                if selection.type_condition:
+                    fragment_type = info.schema.get_type(selection.type_condition.name.value)
+                visit(selection.selection_set, fragment_type, visited)
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = info.fragments.get(name)
+                if fragment is not None and name not in visited:
+                    fragment_type = info.schema.get_type(fragment.type_condition.name.value)
+                    visit(fragment.selection_set, fragment_type, visited | {name})
+
+    visit(info.operation.selection_set, info.schema.get_root_type(info.operation.operation), frozenset())
+    return selections
+
+
+def get_operation_columns(info):
+    """Model -> attnames the operation reads from its instances, for models whose rows can be pruned.
+
+    Every selection of a model's object type in the operation is merged, so
+    an instance loaded for one part of the document serves all the others
+    without loading deferred fields. Foreign keys and ordering fields are
+    always kept: loaders and keyset cursors read them.
+    """
+    columns = {}
+    for type_name, names in get_type_selections(info).items():
+        graphene_type = getattr(info.schema.get_type(type_name), 'graphene_type', None)
+        model = getattr(getattr(graphene_type, '_meta', None), 'model', None)
+        if model is None:
+            continue
+        fields = get_model_fields(model, names)
+        if fields is None:
+            continue
+        meta = model._meta
+        fields.update(field.attname for field in meta.concrete_fields if field.is_relation)
+        fields.update(meta.get_field(name.lstrip('-')).attname for name in meta.ordering)
+        columns[model] = fields
+    return columns
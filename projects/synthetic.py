@@ -0,0 +1,162 @@
+import random
+from datetime import timedelta
+
+from django.utils import timezone
+
+TASK_STATUS_MIX = {'TODO': 50, 'IN_PROGRESS': 30, 'DONE': 20}
+PROJECT_STATUS_MIX = {'ACTIVE': 70, 'COMPLETED': 15, 'ON_HOLD': 10, 'ARCHIVED': 5}
+
+VERBS = ('Design', 'Build', 'Review', 'Test', 'Document', 'Refactor', 'Deploy', 'Migrate', 'Audit', 'Plan')
+NOUNS = ('login flow', 'billing page', 'search index', 'API client', 'dashboard', 'onboarding', 'reports',
+         'notifications', 'data export', 'mobile layout', 'permissions', 'release notes')
+WORDS = ('the', 'customer', 'needs', 'this', 'before', 'launch', 'blocked', 'on', 'review', 'update', 'spec',
+         'see', 'ticket', 'looks', 'good', 'fixed', 'in', 'latest', 'build', 'please', 'check', 'again')
+ASSIGNEES = 50
+HISTORY_DAYS = 365
+DUE_WINDOW_DAYS = 90
+UNDATED_RATIO = 0.3
+
+
+def parse_mix(value, choices):
+    """Parse ``"TODO=50,DONE=20"`` into ``{status: weight}``."""
+    mix = {}
+    for part in value.split(','):
+        status, _, weight = part.partition('=')
+        status = status.strip().upper()
+        if status not in choices:
+            raise ValueError(f'Unknown status {status!r}; expected one of {", ".join(choices)}')
+        try:
+            mix[status] = float(weight)
+        except ValueError:
+            raise ValueError(f'Invalid weight for {status}: {weight!r}')
+        if mix[status] < 0:
+            raise ValueError(f'Invalid weight for {status}: {weight!r}')
+    if not any(mix.values()):
+        raise ValueError('The status mix needs a positive weight')
+    return mix
+
+
+class DatasetSpec:
+    """Shape of a synthetic dataset.
+
+    ``due_date_skew`` is the fraction of dated tasks and projects due in the
+    past; 0.5 spreads due dates evenly around ``now``. The same spec, seed and
+    day always produce the same rows.
+    """
+
+    def __init__(self, organizations=1, projects=10, tasks=100, comments=2, status_mix=None,
+                 due_date_skew=0.2, seed=0, prefix='synthetic', now=None):
+        self.organizations = organizations
+        self.projects = projects
+        self.tasks = tasks
+        self.comments = comments
+        self.status_mix = status_mix or TASK_STATUS_MIX
+        self.due_date_skew = due_date_skew
+        self.seed = seed
+        self.prefix = prefix
+        # Whole days, so runs on the same day match exactly.
+        self.now = (now or timezone.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    @property
+    def rows_per_organization(self):
+        tasks = self.projects * self.tasks
+        return 1 + self.projects + tasks + tasks * self.comments
+
+    @property
+    def total_rows(self):
+        return self.organizations * self.rows_per_organization
+
+    def slug(self, index):
+        return f'{self.prefix}-{index + 1}'
+
+
+def _due_offset(rng, spec):
+    """Days from ``now`` to a due date, or ``None`` for an undated row."""
+    if rng.random() < UNDATED_RATIO:
+        return None
+    days = rng.uniform(0, DUE_WINDOW_DAYS)
+    return -days if rng.random() < spec.due_date_skew else days
+
+
+def _projects(spec, index):
+    rng = random.Random(f'{spec.seed}:{index}:projects')
+    statuses = rng.choices(list(PROJECT_STATUS_MIX), list(PROJECT_STATUS_MIX.values()), k=spec.projects)
+    for number, status in enumerate(statuses, 1):
+        created_at = spec.now - timedelta(days=rng.uniform(DUE_WINDOW_DAYS, HISTORY_DAYS))
+        due = _due_offset(rng, spec)
+        yield {
+            'id': number,
+            'name': f'{rng.choice(VERBS)} {rng.choice(NOUNS)} #{number}',
+            'description': ' '.join(rng.choices(WORDS, k=12)),
+            'status': status,
+            'due_date': None if due is None else (spec.now + timedelta(days=due)).date(),
+            'created_at': created_at,
+            'updated_at': created_at,
+        }
+
+
+def _tasks(spec, index, project):
+    # Seeded per project, so comments can replay a project's tasks without
+    # keeping them in memory.
+    rng = random.Random(f'{spec.seed}:{index}:{project["id"]}:tasks')
+    statuses = rng.choices(list(spec.status_mix), list(spec.status_mix.values()), k=spec.tasks)
+    first_id = (project['id'] - 1) * spec.tasks
+    age = (spec.now - project['created_at']).total_seconds()
+    for number, status in enumerate(statuses, 1):
+        created_at = project['created_at'] + timedelta(seconds=rng.uniform(0, age))
+        due = _due_offset(rng, spec)
+        yield {
+            'id': first_id + number,
+            'project_id': project['id'],
+            'title': f'{rng.choice(VERBS)} {rng.choice(NOUNS)}',
+            'description': ' '.join(rng.choices(WORDS, k=8)),
+            'status': status,
+            'assignee_email': f'user{rng.randrange(ASSIGNEES)}@example.com',
+            'due_date': None if due is None else spec.now + timedelta(days=due),
+            'created_at': created_at,
+            'updated_at': created_at,
+        }
+
+
+def _comments(spec, index, task):
+    rng = random.Random(f'{spec.seed}:{index}:{task["id"]}:comments')
+    first_id = (task['id'] - 1) * spec.comments
+    age = (spec.now - task['created_at']).total_seconds()
+    for number in range(1, spec.comments + 1):
+        created_at = task['created_at'] + timedelta(seconds=rng.uniform(0, age))
+        yield {
+            'id': first_id + number,
+            'task_id': task['id'],
+            'content': ' '.join(rng.choices(WORDS, k=10)),
+            'author_email': f'user{rng.randrange(ASSIGNEES)}@example.com',
+            'created_at': created_at,
+            'updated_at': created_at,
+        }
+
+
+def generate_organization(spec, index):
+    """Yield the ``index``-th organization of ``spec`` as export records, parents first.
+
+    The records have the shape ``projects.export.iter_records`` produces, so
+    ``OrganizationImporter`` loads them.
+    """
+    created_at = spec.now - timedelta(days=HISTORY_DAYS)
+    slug = spec.slug(index)
+    yield 'organization', {
+        'id': index + 1,
+        'name': f'Synthetic Organization {index + 1}',
+        'slug': slug,
+        'contact_email': f'admin@{slug}.example.com',
+        'created_at': created_at,
+        'updated_at': created_at,
+    }
+    projects = [{'id': p['id'], 'created_at': p['created_at']} for p in _projects(spec, index)]
+    for project in _projects(spec, index):
+        yield 'project', project
+    for project in projects:
+        for task in _tasks(spec, index, project):
+            yield 'task', task
+    for project in projects:
+        for task in _tasks(spec, index, project):
+            for comment in _comments(spec, index, task):
+                yield 'comment', comment
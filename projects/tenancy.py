@@ -0,0 +1,178 @@
+import copy
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from graphql import FragmentDefinitionNode, get_operation_ast
+from graphql.utilities import value_from_ast_untyped
+
+from .cache import LRUCache
+from .loaders import get_loaders
+from .models import Organization
+from .selection import iter_field_nodes
+
+# Root query fields that read a single organization, and the argument naming
+# it. When the argument is omitted the request's tenant header applies.
+TENANT_FIELDS = {
+    'organization': 'slug',
+    'projects': 'organizationSlug',
+    'projectConnection': 'organizationSlug',
+    'overdueProjects': 'organizationSlug',
+    'overdueTasks': 'organizationSlug',
+    'search': 'organizationSlug',
+}
+
+
+class OrganizationCache:
+    """Process-local slug -> Organization cache.
+
+    Saving or deleting an organization clears it in the process that made the
+    change; other processes see the change once their entries expire.
+    """
+
+    def __init__(self, maxsize=256, ttl=300):
+        self._cache = LRUCache(maxsize, ttl)
+
+    def get_cached(self, slug):
+        """Return ``(found, organization)`` without touching the database."""
+        entry = self._cache.get(slug)
+        if entry is None:
+            return False, None
+        return True, copy.copy(entry)
+
+    def get(self, slug):
+        found, organization = self.get_cached(slug)
+        if found:
+            return organization
+        try:
+            organization = Organization.objects.get(slug=slug)
+        except Organization.DoesNotExist:
+            # Unknown slugs are not cached, so a new organization is found at once.
+            return None
+        self._cache.set(slug, organization)
+        return copy.copy(organization)
+
+    def clear(self):
+        self._cache.clear()
+
+
+_organization_cache = None
+
+
+def get_organization_cache():
+    global _organization_cache
+    if _organization_cache is None:
+        _organization_cache = OrganizationCache(
+            getattr(settings, 'TENANT_CACHE_SIZE', 256),
+            getattr(settings, 'TENANT_CACHE_TTL', 300),
+        )
+    return _organization_cache
+
+
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+def clear_organization_cache(sender, **kwargs):
+    # A save may rename the slug, so drop every entry rather than just one.
+    get_organization_cache().clear()
+
+
+def get_tenant_slug(request):
+    return request.headers.get(getattr(settings, 'TENANT_HEADER', 'X-Organization')) or None
+
+
+class TenantMiddleware:
+    """Resolve the organization named by the tenant header once per request.
+
+    Sets ``request.organizations`` (slug -> Organization or ``None``) and
+    ``request.organization``, the header's organization if one was given.
+    ``GraphQLView`` adds the organizations named by the document's arguments.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        load_tenants(request, [get_tenant_slug(request)])
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        await load_tenants_async(request, [get_tenant_slug(request)])
+        return await self.get_response(request)
+
+
+def _set_tenants(request, slugs):
+    organizations = getattr(request, 'organizations', None)
+    if organizations is None:
+        organizations = request.organizations = {}
+        request.tenant_slug = slugs[0] if slugs else None
+        request.organization = None
+    return organizations, [slug for slug in slugs if slug and slug not in organizations]
+
+
+def load_tenants(request, slugs):
+    """Resolve ``slugs`` into ``request.organizations``; the first call also sets the tenant."""
+    organizations, missing = _set_tenants(request, slugs)
+    cache = get_organization_cache()
+    for slug in missing:
+        organizations[slug] = cache.get(slug)
+    request.organization = organizations.get(request.tenant_slug)
+
+
+async def load_tenants_async(request, slugs):
+    organizations, missing = _set_tenants(request, slugs)
+    cache = get_organization_cache()
+    for slug in missing:
+        found, organization = cache.get_cached(slug)
+        organizations[slug] = organization if found else await sync_to_async(cache.get)(slug)
+    request.organization = organizations.get(request.tenant_slug)
+
+
+def root_field_tenants(document, variables, operation_name):
+    """Yield ``(field name, slug)`` for each root field of the operation, including those in fragments.
+
+    ``slug`` is the organization named by the field's tenant argument, or
+    ``None``.
+    """
+    operation = get_operation_ast(document, operation_name)
+    if operation is None:
+        return
+    fragments = {
+        definition.name.value: definition for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    for selection in iter_field_nodes(fragments, operation.selection_set):
+        name = selection.name.value
+        argument_name = TENANT_FIELDS.get(name)
+        slug = None
+        for argument in selection.arguments:
+            if argument.name.value == argument_name:
+                slug = value_from_ast_untyped(argument.value, variables or {})
+        yield name, slug
+
+
+def get_tenant(info, slug=None):
+    """Return the organization named by ``slug`` (the request's tenant if omitted), or ``None``.
+
+    Organizations resolved up front by ``TenantMiddleware``/``GraphQLView``
+    are reused; others go through the process-local cache. Under
+    ``AsyncGraphQLView`` those are looked up in a thread and an awaitable is
+    returned.
+    """
+    context = info.context
+    organizations = getattr(context, 'organizations', None) or {}
+    if slug is None:
+        return getattr(context, 'organization', None)
+    if slug in organizations:
+        return organizations[slug]
+    cache = get_organization_cache()
+    if get_loaders(info).is_async:
+        found, organization = cache.get_cached(slug)
+        return organization if found else sync_to_async(cache.get)(slug)
+    return cache.get(slug)
@@ -0,0 +1,121 @@
+from collections import Counter
+
+from django.db import connection, transaction
+from django.test import RequestFactory, TestCase, override_settings
+
+from .importer import OrganizationImporter
+from .models import Project, Task, TaskComment
+from .schema import schema
+from .synthetic import DatasetSpec, generate_organization
+from .tenancy import get_organization_cache
+
+OUTSIDE_RESOLVERS = '(outside resolvers)'
+
+
+def get_field_path(info):
+    """``Query.projects.tasks`` style path of the field being resolved, without list indices."""
+    root = info.schema.get_root_type(info.operation.operation).name
+    return '.'.join([root, *(key for key in info.path.as_list() if isinstance(key, str))])
+
+
+class QueryLog:
+    """Counts SQL queries per field path.
+
+    Installed both as a graphene middleware, to track the resolver running,
+    and as a database ``execute_wrapper``, to count the queries it makes.
+    Loader batches are charged to the field whose resolver triggered them.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self._path = None
+
+    def resolve(self, next, root, info, **args):
+        previous, self._path = self._path, get_field_path(info)
+        try:
+            return next(root, info, **args)
+        finally:
+            self._path = previous
+
+    def __call__(self, execute, sql, params, many, context):
+        self.counts[self._path or OUTSIDE_RESOLVERS] += 1
+        return execute(sql, params, many, context)
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+
+class Fixture:
+    """An organization generated with ``size`` projects, tasks per project and comments per task.
+
+    Every dated row is due in the past, so overdue fields have rows at every size.
+    """
+
+    def __init__(self, size):
+        spec = DatasetSpec(projects=size, tasks=size, comments=size, due_date_skew=1, prefix=f'budget-{size}')
+        self.size = size
+        self.organization = OrganizationImporter().run(generate_organization(spec, 0))
+        self.slug = self.organization.slug
+        projects = Project.objects.filter(organization=self.organization).order_by('pk')
+        self.project_ids = [str(pk) for pk in projects.values_list('pk', flat=True)]
+        tasks = Task.objects.filter(project__organization=self.organization).order_by('pk')
+        self.task_ids = [str(pk) for pk in tasks.values_list('pk', flat=True)]
+        self.project_id = self.project_ids[0]
+        self.task_id = self.task_ids[0]
+        self.comment_id = str(TaskComment.objects.filter(task_id=self.task_id).values_list('pk', flat=True).first())
+
+
+@override_settings(GRAPHQL_RESPONSE_CACHE={'ENABLED': False})
+class QueryBudgetTestCase(TestCase):
+    """Checks that operations run a fixed number of SQL queries whatever the data size.
+
+    Fixtures of each of ``sizes`` are built once per class; every operation
+    runs against each of them inside a rolled-back transaction.
+    """
+    sizes = (2, 5)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.fixtures = [Fixture(size) for size in cls.sizes]
+
+    def setUp(self):
+        # Fixtures are written without signals, so drop anything cached for
+        # organizations of an earlier class.
+        get_organization_cache().clear()
+
+    def profile(self, query, variables=None):
+        """Execute ``query`` once and return its ``QueryLog``; the changes it makes are rolled back."""
+        log = QueryLog()
+        request = RequestFactory().post('/graphql/')
+        with transaction.atomic():
+            with connection.execute_wrapper(log):
+                result = schema.execute(query, variable_values=variables, context_value=request, middleware=[log])
+            transaction.set_rollback(True)
+        if result.errors:
+            self.fail(f'Operation failed: {result.errors[0]}')
+        return log
+
+    def assertQueryBudget(self, query, variables=None, budget=None):
+        """Assert ``query`` stays within ``budget`` queries and no field's count grows with the data.
+
+        ``variables`` is a callable taking a ``Fixture``. On failure the
+        message names the field paths whose query counts changed.
+        """
+        logs = []
+        for fixture in self.fixtures:
+            logs.append(self.profile(query, variables(fixture) if variables else None))
+        first, last = logs[0], logs[-1]
+        growing = [
+            f'{path}: {first.counts[path]} -> {last.counts[path]} queries'
+            for path in sorted(set(first.counts) | set(last.counts))
+            if first.counts[path] != last.counts[path]
+        ]
+        if growing:
+            self.fail(
+                f'Query count changes from size {self.sizes[0]} to {self.sizes[-1]}:\n  ' + '\n  '.join(growing)
+            )
+        if budget is not None and last.total > budget:
+            breakdown = '\n  '.join(f'{path}: {count}' for path, count in sorted(last.counts.items()))
+            self.fail(f'{last.total} queries exceed the budget of {budget}:\n  {breakdown}')
+        return last
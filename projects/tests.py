@@ -1,7 +1,27 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import tempfile
+import threading
+from io import StringIO
+from asgiref.sync import async_to_sync, sync_to_async
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db.models import F
 from django.utils import timezone
 from datetime import timedelta
-from .models import Organization, Project, Task, TaskComment
+from .cost import LIST_SIZES
+from .documents import get_document_cache, get_persisted_queries, hash_query
+from .instrumentation import Metrics, Sample
+from .models import Organization, OrganizationStats, Project, Task, TaskComment
+from .pool import ConnectionPool, PoolTimeout, close_pools, get_pool
+from .schema import schema
+from .tenancy import get_organization_cache
+from .testing import QueryBudgetTestCase
 
 
 class OrganizationModelTest(TestCase):
@@ -55,6 +75,78 @@ class ProjectModelTest(TestCase):
         self.assertEqual(self.project.completion_rate, 0.0)
         self.assertFalse(self.project.is_overdue)
 
+    def test_annotated_task_stats(self):
+        Task.objects.create(project=self.project, title='Done', status='DONE')
+        Task.objects.create(project=self.project, title='Todo', status='TODO')
+        project = Project.objects.with_task_stats().get(pk=self.project.pk)
+        self.assertEqual(project.task_total, 2)
+        self.assertEqual(project.task_completed, 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(project.task_count, 2)
+            self.assertEqual(project.completed_task_count, 1)
+            self.assertEqual(project.completion_rate, 50.0)
+
+
+class TaskCounterTest(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name='Test Organization',
+            slug='test-org',
+            contact_email='test@example.com'
+        )
+        self.project = Project.objects.create(organization=self.org, name='Test Project')
+
+    def assertCounters(self, todo, in_progress, done):
+        self.project.refresh_from_db()
+        self.assertEqual(
+            (self.project.todo_task_count, self.project.in_progress_task_count, self.project.done_task_count),
+            (todo, in_progress, done),
+        )
+
+    def test_instance_writes(self):
+        task = Task.objects.create(project=self.project, title='Task')
+        self.assertCounters(1, 0, 0)
+        task = Task.objects.get(pk=task.pk)
+        task.status = 'DONE'
+        task.save()
+        self.assertCounters(0, 0, 1)
+        task.title = 'Renamed'
+        task.save()
+        self.assertCounters(0, 0, 1)
+        task.delete()
+        self.assertCounters(0, 0, 0)
+        self.assertEqual(self.org.task_count, 0)
+
+    def test_stale_instances(self):
+        task = Task.objects.create(project=self.project, title='Task')
+        first, second = Task.objects.get(pk=task.pk), Task.objects.get(pk=task.pk)
+        first.status = 'DONE'
+        first.save()
+        second.status = 'IN_PROGRESS'
+        second.save()
+        self.assertCounters(0, 1, 0)
+        first.delete()
+        self.assertCounters(0, 0, 0)
+        call_command('rebuild_task_counters', '--check', stdout=StringIO())
+
+    def test_bulk_writes(self):
+        Task.objects.bulk_create([Task(project=self.project, title=f'Task {i}') for i in range(4)])
+        self.assertCounters(4, 0, 0)
+        Task.objects.filter(title__in=['Task 0', 'Task 1']).update(status='IN_PROGRESS')
+        self.assertCounters(2, 2, 0)
+        Task.objects.filter(status='IN_PROGRESS').delete()
+        self.assertCounters(2, 0, 0)
+        self.assertEqual(self.org.task_count, 2)
+
+    def test_rebuild_command(self):
+        Task.objects.create(project=self.project, title='Task', status='IN_PROGRESS')
+        Project.objects.update(in_progress_task_count=7)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_task_counters', '--check', stdout=StringIO())
+        call_command('rebuild_task_counters', stdout=StringIO())
+        self.assertCounters(0, 1, 0)
+        call_command('rebuild_task_counters', '--check', stdout=StringIO())
+
 
 class TaskModelTest(TestCase):
     def setUp(self):
@@ -167,3 +259,1504 @@ class ModelRelationshipsTest(TestCase):
         self.assertEqual(Project.objects.count(), 0)
         self.assertEqual(Task.objects.count(), 0)
         self.assertEqual(TaskComment.objects.count(), 0)
+
+
+class GraphQLBatchingTest(TestCase):
+    PROJECTS_QUERY = '''
+        query GetProjects($organizationSlug: String) {
+            projects(organizationSlug: $organizationSlug) {
+                id
+                name
+                organization { slug }
+                taskStats { total completed inProgress todo completionRate }
+                tasks {
+                    id
+                    title
+                    status
+                    project { id }
+                    comments { id content task { id } }
+                }
+            }
+        }
+    '''
+
+    def setUp(self):
+        self.org = Organization.objects.create(
+            name='Test Organization',
+            slug='test-org',
+            contact_email='test@example.com'
+        )
+        # Tenant lookups are served from the organization cache.
+        get_organization_cache().get('test-org')
+
+    def add_project(self, name):
+        project = Project.objects.create(organization=self.org, name=name)
+        for status in ['TODO', 'IN_PROGRESS', 'DONE']:
+            task = Task.objects.create(project=project, title=f'{name} {status}', status=status)
+            TaskComment.objects.create(task=task, content='Comment', author_email='author@example.com')
+        return project
+
+    def execute(self, query, **variables):
+        request = RequestFactory().post('/graphql/')
+        result = schema.execute(query, variables=variables, context_value=request)
+        self.assertIsNone(result.errors)
+        return result.data
+
+    def test_query_count_is_independent_of_row_count(self):
+        self.add_project('First')
+        with self.assertNumQueries(3):
+            data = self.execute(self.PROJECTS_QUERY, organizationSlug='test-org')
+        self.assertEqual(len(data['projects']), 1)
+
+        for i in range(4):
+            self.add_project(f'Project {i}')
+        with self.assertNumQueries(3):
+            data = self.execute(self.PROJECTS_QUERY, organizationSlug='test-org')
+        self.assertEqual(len(data['projects']), 5)
+
+    def test_task_stats(self):
+        project = self.add_project('Stats')
+        data = self.execute(
+            'query ($id: ID!) { project(id: $id) { taskStats { total completed todo completionRate } } }',
+            id=project.pk,
+        )
+        stats = data['project']['taskStats']
+        self.assertEqual(stats['total'], 3)
+        self.assertEqual(stats['completed'], 1)
+        self.assertEqual(stats['todo'], 1)
+        self.assertAlmostEqual(stats['completionRate'], 100 / 3)
+
+
+class KeysetPaginationTest(TestCase):
+    TASKS_QUERY = '''
+        query Tasks($first: Int, $after: String, $last: Int, $before: String) {
+            tasks(first: $first, after: $after, last: $last, before: $before) {
+                edges { cursor node { title } }
+                pageInfo { hasNextPage hasPreviousPage startCursor endCursor }
+            }
+        }
+    '''
+
+    def setUp(self):
+        org = Organization.objects.create(
+            name='Test Organization',
+            slug='test-org',
+            contact_email='test@example.com'
+        )
+        project = Project.objects.create(organization=org, name='Test Project')
+        for i in range(5):
+            Task.objects.create(project=project, title=f'Task {i}')
+        # Identical timestamps must still paginate deterministically by id.
+        Task.objects.update(created_at=timezone.now())
+
+    def execute(self, query, **variables):
+        result = schema.execute(query, variables=variables, context_value=RequestFactory().post('/graphql/'))
+        self.assertIsNone(result.errors)
+        return result.data
+
+    def titles(self, connection):
+        return [edge['node']['title'] for edge in connection['edges']]
+
+    def test_forward_pagination(self):
+        page = self.execute(self.TASKS_QUERY, first=2)['tasks']
+        self.assertEqual(self.titles(page), ['Task 4', 'Task 3'])
+        self.assertTrue(page['pageInfo']['hasNextPage'])
+
+        page = self.execute(self.TASKS_QUERY, first=2, after=page['pageInfo']['endCursor'])['tasks']
+        self.assertEqual(self.titles(page), ['Task 2', 'Task 1'])
+
+        page = self.execute(self.TASKS_QUERY, first=2, after=page['pageInfo']['endCursor'])['tasks']
+        self.assertEqual(self.titles(page), ['Task 0'])
+        self.assertFalse(page['pageInfo']['hasNextPage'])
+        self.assertTrue(page['pageInfo']['hasPreviousPage'])
+
+    def test_backward_pagination(self):
+        page = self.execute(self.TASKS_QUERY, last=2)['tasks']
+        self.assertEqual(self.titles(page), ['Task 1', 'Task 0'])
+        self.assertTrue(page['pageInfo']['hasPreviousPage'])
+
+        page = self.execute(self.TASKS_QUERY, last=2, before=page['pageInfo']['startCursor'])['tasks']
+        self.assertEqual(self.titles(page), ['Task 3', 'Task 2'])
+
+    def test_total_count_is_opt_in(self):
+        with self.assertNumQueries(1):
+            self.execute('{ tasks(first: 1) { edges { node { id } } } }')
+        with self.assertNumQueries(2):
+            data = self.execute('{ tasks(first: 1) { totalCount edges { node { id } } } }')
+        self.assertEqual(data['tasks']['totalCount'], 5)
+
+    def test_invalid_cursor(self):
+        result = schema.execute('{ tasks(after: "bogus") { edges { cursor } } }')
+        self.assertIn('Invalid cursor', str(result.errors[0]))
+
+
+class QueryPlanTest(TestCase):
+    def test_access_paths_use_indexes(self):
+        org = Organization.objects.create(name='Test Organization', slug='test-org', contact_email='test@example.com')
+        project = Project.objects.create(organization=org, name='Test Project')
+        task = Task.objects.create(project=project, title='Test Task', due_date=timezone.now())
+        TaskComment.objects.create(task=task, content='Comment', author_email='author@example.com')
+        out = StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertIn('All access paths use their indexes.', out.getvalue())
+
+
+@override_settings(GRAPHQL_RESPONSE_CACHE={'ENABLED': False})
+class QueryCostTest(TestCase):
+    def setUp(self):
+        org = Organization.objects.create(name='Test Organization', slug='test-org', contact_email='test@example.com')
+        Project.objects.create(organization=org, name='Test Project')
+
+    def post(self, query, variables=None):
+        return self.client.post(
+            '/graphql/',
+            {'query': query, 'variables': variables or {}},
+            content_type='application/json',
+        )
+
+    def test_cost_reported_in_extensions(self):
+        response = self.post('{ projects { id tasks { id } } }')
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        # projects (1) + 100 projects * tasks (1)
+        self.assertEqual(body['extensions']['cost']['requested'], 101)
+        self.assertEqual(body['extensions']['cost']['depth'], 3)
+        self.assertEqual(len(body['data']['projects']), 1)
+
+    def test_page_arguments_scale_cost(self):
+        query = 'query ($first: Int) { tasks(first: $first) { edges { node { comments { id } } } } }'
+        small = self.post(query, {'first': 1}).json()['extensions']['cost']['requested']
+        large = self.post(query, {'first': 100}).json()['extensions']['cost']['requested']
+        # tasks + page size * (edges + node + comments)
+        self.assertEqual(small, 1 + 1 * 3)
+        self.assertEqual(large, 1 + 100 * 3)
+
+    def test_expensive_query_rejected_before_execution(self):
+        with self.assertNumQueries(0):
+            response = self.post('{ organizations { projects { tasks { comments { id } } } } }')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('exceeds the maximum', response.json()['errors'][0]['message'])
+
+    def test_unpaged_fan_out_rejected(self):
+        with self.assertNumQueries(0):
+            response = self.post('{ projects { tasks { comments { id } } } }')
+        self.assertIn('Query cost 20101 exceeds the maximum', response.json()['errors'][0]['message'])
+
+    def test_negative_page_size_does_not_offset_siblings(self):
+        query = '{ a: tasks(first: -100000) { edges { node { id comments { id } } } } b: projects { tasks { comments { id } } } }'
+        with self.assertNumQueries(0):
+            response = self.post(query)
+        body = response.json()
+        self.assertNotIn('data', body)
+        self.assertIn('Query cost 20102 exceeds the maximum', body['errors'][0]['message'])
+
+    def test_unpaged_lists_over_their_size_fail(self):
+        project = Project.objects.get()
+        for title in ['First', 'Second']:
+            Task.objects.create(project=project, title=title)
+        query = '{ projects { name } project(id: %d) { tasks { title } } }' % project.pk
+        with mock.patch.dict(LIST_SIZES, {'ProjectType.tasks': 2}):
+            body = self.post(query).json()
+        self.assertNotIn('errors', body)
+        self.assertEqual(len(body['data']['project']['tasks']), 2)
+
+        Project.objects.create(organization=project.organization, name='Newer Project')
+        Task.objects.create(project=project, title='Third')
+        with mock.patch.dict(LIST_SIZES, {'Query.projects': 1, 'ProjectType.tasks': 2}):
+            body = self.post(query).json()
+        self.assertEqual(body['data'], {'projects': None, 'project': None})
+        self.assertEqual(sorted(error['message'] for error in body['errors']), [
+            'ProjectType.tasks has more than 2 items, the most it returns without page arguments. '
+            'Page through them with tasks(projectId: ...).',
+            'Query.projects has more than 1 items, the most it returns without page arguments. '
+            'Page through them with projectConnection.',
+        ])
+
+    def test_depth_limit(self):
+        with self.settings(GRAPHQL_MAX_DEPTH=2):
+            response = self.post('{ projects { tasks { id } } }')
+        self.assertIn('Query depth 3 exceeds the maximum of 2.', response.json()['errors'][0]['message'])
+
+
+@override_settings(GRAPHQL_RESPONSE_CACHE={'ENABLED': False})
+class PersistedQueryTest(TestCase):
+    QUERY = '{ organizations { slug } }'
+
+    def setUp(self):
+        get_document_cache().clear()
+        Organization.objects.create(name='Test Organization', slug='test-org', contact_email='test@example.com')
+
+    def post(self, body):
+        return self.client.post('/graphql/', body, content_type='application/json')
+
+    def persisted(self, query_hash):
+        return {'extensions': {'persistedQuery': {'version': 1, 'sha256Hash': query_hash}}}
+
+    def test_register_then_send_hash_only(self):
+        query_hash = hash_query(self.QUERY)
+        response = self.post(self.persisted(query_hash))
+        self.assertEqual(response.json()['errors'][0]['message'], 'PersistedQueryNotFound')
+
+        response = self.post({'query': self.QUERY, **self.persisted(query_hash)})
+        self.assertEqual(response.json()['data']['organizations'], [{'slug': 'test-org'}])
+
+        response = self.post(self.persisted(query_hash))
+        self.assertEqual(response.json()['data']['organizations'], [{'slug': 'test-org'}])
+
+    def test_hash_mismatch_rejected(self):
+        response = self.post({'query': self.QUERY, **self.persisted('0' * 64)})
+        self.assertEqual(response.json()['errors'][0]['message'], 'provided sha does not match query')
+
+    def test_manifest_queries(self):
+        manifest = get_persisted_queries()._load()
+        query_hash = next(key for key, query in manifest.items() if query.startswith('query GetOrganization'))
+        response = self.post({**self.persisted(query_hash), 'variables': {'slug': 'test-org'}})
+        self.assertNotIn('errors', response.json())
+
+    def test_persisted_only_rejects_arbitrary_documents(self):
+        with self.settings(GRAPHQL_PERSISTED_QUERIES_ONLY=True):
+            response = self.post({'query': self.QUERY})
+        self.assertEqual(response.json()['errors'][0]['message'], 'Only persisted queries are accepted.')
+
+    def test_document_cache_skips_parse_and_validate(self):
+        self.post({'query': self.QUERY})
+        with mock.patch('projects.documents.parse') as parse, mock.patch('projects.documents.validate') as validate:
+            response = self.post({'query': self.QUERY})
+        parse.assert_not_called()
+        validate.assert_not_called()
+        self.assertEqual(response.json()['data']['organizations'], [{'slug': 'test-org'}])
+
+
+@override_settings(GRAPHQL_RESPONSE_CACHE={'ENABLED': True, 'OPTIONS': {'maxsize': 16, 'ttl': 60}})
+class ResponseCacheTest(TestCase):
+    PROJECTS_QUERY = 'query ($slug: String) { projects(organizationSlug: $slug) { name } }'
+
+    def setUp(self):
+        patcher = mock.patch('projects.response_cache._response_cache', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org', contact_email='test@example.com')
+        self.other = Organization.objects.create(name='Other Organization', slug='other-org', contact_email='other@example.com')
+        self.project = Project.objects.create(organization=self.org, name='Test Project')
+
+    def post(self, query, variables=None):
+        response = self.client.post(
+            '/graphql/',
+            {'query': query, 'variables': variables or {}},
+            content_type='application/json',
+        )
+        return response.json()
+
+    def create_project(self, slug, name):
+        mutation = '''
+            mutation ($slug: String!, $name: String!) {
+                createProject(organizationSlug: $slug, input: {name: $name}) { project { id } }
+            }
+        '''
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post(mutation, {'slug': slug, 'name': name})
+
+    def test_hit_after_miss(self):
+        first = self.post(self.PROJECTS_QUERY, {'slug': 'test-org'})
+        self.assertEqual(first['extensions']['responseCache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.post(self.PROJECTS_QUERY, {'slug': 'test-org'})
+        self.assertEqual(second['extensions']['responseCache'], 'HIT')
+        self.assertEqual(second['data'], first['data'])
+
+    def test_mutation_invalidates_only_its_organization(self):
+        self.post(self.PROJECTS_QUERY, {'slug': 'test-org'})
+        self.post(self.PROJECTS_QUERY, {'slug': 'other-org'})
+
+        self.create_project('test-org', 'Second Project')
+
+        body = self.post(self.PROJECTS_QUERY, {'slug': 'test-org'})
+        self.assertEqual(body['extensions']['responseCache'], 'MISS')
+        self.assertEqual(len(body['data']['projects']), 2)
+        body = self.post(self.PROJECTS_QUERY, {'slug': 'other-org'})
+        self.assertEqual(body['extensions']['responseCache'], 'HIT')
+
+    def assert_invalidated(self, write, slug='test-org'):
+        self.post(self.PROJECTS_QUERY, {'slug': slug})
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+        self.assertEqual(self.post(self.PROJECTS_QUERY, {'slug': slug})['extensions']['responseCache'], 'MISS')
+
+    def test_model_writes_invalidate(self):
+        task = Task.objects.create(project=self.project, title='Task')
+        self.assert_invalidated(lambda: Project.objects.filter(pk=self.project.pk).update(name='Renamed'))
+        self.assert_invalidated(lambda: Task.objects.filter(pk=task.pk).update(status='DONE'))
+        self.assert_invalidated(lambda: Task.objects.filter(pk=task.pk).update(title='Renamed'))
+        self.assert_invalidated(lambda: Task.objects.get(pk=task.pk).save(update_fields=['title']))
+        self.assert_invalidated(lambda: TaskComment.objects.create(task=task, content='Hi', author_email='a@example.com'))
+        self.assert_invalidated(lambda: Task.objects.filter(pk=task.pk).delete())
+        self.assert_invalidated(Organization.objects.get(pk=self.other.pk).save, 'other-org')
+
+    def test_moving_a_project_invalidates_both_organizations(self):
+        self.post(self.PROJECTS_QUERY, {'slug': 'other-org'})
+        self.project.organization = self.other
+        self.assert_invalidated(self.project.save)
+        self.assertEqual(self.post(self.PROJECTS_QUERY, {'slug': 'other-org'})['data']['projects'], [{'name': 'Test Project'}])
+
+    def test_unscoped_queries_invalidated_by_any_mutation(self):
+        query = '{ projects { name } }'
+        self.post(query)
+        self.create_project('other-org', 'Other Project')
+        body = self.post(query)
+        self.assertEqual(body['extensions']['responseCache'], 'MISS')
+        self.assertEqual(len(body['data']['projects']), 2)
+
+
+@override_settings(GRAPHQL_RESPONSE_CACHE={'ENABLED': False})
+class BulkTaskMutationTest(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org', contact_email='test@example.com')
+        other = Organization.objects.create(name='Other Organization', slug='other-org', contact_email='other@example.com')
+        self.project = Project.objects.create(organization=self.org, name='Test Project')
+        self.second = Project.objects.create(organization=self.org, name='Second Project')
+        self.foreign = Project.objects.create(organization=other, name='Foreign Project')
+        # Tenant lookups are served from the organization cache.
+        get_organization_cache().get('test-org')
+
+    def execute(self, query, **variables):
+        result = schema.execute(query, variables=variables, context_value=RequestFactory().post('/graphql/'))
+        self.assertIsNone(result.errors)
+        return result.data
+
+    def bulk_create(self, count, project=None):
+        inputs = [{'projectId': (project or self.project).pk, 'title': f'Task {i}'} for i in range(count)]
+        return self.execute(
+            '''mutation ($inputs: [CreateTaskInput!]!) {
+                bulkCreateTasks(organizationSlug: "test-org", inputs: $inputs) {
+                    results { index id success error task { title status } }
+                }
+            }''',
+            inputs=inputs,
+        )['bulkCreateTasks']['results']
+
+    def test_bulk_create_query_count_is_constant(self):
+        with self.assertNumQueries(8) as small:
+            self.bulk_create(2)
+        with self.assertNumQueries(len(small.captured_queries)):
+            results = self.bulk_create(50)
+        self.assertTrue(all(result['success'] for result in results))
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.todo_task_count, 52)
+
+    def test_bulk_create_rejects_foreign_projects(self):
+        results = self.execute(
+            '''mutation ($inputs: [CreateTaskInput!]!) {
+                bulkCreateTasks(organizationSlug: "test-org", inputs: $inputs) { results { index success error } }
+            }''',
+            inputs=[
+                {'projectId': self.project.pk, 'title': 'Mine'},
+                {'projectId': self.foreign.pk, 'title': 'Not mine'},
+                {'projectId': self.second.pk, 'title': 'Bad status', 'status': 'BLOCKED'},
+            ],
+        )['bulkCreateTasks']['results']
+        self.assertEqual([result['success'] for result in results], [True, False, False])
+        self.assertEqual(results[1]['error'], 'Project not found in organization')
+        self.assertFalse(Task.objects.filter(project=self.foreign).exists())
+
+    def test_bulk_update_and_delete(self):
+        self.bulk_create(2)
+        self.bulk_create(2, project=self.second)
+        ids = list(Task.objects.values_list('pk', flat=True))
+        query = '''mutation ($inputs: [UpdateTaskInput!]!) {
+            bulkUpdateTasks(organizationSlug: "test-org", inputs: $inputs) { results { id success task { status } } }
+        }'''
+        with self.assertNumQueries(11):
+            results = self.execute(query, inputs=[{'id': pk, 'status': 'DONE'} for pk in ids])['bulkUpdateTasks']['results']
+        self.assertEqual({result['task']['status'] for result in results}, {'DONE'})
+        self.second.refresh_from_db()
+        self.assertEqual((self.second.todo_task_count, self.second.done_task_count), (0, 2))
+
+        results = self.execute(
+            '''mutation ($ids: [ID!]!) {
+                bulkDeleteTasks(organizationSlug: "test-org", ids: $ids) { results { id success error } }
+            }''',
+            ids=ids[:3] + ['0'],
+        )['bulkDeleteTasks']['results']
+        self.assertEqual([result['success'] for result in results], [True, True, True, False])
+        self.assertEqual(Task.objects.count(), 1)
+
+
+class PartialUpdateMutationTest(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org', contact_email='test@example.com')
+        self.project = Project.objects.create(organization=self.org, name='Test Project', description='Long description')
+        self.task = Task.objects.create(project=self.project, title='Test Task', description='Long description')
+
+    def execute(self, query, **variables):
+        with CaptureQueriesContext(connection) as queries:
+            result = schema.execute(query, variables=variables, context_value=RequestFactory().post('/graphql/'))
+        return result, [query['sql'] for query in queries.captured_queries]
+
+    def test_update_writes_only_supplied_fields(self):
+        result, queries = self.execute(
+            'mutation ($id: ID!) { updateTask(input: {id: $id, status: "DONE"}) { task { id } } }', id=self.task.pk,
+        )
+        self.assertIsNone(result.errors)
+        update, = [sql for sql in queries if sql.startswith('UPDATE "tasks"')]
+        self.assertIn('"status"', update.split('WHERE')[0])
+        self.assertNotIn('"description"', update)
+        self.assertNotIn('"title"', update)
+        self.assertFalse([sql for sql in queries if sql.startswith('SELECT') and '"description"' in sql])
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.status, self.task.description), ('DONE', 'Long description'))
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.todo_task_count, self.project.done_task_count), (0, 1))
+
+    def test_update_loads_selected_fields(self):
+        query = '''mutation ($id: ID!) {
+            updateTask(input: {id: $id, title: "Renamed"}) { task { ...TaskFields updatedAt } }
+        }
+        fragment TaskFields on TaskType { title description status }'''
+        result, queries = self.execute(query, id=self.task.pk)
+        # Selected fields come back from RETURNING rather than a deferred-field load.
+        self.assertFalse([sql for sql in queries if sql.startswith('SELECT') and 'FROM "tasks"' in sql])
+        task = result.data['updateTask']['task']
+        self.assertEqual((task['title'], task['description'], task['status']), ('Renamed', 'Long description', 'TODO'))
+        self.assertGreater(task['updatedAt'], self.task.updated_at.isoformat())
+
+        result, _ = self.execute(
+            'mutation ($id: ID!) { updateProject(input: {id: $id, status: "ON_HOLD"}) {'
+            ' project { status taskStats { total todo } } } }',
+            id=self.project.pk,
+        )
+        self.assertEqual(result.data['updateProject']['project'],
+                         {'status': 'ON_HOLD', 'taskStats': {'total': 1, 'todo': 1}})
+
+    def test_update_missing_row(self):
+        result, _ = self.execute('mutation { updateTask(input: {id: "0", title: "Gone"}) { task { id } } }')
+        self.assertEqual(result.errors[0].message, 'Task matching query does not exist.')
+
+
+@override_settings(GRAPHQL_RESPONSE_CACHE={'ENABLED': False})
+class SelectedColumnsTest(TestCase):
+    def setUp(self):
+        get_organization_cache().clear()
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org', contact_email='test@example.com')
+        self.project = Project.objects.create(organization=self.org, name='Test Project', description='Long description')
+        self.task = Task.objects.create(project=self.project, title='Test Task', description='Long description')
+        TaskComment.objects.create(task=self.task, content='Long comment', author_email='a@example.com')
+
+    def execute(self, query, **variables):
+        with CaptureQueriesContext(connection) as queries:
+            result = schema.execute(query, variables=variables, context_value=RequestFactory().post('/graphql/'))
+        self.assertIsNone(result.errors)
+        return result.data, [query['sql'] for query in queries.captured_queries]
+
+    def selects(self, queries, table):
+        return [sql for sql in queries if sql.startswith('SELECT') and f'FROM "{table}"' in sql]
+
+    def test_lists_load_selected_columns(self):
+        data, queries = self.execute('''query ($slug: String!) {
+            projects(organizationSlug: $slug) { name tasks { id title status comments { authorEmail } } }
+        }''', slug=self.org.slug)
+        self.assertEqual(data['projects'][0]['tasks'][0]['comments'], [{'authorEmail': 'a@example.com'}])
+        projects, = self.selects(queries, 'projects')
+        tasks, = self.selects(queries, 'tasks')
+        comments, = self.selects(queries, 'task_comments')
+        self.assertNotIn('"description"', projects)
+        self.assertNotIn('"description"', tasks)
+        self.assertIn('"project_id"', tasks)
+        self.assertNotIn('"content"', comments)
+
+    def test_selections_of_a_type_are_merged(self):
+        # Tasks reached through comments share the columns selected on tasks elsewhere.
+        data, queries = self.execute('''query ($id: ID!) {
+            tasks(projectId: $id) { edges { node { id title } } }
+            comments { edges { node { task { ...Details } } } }
+        }
+        fragment Details on TaskType { description }''', id=self.project.pk)
+        self.assertEqual(data['comments']['edges'][0]['node']['task'], {'description': 'Long description'})
+        tasks, = self.selects(queries, 'tasks')
+        self.assertNotIn('"assignee_email"', tasks)
+
+    def test_paginates_pruned_rows(self):
+        Task.objects.create(project=self.project, title='Second Task')
+        query = '''query ($after: String) { tasks(first: 1, after: $after) {
+            edges { node { title } } pageInfo { hasNextPage endCursor }
+        } }'''
+        first, _ = self.execute(query)
+        second, queries = self.execute(query, after=first['tasks']['pageInfo']['endCursor'])
+        self.assertEqual([first['tasks']['edges'][0]['node']['title'], second['tasks']['edges'][0]['node']['title']],
+                         ['Second Task', 'Test Task'])
+        self.assertTrue(all('"description"' not in sql for sql in self.selects(queries, 'tasks')))
+
+    def test_mutations_load_whole_rows(self):
+        _, queries = self.execute('mutation ($id: ID!) { deleteTask(id: $id) { success } }', id=self.task.pk)
+        self.assertIn('"description"', self.selects(queries, 'tasks')[0])
+
+
+@override_settings(GRAPHQL_RESPONSE_CACHE={'ENABLED': False})
+class OverdueQueryTest(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org', contact_email='test@example.com')
+        other = Organization.objects.create(name='Other Organization', slug='other-org', contact_email='other@example.com')
+        today = timezone.now().date()
+        self.late = Project.objects.create(organization=self.org, name='Late', due_date=today - timedelta(days=2))
+        Project.objects.create(organization=self.org, name='Later', due_date=today - timedelta(days=5))
+        Project.objects.create(organization=self.org, name='Completed', status='COMPLETED', due_date=today - timedelta(days=2))
+        Project.objects.create(organization=self.org, name='Upcoming', due_date=today + timedelta(days=2))
+        Project.objects.create(organization=self.org, name='Undated')
+        foreign = Project.objects.create(organization=other, name='Foreign', due_date=today - timedelta(days=2))
+
+        now = timezone.now()
+        for status, due_date, title in [
+            ('TODO', now - timedelta(hours=1), 'Late'),
+            ('IN_PROGRESS', now - timedelta(days=3), 'Late in progress'),
+            ('DONE', now - timedelta(days=3), 'Done'),
+            ('TODO', now + timedelta(days=1), 'Upcoming'),
+            ('TODO', None, 'Undated'),
+        ]:
+            Task.objects.create(project=self.late, title=title, status=status, due_date=due_date)
+        Task.objects.create(project=foreign, title='Foreign', due_date=now - timedelta(days=1))
+
+    def execute(self, query, **variables):
+        result = schema.execute(query, variables=variables, context_value=RequestFactory().post('/graphql/'))
+        self.assertIsNone(result.errors)
+        return result.data
+
+    def test_overdue_querysets_match_properties(self):
+        for model in (Project, Task):
+            overdue = set(model.objects.overdue())
+            self.assertEqual(overdue, {obj for obj in model.objects.all() if obj.is_overdue})
+            self.assertEqual(set(model.objects.overdue(False)), set(model.objects.all()) - overdue)
+
+    def test_overdue_fields(self):
+        data = self.execute(
+            '''query ($slug: String!) {
+                overdueProjects(organizationSlug: $slug) { name }
+                overdueTasks(organizationSlug: $slug) { totalCount edges { node { title } } }
+            }''',
+            slug='test-org',
+        )
+        self.assertEqual([project['name'] for project in data['overdueProjects']], ['Later', 'Late'])
+        self.assertEqual(data['overdueTasks']['totalCount'], 2)
+        self.assertEqual({edge['node']['title'] for edge in data['overdueTasks']['edges']}, {'Late', 'Late in progress'})
+
+    def test_overdue_filter_argument(self):
+        data = self.execute(
+            '''query ($slug: String!, $projectId: ID) {
+                overdue: projects(organizationSlug: $slug, overdue: true) { name }
+                onTime: projectConnection(organizationSlug: $slug, overdue: false) { edges { node { name } } }
+                lateTasks: tasks(projectId: $projectId, overdue: true) { totalCount }
+                otherTasks: tasks(projectId: $projectId, overdue: false) { totalCount }
+            }''',
+            slug='test-org', projectId=self.late.pk,
+        )
+        self.assertEqual({project['name'] for project in data['overdue']}, {'Late', 'Later'})
+        self.assertEqual({edge['node']['name'] for edge in data['onTime']['edges']}, {'Completed', 'Upcoming', 'Undated'})
+        self.assertEqual((data['lateTasks']['totalCount'], data['otherTasks']['totalCount']), (2, 3))
+
+
+@override_settings(GRAPHQL_RESPONSE_CACHE={'ENABLED': False})
+class OrganizationStatsTest(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org', contact_email='test@example.com')
+        self.other = Organization.objects.create(name='Other Organization', slug='other-org', contact_email='other@example.com')
+
+    def assertStatsCurrent(self):
+        for stats in OrganizationStats.objects.all():
+            recount = OrganizationStats.objects.recount([stats.organization_id])[stats.organization_id]
+            self.assertEqual({field: getattr(stats, field) for field in recount}, recount)
+
+    def test_incremental_updates(self):
+        project = Project.objects.create(organization=self.org, name='Project')
+        held = Project.objects.create(organization=self.org, name='Held', status='ON_HOLD')
+        Task.objects.bulk_create([Task(project=project, title=f'Task {i}') for i in range(3)])
+        task = Task.objects.create(project=held, title='Held task', status='IN_PROGRESS')
+        self.assertStatsCurrent()
+        stats = OrganizationStats.objects.get(organization=self.org)
+        self.assertEqual((stats.project_count, stats.on_hold_project_count, stats.task_count), (2, 1, 4))
+
+        task.status = 'DONE'
+        task.save()
+        Task.objects.filter(project=project).update(status='IN_PROGRESS')
+        Task.objects.filter(title='Task 0').delete()
+        self.assertStatsCurrent()
+
+        held.status = 'ACTIVE'
+        held.save()
+        Project.objects.filter(pk=project.pk).update(status='COMPLETED')
+        self.assertStatsCurrent()
+
+        # Moving a project moves its tasks' counts too.
+        project = Project.objects.get(pk=project.pk)
+        project.organization = self.other
+        project.save()
+        self.assertStatsCurrent()
+        self.assertEqual(self.other.stats.task_count, 2)
+
+        project.delete()
+        Project.objects.filter(pk=held.pk).delete()
+        self.assertStatsCurrent()
+        self.assertEqual(OrganizationStats.objects.get(organization=self.other).task_count, 0)
+
+    def test_stale_instances(self):
+        project = Project.objects.create(organization=self.org, name='Project')
+        first, second = Project.objects.get(pk=project.pk), Project.objects.get(pk=project.pk)
+        first.status = 'COMPLETED'
+        first.save()
+        second.name = 'Renamed'
+        second.save()
+        self.assertStatsCurrent()
+
+    def test_partial_update_mutation(self):
+        project = Project.objects.create(organization=self.org, name='Project')
+        Task.objects.create(project=project, title='Task')
+        result = schema.execute(
+            'mutation ($id: ID!) { updateProject(input: {id: $id, status: "ARCHIVED"}) { project { id } } }',
+            variables={'id': project.pk}, context_value=RequestFactory().post('/graphql/'),
+        )
+        self.assertIsNone(result.errors)
+        self.assertStatsCurrent()
+        self.assertEqual(OrganizationStats.objects.get(organization=self.org).archived_project_count, 1)
+
+    def test_reconcile_command(self):
+        project = Project.objects.create(organization=self.org, name='Project')
+        Task.objects.create(project=project, title='Task')
+        OrganizationStats.objects.filter(organization=self.org).update(todo_task_count=5)
+        OrganizationStats.objects.filter(organization=self.other).delete()
+        with self.assertRaisesMessage(CommandError, '2 of 2 organizations have stale stats'):
+            call_command('reconcile_organization_stats', '--check', stdout=StringIO())
+        call_command('reconcile_organization_stats', stdout=StringIO())
+        self.assertStatsCurrent()
+        self.assertEqual(OrganizationStats.objects.filter(reconciled_at__isnull=False).count(), 2)
+        call_command('reconcile_organization_stats', '--check', stdout=StringIO())
+
+    def test_organization_stats_field(self):
+        now = timezone.now()
+        for org in (self.org, self.other):
+            project = Project.objects.create(organization=org, name='Late', due_date=now.date() - timedelta(days=1))
+            Task.objects.create(project=project, title='Late', due_date=now - timedelta(days=1))
+            Task.objects.create(project=project, title='Done', status='DONE', due_date=now - timedelta(days=1))
+        query = '''{ organizations { slug organizationStats {
+            projectCount activeProjectCount taskStats { total completed } overdueProjectCount overdueTaskCount
+        } } }'''
+        # The rollup and the overdue counts are one batch each, however many organizations.
+        with self.assertNumQueries(4):
+            result = schema.execute(query, context_value=RequestFactory().post('/graphql/'))
+        self.assertIsNone(result.errors)
+        for organization in result.data['organizations']:
+            self.assertEqual(organization['organizationStats'], {
+                'projectCount': 1, 'activeProjectCount': 1, 'taskStats': {'total': 2, 'completed': 1},
+                'overdueProjectCount': 1, 'overdueTaskCount': 1,
+            })
+
+
+@override_settings(GRAPHQL_RESPONSE_CACHE={'ENABLED': False})
+class AsyncGraphQLViewTest(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org', contact_email='test@example.com')
+        for name in ['First', 'Second']:
+            project = Project.objects.create(organization=self.org, name=name)
+            for status in ['TODO', 'DONE']:
+                task = Task.objects.create(project=project, title=f'{name} {status}', status=status)
+                TaskComment.objects.create(task=task, content='Comment', author_email='author@example.com')
+        # Tenant lookups are served from the organization cache.
+        get_organization_cache().get('test-org')
+
+    async def post(self, query, variables=None, path='/graphql/async/'):
+        response = await self.async_client.post(
+            path,
+            {'query': query, 'variables': variables or {}},
+            content_type='application/json',
+        )
+        return response.json()
+
+    @override_settings(GRAPHQL_MAX_COST=None)
+    def test_matches_sync_view_with_same_query_count(self):
+        query = GraphQLBatchingTest.PROJECTS_QUERY
+        with self.assertNumQueries(3):
+            body = async_to_sync(self.post)(query, {'organizationSlug': 'test-org'})
+        self.assertNotIn('errors', body)
+        self.assertEqual(len(body['data']['projects']), 2)
+        self.assertEqual(body, async_to_sync(self.post)(query, {'organizationSlug': 'test-org'}, path='/graphql/'))
+
+    async def test_sibling_root_fields(self):
+        body = await self.post('''
+            query ($slug: String!) {
+                organization(slug: $slug) { name projects { name } }
+                projectConnection(organizationSlug: $slug, first: 1) {
+                    totalCount
+                    edges { node { name tasks { title } } }
+                }
+            }
+        ''', {'slug': 'test-org'})
+        self.assertNotIn('errors', body)
+        self.assertEqual(len(body['data']['organization']['projects']), 2)
+        connection = body['data']['projectConnection']
+        self.assertEqual(connection['totalCount'], 2)
+        self.assertEqual(connection['edges'][0]['node']['name'], 'Second')
+        self.assertEqual(len(connection['edges'][0]['node']['tasks']), 2)
+
+    async def test_root_fields_in_fragments(self):
+        get_organization_cache().clear()
+        body = await self.post('''
+            query { ...Root ... on Query { projects(organizationSlug: "test-org") { name } } }
+            fragment Root on Query { organization(slug: "test-org") { name } }
+        ''')
+        self.assertNotIn('errors', body)
+        self.assertEqual(body['data']['organization'], {'name': 'Test Organization'})
+        self.assertEqual(len(body['data']['projects']), 2)
+
+    async def test_tenants_not_resolved_up_front(self):
+        get_organization_cache().clear()
+        with mock.patch('projects.views.root_field_tenants', return_value=[]):
+            body = await self.post(
+                '{ organization(slug: "test-org") { name } overdueProjects(organizationSlug: "test-org") { name } }'
+            )
+        self.assertNotIn('errors', body)
+        self.assertEqual(body['data']['organization'], {'name': 'Test Organization'})
+
+    async def test_missing_object_is_a_field_error(self):
+        body = await self.post('{ project(id: 0) { name } }')
+        self.assertIsNone(body['data']['project'])
+        self.assertEqual(body['errors'][0]['path'], ['project'])
+
+    async def test_mutation(self):
+        project = await Project.objects.aget(name='First')
+        body = await self.post('''
+            mutation ($projectId: ID!) {
+                createTask(input: {projectId: $projectId, title: "New"}) { task { title project { name } } }
+            }
+        ''', {'projectId': project.pk})
+        self.assertEqual(body['data']['createTask']['task'], {'title': 'New', 'project': {'name': 'First'}})
+        await project.arefresh_from_db()
+        self.assertEqual(project.todo_task_count, 2)
+
+
+@override_settings(
+    GRAPHQL_RESPONSE_CACHE={'ENABLED': False}, GRAPHQL_INSTRUMENTATION_SAMPLE_RATE=1, METRICS_ALLOWED_IPS=['127.0.0.1'],
+)
+class InstrumentationTest(TestCase):
+    QUERY = 'query GetProjects { projects { name tasks { title } } }'
+
+    def setUp(self):
+        patcher = mock.patch('projects.instrumentation._metrics', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org', contact_email='test@example.com')
+        project = Project.objects.create(organization=self.org, name='Test Project')
+        Task.objects.create(project=project, title='Test Task')
+
+    def post(self, query, path='/graphql/'):
+        return self.client.post(path, {'query': query}, content_type='application/json').json()
+
+    def metrics(self):
+        response = self.client.get('/metrics/')
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def test_records_resolvers_and_sql(self):
+        self.post(self.QUERY)
+        metrics = self.metrics()
+        self.assertIn('graphql_resolver_duration_seconds_count{field="Query.projects"} 1', metrics)
+        self.assertIn('graphql_resolver_duration_seconds_count{field="ProjectType.tasks"} 1', metrics)
+        self.assertIn('graphql_operation_duration_seconds_count{operation="GetProjects"} 1', metrics)
+        # One query for the projects and one batched query for their tasks.
+        self.assertIn('graphql_operation_sql_queries_sum{operation="GetProjects"} 2', metrics)
+        self.assertIn('graphql_operation_sql_queries_bucket{operation="GetProjects",le="2"} 1', metrics)
+        self.assertIn('graphql_slowest_resolver_duration_seconds{field="Query.projects",path="projects"', metrics)
+
+    def test_async_view(self):
+        self.post(self.QUERY, path='/graphql/async/')
+        metrics = self.metrics()
+        self.assertIn('graphql_resolver_duration_seconds_count{field="ProjectType.tasks"} 1', metrics)
+        self.assertIn('graphql_operation_sql_queries_sum{operation="GetProjects"} 2', metrics)
+
+    @override_settings(GRAPHQL_INSTRUMENTATION_SAMPLE_RATE=0)
+    def test_unsampled_operations_are_not_wrapped(self):
+        with mock.patch('projects.instrumentation.InstrumentationMiddleware.resolve') as resolve:
+            body = self.post(self.QUERY)
+        resolve.assert_not_called()
+        self.assertEqual(body['data']['projects'][0]['tasks'], [{'title': 'Test Task'}])
+        self.assertNotIn('graphql_operation_duration_seconds_count', self.metrics())
+
+    def test_slowest_resolvers_are_bounded(self):
+        metrics = Metrics(slowest=2)
+        info = mock.Mock(field_name='name', path=mock.Mock(as_list=lambda: ['projects', 0, 'name']))
+        info.parent_type.name = 'ProjectType'
+        sample = Sample('GetProjects')
+        for duration in [0.3, 0.1, 0.5, 0.2]:
+            sample.add_resolver(info, duration)
+        sample.finish()
+        metrics.record(sample)
+        slowest = metrics.slowest_resolvers()
+        self.assertEqual([entry['duration'] for entry in slowest], [0.5, 0.3])
+        self.assertEqual(slowest[0]['path'], 'projects.name')
+
+
+@override_settings(METRICS_TOKEN='secret', METRICS_ALLOWED_IPS=['10.0.0.0/8'])
+class MetricsAccessTest(TestCase):
+    def get(self, **extra):
+        return self.client.get('/metrics/', **extra).status_code
+
+    def test_anonymous_forbidden(self):
+        self.assertEqual(self.get(), 403)
+        self.assertEqual(self.get(HTTP_AUTHORIZATION='Bearer wrong'), 403)
+        with self.settings(METRICS_TOKEN=''):
+            self.assertEqual(self.get(HTTP_AUTHORIZATION='Bearer '), 403)
+
+    def test_token(self):
+        self.assertEqual(self.get(HTTP_AUTHORIZATION='Bearer secret'), 200)
+
+    def test_allowed_ips(self):
+        self.assertEqual(self.get(REMOTE_ADDR='10.1.2.3'), 200)
+        self.assertEqual(self.get(REMOTE_ADDR='192.168.1.1'), 403)
+
+    def test_staff(self):
+        user = User.objects.create_user('user', password='password')
+        self.client.force_login(user)
+        self.assertEqual(self.get(), 403)
+        user.is_staff = True
+        user.save()
+        self.assertEqual(self.get(), 200)
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@override_settings(METRICS_ALLOWED_IPS=['127.0.0.1'])
+class ConnectionPoolTest(TestCase):
+    def setUp(self):
+        self.opened = []
+        patcher = mock.patch('projects.pool._pools', {})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def connect(self):
+        self.opened.append(FakeConnection())
+        return self.opened[-1]
+
+    def test_reuses_released_connections(self):
+        pool = ConnectionPool(self.connect, max_size=2)
+        first = pool.acquire()
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        self.assertEqual((pool.opened, pool.acquired, pool.in_use), (1, 2, 1))
+
+    def test_waits_for_a_free_connection(self):
+        pool = ConnectionPool(self.connect, max_size=1, timeout=1)
+        connection = pool.acquire()
+        threading.Timer(0.05, pool.release, [connection]).start()
+        self.assertIs(pool.acquire(), connection)
+        self.assertGreater(pool.waits.sum, 0.04)
+
+    def test_times_out_when_exhausted(self):
+        pool = ConnectionPool(self.connect, max_size=1, timeout=0.01)
+        pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        self.assertEqual((pool.timeouts, pool.size), (1, 1))
+
+    def test_discards_broken_and_expired_connections(self):
+        def check(connection):
+            if connection is self.opened[0]:
+                raise OSError('server closed the connection')
+
+        pool = ConnectionPool(self.connect, max_size=1, check=check)
+        pool.release(pool.acquire())
+        self.assertIs(pool.acquire(), self.opened[1])
+        self.assertTrue(self.opened[0].closed)
+
+        pool.max_lifetime = 0
+        pool.release(self.opened[1])
+        self.assertTrue(self.opened[1].closed)
+        self.assertEqual((pool.size, pool.discarded), (0, 2))
+
+    def test_failed_connect_frees_its_slot(self):
+        pool = ConnectionPool(mock.Mock(side_effect=OSError('refused')), max_size=1)
+        with self.assertRaises(OSError):
+            pool.acquire()
+        self.assertEqual(pool.size, 0)
+
+    def test_metrics(self):
+        pool = get_pool(('default', 'db', None, None, None), lambda: ConnectionPool(self.connect, max_size=4))
+        pool.acquire()
+        pool.release(pool.acquire())
+        metrics = self.client.get('/metrics/').content.decode()
+        self.assertIn('db_pool_max_size{alias="default"} 4', metrics)
+        self.assertIn('db_pool_connections_in_use{alias="default"} 1', metrics)
+        self.assertIn('db_pool_connections_idle{alias="default"} 1', metrics)
+        self.assertIn('db_pool_wait_seconds_count{alias="default"} 2', metrics)
+
+        close_pools('default')
+        self.assertTrue(self.opened[1].closed)
+        self.assertNotIn('db_pool_max_size{', self.client.get('/metrics/').content.decode())
+
+
+@override_settings(GRAPHQL_RESPONSE_CACHE={'ENABLED': True, 'OPTIONS': {'maxsize': 16, 'ttl': 60}})
+class TenantResolutionTest(TestCase):
+    QUERY = '{ projects { name } }'
+
+    def setUp(self):
+        patcher = mock.patch('projects.response_cache._response_cache', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org', contact_email='test@example.com')
+        self.other = Organization.objects.create(name='Other Organization', slug='other-org', contact_email='other@example.com')
+        Project.objects.create(organization=self.org, name='Test Project')
+        Project.objects.create(organization=self.other, name='Other Project')
+
+    def post(self, query, tenant=None, path='/graphql/'):
+        headers = {'HTTP_X_ORGANIZATION': tenant} if tenant else {}
+        response = self.client.post(path, {'query': query}, content_type='application/json', **headers)
+        return response.json()
+
+    def test_header_selects_tenant(self):
+        body = self.post(self.QUERY, tenant='test-org')
+        self.assertEqual(body['data']['projects'], [{'name': 'Test Project'}])
+        body = self.post(self.QUERY, tenant='other-org')
+        self.assertEqual(body['extensions']['responseCache'], 'MISS')
+        self.assertEqual(body['data']['projects'], [{'name': 'Other Project'}])
+        self.assertEqual(len(self.post(self.QUERY)['data']['projects']), 2)
+        self.assertEqual(self.post(self.QUERY, tenant='unknown')['data']['projects'], [])
+
+    def test_async_view_uses_header(self):
+        body = self.post(self.QUERY, tenant='other-org', path='/graphql/async/')
+        self.assertEqual(body['data']['projects'], [{'name': 'Other Project'}])
+
+    def test_argument_overrides_header(self):
+        body = self.post('{ projects(organizationSlug: "test-org") { name } }', tenant='other-org')
+        self.assertEqual(body['data']['projects'], [{'name': 'Test Project'}])
+
+    def test_lookup_is_cached_and_invalidated_on_save(self):
+        cache = get_organization_cache()
+        query = '{ organization(slug: "test-org") { name projects { name } } }'
+        schema.execute(query, context_value=RequestFactory().post('/graphql/'))
+        with self.assertNumQueries(1):
+            result = schema.execute(query, context_value=RequestFactory().post('/graphql/'))
+        self.assertEqual(result.data['organization']['projects'], [{'name': 'Test Project'}])
+
+        self.org.slug = 'renamed-org'
+        self.org.save()
+        self.assertIsNone(cache.get('test-org'))
+        self.assertEqual(cache.get('renamed-org').pk, self.org.pk)
+
+
+@override_settings(GRAPHQL_RESPONSE_CACHE={'ENABLED': False})
+class SearchTest(TestCase):
+    QUERY = '''
+        query ($slug: String!, $query: String!, $first: Int, $after: String) {
+            search(organizationSlug: $slug, query: $query, first: $first, after: $after) {
+                edges { cursor node { kind score task { title } comment { content } } }
+                pageInfo { hasNextPage endCursor }
+            }
+        }
+    '''
+
+    def setUp(self):
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org', contact_email='test@example.com')
+        other = Organization.objects.create(name='Other Organization', slug='other-org', contact_email='other@example.com')
+        get_organization_cache().get('test-org')
+        self.project = Project.objects.create(organization=self.org, name='Test Project')
+        self.title_task = Task.objects.create(project=self.project, title='Database migration', description='Plan it')
+        self.description_task = Task.objects.create(
+            project=self.project, title='Cleanup', description='Remove the old database tables'
+        )
+        TaskComment.objects.create(task=self.title_task, content='Databases are hard', author_email='a@example.com')
+        foreign = Project.objects.create(organization=other, name='Foreign Project')
+        Task.objects.create(project=foreign, title='Database backup')
+
+    def search(self, query, **variables):
+        result = schema.execute(
+            self.QUERY,
+            variables={'slug': 'test-org', 'query': query, **variables},
+            context_value=RequestFactory().post('/graphql/'),
+        )
+        self.assertIsNone(result.errors)
+        return result.data['search']
+
+    def test_ranked_hits_within_organization(self):
+        with self.assertNumQueries(3):
+            data = self.search('database')
+        hits = [edge['node'] for edge in data['edges']]
+        self.assertEqual(len(hits), 3)
+        self.assertEqual(hits[0]['task']['title'], 'Database migration')
+        self.assertEqual(
+            {(hit['kind'], hit['task']['title']) for hit in hits},
+            {('TASK', 'Database migration'), ('TASK', 'Cleanup'), ('COMMENT', 'Database migration')},
+        )
+        comment_hit = next(hit for hit in hits if hit['kind'] == 'COMMENT')
+        self.assertEqual(comment_hit['comment']['content'], 'Databases are hard')
+        self.assertEqual([hit['score'] for hit in hits], sorted((hit['score'] for hit in hits), reverse=True))
+
+    def test_pagination(self):
+        first = self.search('database', first=2)
+        self.assertTrue(first['pageInfo']['hasNextPage'])
+        rest = self.search('database', first=2, after=first['pageInfo']['endCursor'])
+        self.assertFalse(rest['pageInfo']['hasNextPage'])
+        kinds = [(edge['node']['kind'], edge['node']['task']['title']) for edge in first['edges'] + rest['edges']]
+        self.assertEqual(len(set(kinds)), 3)
+
+    def test_index_follows_writes(self):
+        self.description_task.title = 'Rollout'
+        self.description_task.description = 'Deploy on friday'
+        self.description_task.save()
+        Task.objects.filter(pk=self.title_task.pk).update(title='Release notes')
+        self.assertEqual([e['node']['task']['title'] for e in self.search('friday')['edges']], ['Rollout'])
+        self.assertEqual([e['node']['kind'] for e in self.search('database')['edges']], ['COMMENT'])
+        self.title_task.delete()
+        self.assertEqual(self.search('databases')['edges'], [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(len(self.search('"database" OR (NEAR')['edges']), 0)
+        self.assertEqual(self.search('  ')['edges'], [])
+
+
+class OrganizationExportTest(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org', contact_email='test@example.com')
+        other = Organization.objects.create(name='Other Organization', slug='other-org', contact_email='other@example.com')
+        Project.objects.create(organization=other, name='Foreign Project')
+        for name in ['First', 'Second']:
+            project = Project.objects.create(organization=self.org, name=name, description='Line one\nline "two"')
+            for status in ['TODO', 'DONE']:
+                task = Task.objects.create(project=project, title=f'{name} {status}', status=status)
+                TaskComment.objects.create(task=task, content='Comment', author_email='author@example.com')
+
+    def export(self, *args):
+        out = StringIO()
+        call_command('export_organization', 'test-org', *args, stdout=out)
+        return out.getvalue()
+
+    def test_ndjson_parents_first(self):
+        with self.assertNumQueries(5):
+            records = [json.loads(line) for line in self.export().splitlines()]
+        self.assertEqual([r['type'] for r in records], ['organization'] + ['project'] * 2 + ['task'] * 4 + ['comment'] * 4)
+        project_ids = {r['id'] for r in records if r['type'] == 'project'}
+        self.assertTrue(all(r['project_id'] in project_ids for r in records if r['type'] == 'task'))
+        self.assertEqual(records[1]['description'], 'Line one\nline "two"')
+
+    def test_resume_after_cursor(self):
+        records = [json.loads(line) for line in self.export().splitlines()]
+        task = records[4]
+        resumed = [json.loads(line) for line in self.export('--after', f"task:{task['id']}").splitlines()]
+        self.assertEqual(resumed, records[5:])
+
+    def test_resume_partial_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'export.csv')
+            self.export('--format', 'csv', '--output', path)
+            with open(path) as file:
+                complete = file.read()
+            # Cut the file inside the second project's quoted description.
+            with open(path, 'w') as file:
+                file.write(complete[:complete.index('line "')])
+            self.export('--format', 'csv', '--output', path, '--resume')
+            with open(path) as file:
+                self.assertEqual(file.read(), complete)
+
+    def login(self, client):
+        client.force_login(User.objects.create_user('staff', is_staff=True))
+
+    def test_streaming_endpoint_requires_staff(self):
+        response = self.client.get('/organizations/test-org/export/')
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response['Location'].startswith('/admin/login/'))
+
+    async def test_streaming_endpoint_under_asgi(self):
+        await sync_to_async(self.login)(self.async_client)
+        response = await self.async_client.get('/organizations/test-org/export/')
+        self.assertTrue(response.is_async)
+        records = [json.loads(line) for chunk in [c async for c in response.streaming_content]
+                   for line in chunk.decode().splitlines()]
+        self.assertEqual(len(records), 11)
+
+    def test_streaming_endpoint(self):
+        self.login(self.client)
+        response = self.client.get('/organizations/test-org/export/', {'format': 'csv'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(len(rows), 11)
+        self.assertEqual(rows[1]['description'], 'Line one\nline "two"')
+        self.assertEqual(self.client.get('/organizations/test-org/export/', {'after': 'bogus'}).status_code, 400)
+        self.assertEqual(self.client.get('/organizations/missing/export/').status_code, 404)
+
+
+class OrganizationImportTest(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org', contact_email='test@example.com')
+        for name in ['First', 'Second']:
+            project = Project.objects.create(organization=self.org, name=name, description='Line one\nline "two"')
+            for status in ['TODO', 'DONE']:
+                task = Task.objects.create(
+                    project=project, title=f'{name} {status}', status=status,
+                    due_date=timezone.now() if status == 'TODO' else None,
+                )
+                TaskComment.objects.create(task=task, content=f'On {name} {status}', author_email='author@example.com')
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def round_trip(self, format, *args):
+        path = os.path.join(self.directory.name, f'export.{format}')
+        call_command('export_organization', 'test-org', '--format', format, '--output', path)
+        out = StringIO()
+        call_command('import_organization', path, '--slug', 'copy-org', *args, stdout=out)
+        return Organization.objects.get(slug='copy-org'), out.getvalue()
+
+    def snapshot(self, organization):
+        return [
+            (task.project.name, task.project.description, task.project.created_at, task.title, task.status,
+             task.due_date, task.created_at, [(c.content, c.created_at) for c in task.comments.all()])
+            for task in Task.objects.filter(project__organization=organization).order_by('title')
+        ]
+
+    def test_round_trip(self):
+        for format in ['ndjson', 'csv']:
+            with self.subTest(format=format):
+                copy, output = self.round_trip(format, '--batch-size', '3')
+                self.assertIn('Imported 11 rows into "copy-org"', output)
+                self.assertIn('rows/s', output)
+                self.assertEqual(copy.name, self.org.name)
+                self.assertEqual(copy.created_at, self.org.created_at)
+                self.assertEqual(self.snapshot(copy), self.snapshot(self.org))
+                for project in copy.projects.all():
+                    self.assertEqual((project.todo_task_count, project.done_task_count), (1, 1))
+                copy.delete()
+
+    def test_batched_writes(self):
+        path = os.path.join(self.directory.name, 'export.ndjson')
+        call_command('export_organization', 'test-org', '--output', path)
+        with CaptureQueriesContext(connection) as queries:
+            call_command('import_organization', path, '--slug', 'copy-org', '--batch-size', '2', stdout=StringIO())
+        writes = [query['sql'].split()[0] for query in queries if query['sql'].startswith(('INSERT', 'UPDATE'))]
+        # The organization and its stats row, one INSERT per type and batch,
+        # a stats UPDATE alongside the project batch and counter and stats
+        # UPDATEs alongside each task batch.
+        self.assertEqual(
+            writes,
+            ['INSERT'] * 2 + ['INSERT', 'UPDATE'] + ['INSERT', 'UPDATE', 'UPDATE'] * 2 + ['INSERT'] * 2,
+        )
+
+    def test_existing_slug(self):
+        path = os.path.join(self.directory.name, 'export.ndjson')
+        call_command('export_organization', 'test-org', '--output', path)
+        with self.assertRaisesMessage(CommandError, 'Organization "test-org" already exists'):
+            call_command('import_organization', path, stdout=StringIO())
+
+    def test_unknown_parent(self):
+        path = os.path.join(self.directory.name, 'export.ndjson')
+        with open(path, 'w') as file:
+            file.write(json.dumps({'type': 'organization', 'id': 1, 'name': 'New', 'slug': 'new-org',
+                                   'contact_email': 'new@example.com', 'created_at': '2024-01-01T00:00:00Z',
+                                   'updated_at': '2024-01-01T00:00:00Z'}) + '\n')
+            file.write(json.dumps({'type': 'task', 'id': 1, 'project_id': 99, 'title': 'Orphan'}) + '\n')
+        with self.assertRaisesMessage(CommandError, 'task points at unknown project 99'):
+            call_command('import_organization', path, stdout=StringIO())
+
+
+class SyntheticDataTest(TestCase):
+    def generate(self, *args):
+        out = StringIO()
+        call_command(
+            'generate_synthetic_data', '--organizations', '2', '--projects', '3', '--tasks', '4',
+            '--comments', '2', *args, stdout=out,
+        )
+        return out.getvalue()
+
+    def snapshot(self, prefix):
+        return list(Task.objects.filter(project__organization__slug__startswith=prefix).order_by(
+            'project__organization__slug', 'project__name', 'created_at',
+        ).values_list('project__name', 'title', 'status', 'due_date', 'created_at', 'assignee_email'))
+
+    def test_shape(self):
+        output = self.generate('--batch-size', '5')
+        self.assertIn('Generated 80 rows', output)
+        self.assertEqual(Organization.objects.filter(slug__in=['synthetic-1', 'synthetic-2']).count(), 2)
+        self.assertEqual(Project.objects.count(), 6)
+        self.assertEqual(Task.objects.count(), 24)
+        self.assertEqual(TaskComment.objects.count(), 48)
+        for project in Project.objects.with_task_stats():
+            self.assertEqual(project.task_count, project.task_total)
+            self.assertEqual(project.task_count, 4)
+        self.assertFalse(TaskComment.objects.filter(created_at__lt=F('task__created_at')).exists())
+
+    def test_deterministic(self):
+        self.generate('--seed', '7', '--prefix', 'first')
+        self.generate('--seed', '7', '--prefix', 'second')
+        self.generate('--seed', '8', '--prefix', 'third')
+        self.assertEqual(self.snapshot('first'), self.snapshot('second'))
+        self.assertNotEqual(self.snapshot('first'), self.snapshot('third'))
+
+    def test_knobs(self):
+        self.generate('--status-mix', 'DONE=1', '--due-date-skew', '1')
+        self.assertEqual(set(Task.objects.values_list('status', flat=True)), {'DONE'})
+        self.assertFalse(Task.objects.filter(due_date__gt=timezone.now()).exists())
+        with self.assertRaisesMessage(CommandError, "Unknown status 'LATER'"):
+            self.generate('--status-mix', 'LATER=1', '--prefix', 'other')
+        with self.assertRaisesMessage(CommandError, 'already exist'):
+            self.generate()
+
+
+class BenchmarkTest(TestCase):
+    def test_results_and_comparison(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.json')
+            call_command(
+                'benchmark_graphql', '--scales', 'small', '--iterations', '2', '--warmup', '0',
+                '--output', path, stdout=StringIO(),
+            )
+            with open(path) as file:
+                results = json.load(file)
+            operations = {result['operation'] for result in results['results']}
+            self.assertEqual(operations, {
+                'GET_ORGANIZATION', 'GET_PROJECTS', 'GET_PROJECT', 'GET_TASK', 'CREATE_PROJECT', 'UPDATE_PROJECT',
+                'DELETE_PROJECT', 'CREATE_TASK', 'UPDATE_TASK', 'DELETE_TASK', 'CREATE_COMMENT',
+            })
+            result = results['results'][0]
+            self.assertEqual(result['scale'], 'small')
+            self.assertGreaterEqual(result['p95_ms'], result['p50_ms'])
+            self.assertGreater(result['peak_memory_kib'], 0)
+            # Mutations were rolled back.
+            self.assertFalse(Project.objects.filter(name='Benchmark project').exists())
+
+            for result in results['results']:
+                result['p95_ms'] += 1000
+            with open(path, 'w') as file:
+                json.dump(results, file)
+            call_command(
+                'benchmark_graphql', '--scales', 'small', '--operations', 'GET_PROJECT', '--iterations', '2',
+                '--compare', path, stdout=StringIO(),
+            )
+            for result in results['results']:
+                result['sql_queries'] -= 1
+            with open(path, 'w') as file:
+                json.dump(results, file)
+            with self.assertRaisesMessage(CommandError, '1 regression(s)'):
+                call_command(
+                    'benchmark_graphql', '--scales', 'small', '--operations', 'GET_PROJECT', '--iterations', '2',
+                    '--compare', path, stdout=StringIO(),
+                )
+
+
+NESTED_PROJECT = 'id name organization { id name } taskStats { total } tasks { id project { id } comments { id task { id } } }'
+
+# Root field -> (document, variables for a fixture, query budget). Every
+# Query and Mutation field needs an entry; see test_every_field_has_a_budget.
+# Mutation budgets include the savepoints of their transactions.
+QUERY_BUDGETS = {
+    'Query.organization': (
+        f'query($slug: String!) {{ organization(slug: $slug) {{ id projects {{ {NESTED_PROJECT} }} }} }}',
+        lambda f: {'slug': f.slug}, 4,
+    ),
+    'Query.organizations': (
+        f'{{ organizations {{ id organizationStats {{ projectCount overdueTaskCount }} projects {{ {NESTED_PROJECT} }} }} }}',
+        None, 7,
+    ),
+    'Query.projects': (
+        f'query($slug: String) {{ projects(organizationSlug: $slug) {{ {NESTED_PROJECT} }} }}',
+        lambda f: {'slug': f.slug}, 3,
+    ),
+    'Query.projectConnection': (
+        f'query($slug: String) {{ projectConnection(organizationSlug: $slug, first: 10) {{'
+        f' totalCount edges {{ node {{ {NESTED_PROJECT} }} }} }} }}',
+        lambda f: {'slug': f.slug}, 4,
+    ),
+    'Query.project': (
+        f'query($id: ID!) {{ project(id: $id) {{ {NESTED_PROJECT} }} }}',
+        lambda f: {'id': f.project_id}, 4,
+    ),
+    'Query.overdueProjects': (
+        f'query($slug: String!) {{ overdueProjects(organizationSlug: $slug) {{ {NESTED_PROJECT} }} }}',
+        lambda f: {'slug': f.slug}, 4,
+    ),
+    'Query.tasks': (
+        'query($id: ID) { tasks(projectId: $id, first: 10) { totalCount edges { node {'
+        ' id project { id organization { id } } comments { id task { id } } } } } }',
+        lambda f: {'id': f.project_id}, 5,
+    ),
+    'Query.task': (
+        'query($id: ID!) { task(id: $id) { id project { id organization { id } tasks { id } } comments { id task { id } } } }',
+        lambda f: {'id': f.task_id}, 5,
+    ),
+    'Query.overdueTasks': (
+        'query($slug: String!) { overdueTasks(organizationSlug: $slug, first: 10) { totalCount edges { node {'
+        ' id project { id organization { id } } comments { id task { id } } } } } }',
+        lambda f: {'slug': f.slug}, 5,
+    ),
+    'Query.comments': (
+        'query($id: ID) { comments(taskId: $id, first: 10) { totalCount edges { node {'
+        ' id task { id project { id } comments { id } } } } } }',
+        lambda f: {'id': f.task_id}, 5,
+    ),
+    'Query.search': (
+        'query($slug: String!) { search(organizationSlug: $slug, query: "review", first: 10) { edges { node {'
+        ' kind task { id project { id } comments { id } } comment { id task { id } } } } } }',
+        lambda f: {'slug': f.slug}, 5,
+    ),
+    'Mutation.createProject': (
+        'mutation($slug: String!) { createProject(organizationSlug: $slug, input: {name: "New"}) {'
+        ' project { id organization { id } taskStats { total } tasks { id } } } }',
+        lambda f: {'slug': f.slug}, 6,
+    ),
+    'Mutation.updateProject': (
+        'mutation($id: ID!) { updateProject(input: {id: $id, name: "Renamed"}) {'
+        ' project { id organization { id } tasks { id comments { id } } } } }',
+        lambda f: {'id': f.project_id}, 4,
+    ),
+    'Mutation.deleteProject': (
+        'mutation($id: ID!) { deleteProject(id: $id) { success } }',
+        lambda f: {'id': f.project_id}, 9,
+    ),
+    'Mutation.createTask': (
+        'mutation($id: ID!) { createTask(input: {projectId: $id, title: "New"}) {'
+        ' task { id project { id taskStats { total } } comments { id } } } }',
+        lambda f: {'id': f.project_id}, 8,
+    ),
+    'Mutation.updateTask': (
+        'mutation($id: ID!) { updateTask(input: {id: $id, status: "DONE"}) {'
+        ' task { id project { id taskStats { total } } comments { id } } } }',
+        lambda f: {'id': f.task_id}, 6,
+    ),
+    'Mutation.deleteTask': (
+        'mutation($id: ID!) { deleteTask(id: $id) { success } }',
+        lambda f: {'id': f.task_id}, 8,
+    ),
+    'Mutation.bulkCreateTasks': (
+        'mutation($slug: String!, $inputs: [CreateTaskInput!]!) { bulkCreateTasks(organizationSlug: $slug, inputs: $inputs) {'
+        ' results { success task { id project { id } comments { id } } } } }',
+        lambda f: {'slug': f.slug, 'inputs': [{'projectId': pk, 'title': 'New'} for pk in f.project_ids]}, 10,
+    ),
+    'Mutation.bulkUpdateTasks': (
+        'mutation($slug: String!, $inputs: [UpdateTaskInput!]!) { bulkUpdateTasks(organizationSlug: $slug, inputs: $inputs) {'
+        ' results { success task { id project { id } comments { id } } } } }',
+        lambda f: {'slug': f.slug, 'inputs': [{'id': pk, 'status': 'DONE'} for pk in f.task_ids]}, 13,
+    ),
+    'Mutation.bulkDeleteTasks': (
+        'mutation($slug: String!, $ids: [ID!]!) { bulkDeleteTasks(organizationSlug: $slug, ids: $ids) { results { success } } }',
+        lambda f: {'slug': f.slug, 'ids': f.task_ids}, 11,
+    ),
+    'Mutation.createComment': (
+        'mutation($id: ID!) { createComment(input: {taskId: $id, content: "New", authorEmail: "a@example.com"}) {'
+        ' comment { id task { id project { id } comments { id } } } } }',
+        lambda f: {'id': f.task_id}, 5,
+    ),
+}
+
+
+class QueryBudgetTest(QueryBudgetTestCase):
+    def test_every_field_has_a_budget(self):
+        graphql_schema = schema.graphql_schema
+        fields = {
+            f'{root.name}.{name}'
+            for root in (graphql_schema.query_type, graphql_schema.mutation_type)
+            for name in root.fields
+        }
+        self.assertEqual(fields - set(QUERY_BUDGETS), set(), 'Add these fields to QUERY_BUDGETS')
+
+    def test_budgets(self):
+        for field, (query, variables, budget) in QUERY_BUDGETS.items():
+            with self.subTest(field=field):
+                self.assertQueryBudget(query, variables, budget)
+
+    def test_growth_names_the_field(self):
+        def load(loader, key):
+            return list(Task.objects.filter(project_id=key))
+
+        with mock.patch('projects.loaders.ProjectTasksLoader.load', load):
+            with self.assertRaisesMessage(AssertionError, 'Query.projects.tasks: 2 -> 5 queries'):
+                self.assertQueryBudget(
+                    'query($slug: String) { projects(organizationSlug: $slug) { id tasks { id } } }',
+                    lambda f: {'slug': f.slug},
+                )
+
+
+class AdminChangelistTest(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org', contact_email='test@example.com')
+        self.add_rows(1)
+
+    def add_rows(self, count):
+        start = Organization.objects.count()
+        for index in range(start, start + count):
+            org = Organization.objects.create(name=f'Org {index}', slug=f'org-{index}', contact_email='o@example.com')
+            project = Project.objects.create(organization=org, name=f'Project {index}',
+                                             due_date=timezone.now().date() - timedelta(days=1))
+            task = Task.objects.create(project=project, title=f'Task {index}', due_date=timezone.now() - timedelta(days=1))
+            TaskComment.objects.create(task=task, content='Comment', author_email='a@example.com')
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_constant_queries_per_page(self):
+        urls = ['/admin/projects/organization/', '/admin/projects/project/', '/admin/projects/task/',
+                '/admin/projects/taskcomment/']
+        before = [self.changelist_queries(url) for url in urls]
+        self.add_rows(10)
+        self.assertEqual([self.changelist_queries(url) for url in urls], before)
+
+    def test_sortable_computed_columns(self):
+        project = Project.objects.get(name='Project 1')
+        Task.objects.create(project=project, title='Done', status='DONE')
+        # Column 5 is the task count, column 6 the completion rate.
+        for ordering in ['-5', '-6', '7']:
+            response = self.client.get('/admin/projects/project/', {'o': ordering})
+            self.assertEqual(response.context['cl'].result_list[0], project)
+        response = self.client.get('/admin/projects/organization/', {'o': '-5'})
+        self.assertEqual(response.context['cl'].result_list[0].slug, 'org-1')
+        self.assertEqual(response.context['cl'].result_list[0].task_total, 2)
+        response = self.client.get('/admin/projects/task/', {'o': '-7.-8'})
+        self.assertEqual(response.context['cl'].result_list[0].comment_total, 1)
+
+    def test_estimated_count_above_threshold(self):
+        with override_settings(ADMIN_EXACT_COUNT_THRESHOLD=100):
+            with mock.patch('projects.admin.estimate_count', return_value=5000):
+                response = self.client.get('/admin/projects/task/')
+            self.assertEqual(response.context['cl'].result_count, 5000)
+            with mock.patch('projects.admin.estimate_count', return_value=50):
+                response = self.client.get('/admin/projects/task/')
+            self.assertEqual(response.context['cl'].result_count, 1)
+        # Without an estimate (SQLite) the count is exact.
+        response = self.client.get('/admin/projects/task/')
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_date_hierarchy_reads_only_the_date_range(self):
+        old = timezone.now() - timedelta(days=3 * 366)
+        Task.objects.update(created_at=old)
+        Task.objects.create(project=Project.objects.get(), title='New')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/admin/projects/task/')
+        self.assertFalse([query['sql'] for query in queries if 'DISTINCT' in query['sql']])
+        for year in range(old.year, timezone.now().year + 1):
+            self.assertContains(response, f'?created_at__year={year}"')
+
+        response = self.client.get('/admin/projects/task/', {'created_at__year': old.year})
+        self.assertContains(response, f'?created_at__month={old.month}&amp;created_at__year={old.year}"')
+        with override_settings(ADMIN_DATE_HIERARCHY=False):
+            response = self.client.get('/admin/projects/task/')
+        self.assertNotContains(response, 'created_at__year')
+
+    def test_autocomplete_filters(self):
+        self.add_rows(2)
+        project = Project.objects.get(name='Project 2')
+        response = self.client.get('/admin/projects/task/', {'project__id__exact': project.pk})
+        self.assertEqual([task.title for task in response.context['cl'].result_list], ['Task 2'])
+        # Only the selected project is rendered; others are searched for.
+        self.assertContains(response, f'<option value="{project.pk}" selected>{project}</option>', html=True)
+        self.assertNotContains(response, 'Project 3')
+        self.assertContains(response, 'autocomplete_filter.js')
+        response = self.client.get('/admin/projects/taskcomment/', {'task__project__organization__id__exact': project.organization_id})
+        self.assertEqual(len(response.context['cl'].result_list), 1)
+
+    def test_date_hierarchy(self):
+        year = timezone.now().year
+        response = self.client.get('/admin/projects/task/')
+        self.assertContains(response, f'?created_at__year={year}')
+        response = self.client.get('/admin/projects/task/', {'created_at__year': year - 1})
+        self.assertEqual(len(response.context['cl'].result_list), 0)
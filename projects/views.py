@@ -0,0 +1,385 @@
+import hmac
+import json
+from inspect import isawaitable
+from ipaddress import ip_address, ip_network
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection, transaction
+from django.http import Http404, HttpResponse, HttpResponseForbidden, HttpResponseNotAllowed, StreamingHttpResponse
+from django.http.response import HttpResponseBadRequest
+from django.views.decorators.http import require_GET
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.utils.utils import set_rollback
+from graphene_django.views import GraphQLView as BaseGraphQLView, HttpError
+from graphql import GraphQLError, OperationType, execute, get_operation_ast
+from graphql.execution import ExecutionResult
+
+from .cost import check_query_cost
+from .documents import get_document_cache, get_persisted_queries
+from .export import CONTENT_TYPES, DEFAULT_CHUNK_SIZE, ExportError, export_organization, parse_cursor
+from .instrumentation import InstrumentationMiddleware, get_metrics, sampling, sampling_async, start_sample
+from .loaders import Loaders
+from .pool import render_metrics as render_pool_metrics
+from .response_cache import get_response_cache, is_cacheable
+from .tenancy import get_organization_cache, get_tenant_slug, load_tenants, load_tenants_async, root_field_tenants
+
+
+class GraphQLView(BaseGraphQLView):
+    """GraphQL endpoint with persisted queries, document/response caches and cost limits.
+
+    Parsing, validation and execution are run as separate steps (rather than
+    through ``Schema.execute``) so each stage can be extended; whatever ends
+    up in ``request.graphql_extensions`` is returned as the response
+    ``extensions``.
+    """
+
+    def get_query(self, request, data, query):
+        """Return ``(query, hash)``, resolving automatic persisted query hashes."""
+        extensions = request.GET.get('extensions') or data.get('extensions') or {}
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest('Extensions are invalid JSON.'))
+        query_hash = (extensions.get('persistedQuery') or {}).get('sha256Hash')
+        persisted_only = getattr(settings, 'GRAPHQL_PERSISTED_QUERIES_ONLY', False)
+        registry = get_persisted_queries()
+
+        if query_hash:
+            stored = registry.get(query_hash)
+            if stored is not None:
+                return stored, query_hash
+            if not query:
+                raise GraphQLError('PersistedQueryNotFound')
+            if persisted_only:
+                raise GraphQLError('PersistedQueryNotSupported')
+            registry.register(query_hash, query)
+            return query, query_hash
+
+        if query and persisted_only:
+            raise GraphQLError('Only persisted queries are accepted.')
+        return query, None
+
+    def get_document(self, request, query, query_hash=None):
+        return get_document_cache().get(self.schema.graphql_schema, query, query_hash)
+
+    def validate_document(self, request, document, variables, operation_name):
+        """Return a list of errors; an empty list means the document may run."""
+        if document.errors:
+            return list(document.errors)
+        try:
+            request.graphql_extensions['cost'] = check_query_cost(
+                self.schema.graphql_schema, document.document, variables, operation_name
+            )
+        except GraphQLError as error:
+            return [error]
+        return []
+
+    def prepare_execution(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        """Run every stage before execution.
+
+        Returns ``(result, options)``: ``options`` are the arguments for
+        ``graphql.execute``, or ``None`` when ``result`` is already final
+        (errors, a cached response, or ``None`` to render GraphiQL).
+        """
+        request.graphql_extensions = {}
+        request.graphql_cache_key = None
+        try:
+            query, query_hash = self.get_query(request, data, query)
+        except GraphQLError as error:
+            return ExecutionResult(errors=[error]), None
+
+        if not query:
+            if show_graphiql:
+                return None, None
+            raise HttpError(HttpResponseBadRequest('Must provide query string.'))
+
+        try:
+            document = self.get_document(request, query, query_hash)
+        except GraphQLError as error:
+            return ExecutionResult(errors=[error]), None
+
+        operation_ast = get_operation_ast(document.document, operation_name)
+        if request.method.lower() == 'get':
+            if operation_ast and operation_ast.operation != OperationType.QUERY:
+                if show_graphiql:
+                    return None, None
+                raise HttpError(
+                    HttpResponseNotAllowed(
+                        ['POST'],
+                        'Can only perform a {} operation from a POST request.'.format(
+                            operation_ast.operation.value
+                        ),
+                    )
+                )
+
+        errors = self.validate_document(request, document, variables, operation_name)
+        if errors:
+            return ExecutionResult(errors=errors), None
+
+        response_cache = get_response_cache()
+        if response_cache is not None and is_cacheable(document.document, operation_name):
+            cache_key = response_cache.get_key(
+                document.query_hash, document.document, variables, operation_name, get_tenant_slug(request)
+            )
+            data = response_cache.get(cache_key)
+            request.graphql_extensions['responseCache'] = 'MISS' if data is None else 'HIT'
+            if data is not None:
+                return ExecutionResult(data=data), None
+            request.graphql_cache_key = cache_key
+
+        # Organizations named by the tenant header or root field arguments;
+        # resolved once, right before execution.
+        request.graphql_tenants = [get_tenant_slug(request)] + [
+            slug for _, slug in root_field_tenants(document.document, variables, operation_name)
+        ]
+        start_sample(request, operation_ast.name.value if operation_ast and operation_ast.name else operation_name)
+        options = {
+            'schema': self.schema.graphql_schema,
+            'document': document.document,
+            'root_value': self.get_root_value(request),
+            'variable_values': variables,
+            'operation_name': operation_name,
+            'context_value': self.get_context(request),
+            'middleware': self.get_middleware(request),
+        }
+        if self.execution_context_class:
+            options['execution_context_class'] = self.execution_context_class
+        return None, options
+
+    def is_atomic_mutation(self, options):
+        operation_ast = get_operation_ast(options['document'], options['operation_name'])
+        return (
+            operation_ast is not None
+            and operation_ast.operation == OperationType.MUTATION
+            and (
+                graphene_settings.ATOMIC_MUTATIONS is True
+                or connection.settings_dict.get('ATOMIC_MUTATIONS', False) is True
+            )
+        )
+
+    def get_middleware(self, request):
+        # Resolvers are only wrapped for timing when the operation is sampled.
+        if getattr(request, 'graphql_sample', None) is None:
+            return [m for m in self.middleware if not isinstance(m, InstrumentationMiddleware)]
+        return self.middleware
+
+    def execute_sync(self, request, options):
+        try:
+            load_tenants(request, request.graphql_tenants)
+            if self.is_atomic_mutation(options):
+                with sampling(request), transaction.atomic():
+                    result = execute(**options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+                return result
+            with sampling(request):
+                result = execute(**options)
+            return self.store_result(request, result)
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+    def store_result(self, request, result):
+        if request.graphql_cache_key and not result.errors:
+            get_response_cache().set(request.graphql_cache_key, result.data)
+        return result
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        result, options = self.prepare_execution(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        if options is None:
+            return result
+        return self.execute_sync(request, options)
+
+    def build_response(self, request, execution_result, id=None, show_graphiql=False):
+        """Encode an execution result; mirrors ``BaseGraphQLView.get_response``."""
+        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+            set_rollback()
+
+        status_code = 200
+        if not execution_result:
+            return None, status_code
+
+        response = {}
+        if execution_result.errors:
+            set_rollback()
+            response['errors'] = [self.format_error(e) for e in execution_result.errors]
+
+        if execution_result.errors and any(
+            not getattr(e, 'path', None) for e in execution_result.errors
+        ):
+            status_code = 400
+        else:
+            response['data'] = execution_result.data
+
+        if self.batch:
+            response['id'] = id
+            response['status'] = status_code
+
+        return self.json_encode(request, response, pretty=show_graphiql), status_code
+
+    def get_response(self, request, data, show_graphiql=False):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+        execution_result = self.execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        return self.build_response(request, execution_result, id, show_graphiql)
+
+    def json_encode(self, request, d, pretty=False):
+        extensions = getattr(request, 'graphql_extensions', None)
+        if extensions:
+            d = {**d, 'extensions': extensions}
+        return super().json_encode(request, d, pretty)
+
+
+def can_read_metrics(request):
+    """Whether ``request`` bears ``METRICS_TOKEN``, comes from ``METRICS_ALLOWED_IPS`` or is a staff user's."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and hmac.compare_digest(request.headers.get('Authorization', '').encode(), f'Bearer {token}'.encode()):
+        return True
+    networks = getattr(settings, 'METRICS_ALLOWED_IPS', ())
+    if networks:
+        address = ip_address(request.META['REMOTE_ADDR'])
+        if any(address in ip_network(network, strict=False) for network in networks):
+            return True
+    return request.user.is_active and request.user.is_staff
+
+
+def metrics(request):
+    """GraphQL instrumentation and connection pool metrics in the Prometheus text format."""
+    if not can_read_metrics(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        get_metrics().render() + render_pool_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
+async def iterate_in_thread(iterator):
+    """Async iterator over a sync ``iterator``, advancing it in the request's sync thread.
+
+    Django 4.2 serves a sync iterator under ASGI by collecting it into a list
+    first; this keeps the export streaming, and its queries on one connection.
+    """
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await next_chunk(iterator, None)) is not None:
+        yield chunk
+
+
+@staff_member_required
+@require_GET
+def organization_export(request, slug):
+    """Stream an organization as NDJSON (default) or CSV, for staff users.
+
+    ``?after=<type>:<id>`` resumes after the last record a client received.
+    Under ASGI the export is streamed through an async iterator.
+    """
+    organization = get_organization_cache().get(slug)
+    if organization is None:
+        raise Http404('Organization not found')
+    format = request.GET.get('format', 'ndjson')
+    after = request.GET.get('after') or None
+    if format not in CONTENT_TYPES:
+        return HttpResponseBadRequest(f'Unknown export format: {format!r}')
+    if after:
+        try:
+            parse_cursor(after)
+        except ExportError as error:
+            return HttpResponseBadRequest(str(error))
+
+    chunks = export_organization(organization, format, after, DEFAULT_CHUNK_SIZE)
+    if isinstance(request, ASGIRequest):
+        chunks = iterate_in_thread(chunks)
+    response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[format])
+    response['Content-Disposition'] = f'attachment; filename="{organization.slug}.{format}"'
+    return response
+
+
+class AsyncGraphQLView(GraphQLView):
+    """``GraphQLView`` for ASGI deployments.
+
+    Queries execute on the event loop: root resolvers use the async ORM and the
+    loaders return futures, so independent fields are awaited concurrently and
+    a worker is free to serve other requests while this one waits on the
+    database. Mutations run through the synchronous path in a worker thread,
+    keeping their transactions and counter bookkeeping unchanged.
+
+    GraphiQL is rendered by the synchronous ``GraphQLView``.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # csrf_exempt() would hide that the view is a coroutine function on
+        # Django 4.2, so the flag is set directly.
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    async def get(self, request, *args, **kwargs):
+        return await self.handle(request)
+
+    async def post(self, request, *args, **kwargs):
+        return await self.handle(request)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method.lower() not in ('get', 'post'):
+            return self.handle_error(
+                request,
+                HttpError(HttpResponseNotAllowed(['GET', 'POST'], 'GraphQL only supports GET and POST requests.')),
+            )
+        return super(BaseGraphQLView, self).dispatch(request, *args, **kwargs)
+
+    async def handle_error(self, request, error):
+        response = error.response
+        response['Content-Type'] = 'application/json'
+        response.content = self.json_encode(request, {'errors': [self.format_error(error)]})
+        return response
+
+    async def handle(self, request):
+        try:
+            data = self.parse_body(request)
+            if self.batch:
+                responses = [await self.get_response_async(request, entry) for entry in data]
+                result = '[{}]'.format(','.join(response[0] for response in responses))
+                status_code = responses and max(response[1] for response in responses) or 200
+            else:
+                result, status_code = await self.get_response_async(request, data)
+            return HttpResponse(status=status_code, content=result, content_type='application/json')
+        except HttpError as e:
+            return await self.handle_error(request, e)
+
+    async def get_response_async(self, request, data):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+        execution_result = await self.execute_graphql_request_async(
+            request, data, query, variables, operation_name
+        )
+        return self.build_response(request, execution_result, id)
+
+    async def execute_graphql_request_async(self, request, data, query, variables, operation_name):
+        result, options = self.prepare_execution(request, data, query, variables, operation_name)
+        if options is None:
+            return result
+
+        operation_ast = get_operation_ast(options['document'], operation_name)
+        if operation_ast is not None and operation_ast.operation == OperationType.MUTATION:
+            request.loaders = Loaders()
+            return await sync_to_async(self.execute_sync)(request, options)
+
+        request.loaders = Loaders(is_async=True)
+        try:
+            await load_tenants_async(request, request.graphql_tenants)
+            async with sampling_async(request):
+                result = execute(**options)
+                if isawaitable(result):
+                    result = await result
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+        return self.store_result(request, result)